@@ -0,0 +1,103 @@
+"""Agregados mensais por usuário
+
+Revision ID: 3f1a9c2b7d41
+Revises: d2244927550e
+Create Date: 2026-10-18 09:12:40.118532
+
+Os agregados são populados a partir do histórico na própria migração: o perfil
+só recorre ao histórico para usuários sem nenhum agregado, então um usuário
+com agregados parciais (escritos antes de um backfill) teria totais errados.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2b7d41'
+down_revision: Union[str, Sequence[str], None] = 'd2244927550e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('monthly_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('income', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('expenses', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('trips', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'month', name='uq_monthly_rollups_user_month')
+    )
+    op.create_index(op.f('ix_monthly_rollups_id'), 'monthly_rollups', ['id'], unique=False)
+    op.create_index(op.f('ix_monthly_rollups_user_id'), 'monthly_rollups', ['user_id'], unique=False)
+    op.create_table('monthly_category_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('earnings', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('trips', sa.Integer(), nullable=False),
+    sa.Column('first_transaction_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'month', 'category_id', name='uq_monthly_category_rollups_user_month_category')
+    )
+    op.create_index(op.f('ix_monthly_category_rollups_id'), 'monthly_category_rollups', ['id'], unique=False)
+    op.create_index(op.f('ix_monthly_category_rollups_user_id'), 'monthly_category_rollups', ['user_id'], unique=False)
+    _backfill()
+
+
+def _backfill() -> None:
+    """Mesmo resultado de `rollups.rebuild_user_rollups` para todos os usuários, em SQL."""
+    # Transações sem data ficam no mês '' (rollups.UNDATED_MONTH): só nos totais
+    if op.get_bind().dialect.name == "postgresql":
+        month = "COALESCE(to_char(date, 'YYYY-MM'), '')"
+    else:
+        month = "COALESCE(strftime('%Y-%m', date), '')"
+
+    op.execute(
+        f"""
+        INSERT INTO monthly_rollups (user_id, month, income, expenses, trips, minutes)
+        SELECT user_id, month, SUM(income), SUM(expenses), SUM(trips), SUM(minutes)
+        FROM (
+            SELECT user_id, {month} AS month,
+                   CASE WHEN type = 'income' THEN amount ELSE 0 END AS income,
+                   CASE WHEN type = 'expense' THEN amount ELSE 0 END AS expenses,
+                   CASE WHEN type = 'income' THEN 1 ELSE 0 END AS trips,
+                   0 AS minutes
+            FROM transactions
+            WHERE user_id IS NOT NULL
+            UNION ALL
+            SELECT user_id, substr(date, 1, 7), 0, 0, 0, COALESCE(total_minutes, 0)
+            FROM work_sessions
+            WHERE user_id IS NOT NULL
+        ) AS history
+        GROUP BY user_id, month
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO monthly_category_rollups (user_id, month, category_id, earnings, trips, first_transaction_id)
+        SELECT user_id, {month}, COALESCE(category_id, 0), SUM(amount), COUNT(id), MIN(id)
+        FROM transactions
+        WHERE user_id IS NOT NULL AND type = 'income'
+        GROUP BY user_id, {month}, COALESCE(category_id, 0)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_monthly_category_rollups_user_id'), table_name='monthly_category_rollups')
+    op.drop_index(op.f('ix_monthly_category_rollups_id'), table_name='monthly_category_rollups')
+    op.drop_table('monthly_category_rollups')
+    op.drop_index(op.f('ix_monthly_rollups_user_id'), table_name='monthly_rollups')
+    op.drop_index(op.f('ix_monthly_rollups_id'), table_name='monthly_rollups')
+    op.drop_table('monthly_rollups')
@@ -0,0 +1,28 @@
+"""Versão dos dados do usuário (ETag)
+
+Revision ID: 5c9d2e7f3a18
+Revises: 8b5e0d4c6a17
+Create Date: 2026-10-18 11:42:05.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c9d2e7f3a18'
+down_revision: Union[str, Sequence[str], None] = '8b5e0d4c6a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'data_version')
@@ -0,0 +1,188 @@
+"""external_id único por usuário
+
+Revision ID: 7e2b9c4d1f60
+Revises: a4f6b1c8d293
+Create Date: 2026-10-18 13:05:21.447312
+
+As duplicatas já gravadas são removidas (fica a de menor id) antes de criar o
+índice único. Os agregados mensais e o progresso das metas dos usuários
+afetados contavam essas linhas e são recalculados na própria migração, em SQL;
+o progresso das conquistas só é criado depois (f3b6d0e8a925), já sobre o
+histórico sem duplicatas.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2b9c4d1f60'
+down_revision: Union[str, Sequence[str], None] = 'a4f6b1c8d293'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    user_ids = [
+        row.user_id
+        for row in bind.execute(
+            sa.text(
+                """
+                SELECT DISTINCT user_id FROM transactions
+                WHERE external_id IS NOT NULL
+                GROUP BY user_id, external_id
+                HAVING COUNT(id) > 1
+                """
+            )
+        )
+    ]
+    op.execute(
+        """
+        DELETE FROM transactions
+        WHERE external_id IS NOT NULL
+          AND id NOT IN (
+            SELECT keep_id FROM (
+              SELECT MIN(id) AS keep_id FROM transactions
+              WHERE external_id IS NOT NULL
+              GROUP BY user_id, external_id
+            ) AS keep
+          )
+        """
+    )
+    if user_ids:
+        _rebuild_rollups(user_ids)
+        _recompute_goals(user_ids)
+    # Invalida ETags e perfis em cache gerados com as duplicatas
+    op.execute("UPDATE users SET data_version = data_version + 1")
+    op.create_index(
+        'uq_transactions_user_id_external_id', 'transactions', ['user_id', 'external_id'], unique=True
+    )
+
+
+def _in_users(sql: str) -> sa.TextClause:
+    return sa.text(sql).bindparams(sa.bindparam("user_ids", expanding=True))
+
+
+def _rebuild_rollups(user_ids: List[int]) -> None:
+    """Mesmo resultado de `rollups.rebuild_user_rollups` para os usuários informados, em SQL."""
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        month = "COALESCE(to_char(date, 'YYYY-MM'), '')"
+    else:
+        month = "COALESCE(strftime('%Y-%m', date), '')"
+    params = {"user_ids": user_ids}
+
+    bind.execute(_in_users("DELETE FROM monthly_rollups WHERE user_id IN :user_ids"), params)
+    bind.execute(_in_users("DELETE FROM monthly_category_rollups WHERE user_id IN :user_ids"), params)
+    bind.execute(
+        _in_users(
+            f"""
+            INSERT INTO monthly_rollups (user_id, month, income, expenses, trips, minutes)
+            SELECT user_id, month, SUM(income), SUM(expenses), SUM(trips), SUM(minutes)
+            FROM (
+                SELECT user_id, {month} AS month,
+                       CASE WHEN type = 'income' THEN amount ELSE 0 END AS income,
+                       CASE WHEN type = 'expense' THEN amount ELSE 0 END AS expenses,
+                       CASE WHEN type = 'income' THEN 1 ELSE 0 END AS trips,
+                       0 AS minutes
+                FROM transactions
+                WHERE user_id IN :user_ids
+                UNION ALL
+                SELECT user_id, substr(date, 1, 7), 0, 0, 0, COALESCE(total_minutes, 0)
+                FROM work_sessions
+                WHERE user_id IN :user_ids
+            ) AS history
+            GROUP BY user_id, month
+            """
+        ),
+        params,
+    )
+    bind.execute(
+        _in_users(
+            f"""
+            INSERT INTO monthly_category_rollups (user_id, month, category_id, earnings, trips, first_transaction_id)
+            SELECT user_id, {month}, COALESCE(category_id, 0), SUM(amount), COUNT(id), MIN(id)
+            FROM transactions
+            WHERE user_id IN :user_ids AND type = 'income'
+            GROUP BY user_id, {month}, COALESCE(category_id, 0)
+            """
+        ),
+        params,
+    )
+
+
+def _period_end(goal_type: str, start: date, deadline: Optional[str]) -> Optional[date]:
+    """Fim (exclusivo) do período gravado em period_start, como `goals.period_bounds`."""
+    if goal_type == "daily":
+        return start + timedelta(days=1)
+    if goal_type == "weekly":
+        return start + timedelta(days=7)
+    if goal_type == "monthly":
+        return (start + timedelta(days=32)).replace(day=1)
+    if goal_type == "yearly":
+        return start.replace(year=start.year + 1)
+    try:
+        return date.fromisoformat(str(deadline)[:10]) + timedelta(days=1)
+    except ValueError:
+        return None
+
+
+def _recompute_goals(user_ids: List[int]) -> None:
+    """
+    Recalcula, no período já gravado, as metas de transações ativas dos usuários
+    informados (as de horas não dependem das transações removidas).
+    """
+    bind = op.get_bind()
+    goals = bind.execute(
+        _in_users(
+            """
+            SELECT id, user_id, type, category, target, deadline, period_start FROM goals
+            WHERE user_id IN :user_ids AND is_active = :active AND period_start IS NOT NULL
+              AND category IN ('income', 'expenses', 'profit', 'trips')
+            """
+        ),
+        {"user_ids": user_ids, "active": True},
+    ).all()
+    for goal in goals:
+        start = date.fromisoformat(goal.period_start)
+        end = _period_end(goal.type, start, goal.deadline)
+        # Mesmo limite da coluna DateTime que `recompute_goal` usa (início do dia)
+        params = {"user_id": goal.user_id, "start": f"{start} 00:00:00"}
+        conditions = "user_id = :user_id AND date >= :start"
+        if end:
+            params["end"] = f"{end} 00:00:00"
+            conditions += " AND date < :end"
+        income, expenses, trips = bind.execute(
+            sa.text(
+                f"""
+                SELECT SUM(CASE WHEN type = 'income' THEN amount ELSE 0 END) AS income,
+                       SUM(CASE WHEN type = 'expense' THEN amount ELSE 0 END) AS expenses,
+                       SUM(CASE WHEN type = 'income' THEN 1 ELSE 0 END) AS trips
+                FROM transactions WHERE {conditions}
+                """
+            ).columns(income=sa.DECIMAL(12, 2), expenses=sa.DECIMAL(12, 2), trips=sa.Integer()),
+            params,
+        ).one()
+        income, expenses = Decimal(income or 0), Decimal(expenses or 0)
+        current = {
+            "income": income,
+            "expenses": expenses,
+            "profit": income - expenses,
+            "trips": Decimal(trips or 0),
+        }[goal.category]
+        bind.execute(
+            sa.text("UPDATE goals SET current = :current, is_completed = :completed WHERE id = :id").bindparams(
+                sa.bindparam("current", type_=sa.DECIMAL(10, 2)), sa.bindparam("completed", type_=sa.Boolean())
+            ),
+            {"current": current, "completed": current >= Decimal(goal.target), "id": goal.id},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_transactions_user_id_external_id', table_name='transactions')
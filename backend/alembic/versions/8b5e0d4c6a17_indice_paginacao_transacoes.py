@@ -0,0 +1,33 @@
+"""Índice composto para paginação por cursor de transações
+
+Revision ID: 8b5e0d4c6a17
+Revises: 3f1a9c2b7d41
+Create Date: 2026-10-18 10:03:27.540219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b5e0d4c6a17'
+down_revision: Union[str, Sequence[str], None] = '3f1a9c2b7d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_transactions_user_id_date_id',
+        'transactions',
+        ['user_id', sa.text('date DESC'), 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_user_id_date_id', table_name='transactions')
@@ -0,0 +1,32 @@
+"""Progresso incremental das metas
+
+Revision ID: a4f6b1c8d293
+Revises: 5c9d2e7f3a18
+Create Date: 2026-10-18 12:27:48.306115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f6b1c8d293'
+down_revision: Union[str, Sequence[str], None] = '5c9d2e7f3a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('goals', sa.Column('period_start', sa.String(), nullable=True))
+    op.add_column('goals', sa.Column('current_minutes', sa.Integer(), nullable=True))
+    op.create_index('ix_goals_user_id_is_active', 'goals', ['user_id', 'is_active'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_goals_user_id_is_active', table_name='goals')
+    op.drop_column('goals', 'current_minutes')
+    op.drop_column('goals', 'period_start')
@@ -0,0 +1,28 @@
+"""Índice (user_id, date) das sessões de trabalho
+
+Revision ID: c1d8e3a5b702
+Revises: 7e2b9c4d1f60
+Create Date: 2026-10-18 13:48:10.295861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1d8e3a5b702'
+down_revision: Union[str, Sequence[str], None] = '7e2b9c4d1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_work_sessions_user_id_date', 'work_sessions', ['user_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_work_sessions_user_id_date', table_name='work_sessions')
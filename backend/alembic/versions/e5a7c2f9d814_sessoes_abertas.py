@@ -0,0 +1,38 @@
+"""Sessões de trabalho abertas
+
+Revision ID: e5a7c2f9d814
+Revises: c1d8e3a5b702
+Create Date: 2026-10-18 14:21:37.610254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c2f9d814'
+down_revision: Union[str, Sequence[str], None] = 'c1d8e3a5b702'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('work_sessions', sa.Column('is_open', sa.Boolean(), server_default=sa.false(), nullable=False))
+    is_open = sa.column('is_open') == sa.true()
+    op.create_index(
+        'uq_work_sessions_user_id_open',
+        'work_sessions',
+        ['user_id'],
+        unique=True,
+        sqlite_where=is_open,
+        postgresql_where=is_open,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_work_sessions_user_id_open', table_name='work_sessions')
+    op.drop_column('work_sessions', 'is_open')
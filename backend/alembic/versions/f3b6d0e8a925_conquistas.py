@@ -0,0 +1,79 @@
+"""Progresso incremental das conquistas
+
+Revision ID: f3b6d0e8a925
+Revises: e5a7c2f9d814
+Create Date: 2026-10-18 14:58:02.734519
+
+O progresso dos usuários existentes é gravado a partir do histórico na própria
+migração, para todas as conquistas: um progresso incremental sobre linhas
+parciais (escritas antes de um backfill) perderia o histórico anterior.
+Conquistas criadas depois pedem `python -m app.cli rebuild-achievements`.
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b6d0e8a925'
+down_revision: Union[str, Sequence[str], None] = 'e5a7c2f9d814'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_achievements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('achievement_id', sa.Integer(), nullable=False),
+    sa.Column('progress', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('goal', sa.DECIMAL(precision=12, scale=2), nullable=False),
+    sa.Column('unlocked_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'achievement_id', name='uq_user_achievements_user_achievement')
+    )
+    op.create_index(op.f('ix_user_achievements_id'), 'user_achievements', ['id'], unique=False)
+    _backfill()
+
+
+# Definições na data da migração: (id, métrica, meta na unidade da métrica)
+_DEFINITIONS = [(1, "trips", 100), (2, "earnings", 1000), (3, "minutes", 6000), (4, "trips", 500)]
+
+
+def _backfill() -> None:
+    """Mesmo resultado de `achievements.rebuild_all_achievements`, em SQL."""
+    totals = """
+        SELECT users.id AS user_id,
+               (SELECT COUNT(id) FROM transactions
+                WHERE transactions.user_id = users.id AND transactions.type = 'income') AS trips,
+               (SELECT COALESCE(SUM(amount), 0) FROM transactions
+                WHERE transactions.user_id = users.id AND transactions.type = 'income') AS earnings,
+               (SELECT COALESCE(SUM(total_minutes), 0) FROM work_sessions
+                WHERE work_sessions.user_id = users.id) AS minutes
+        FROM users
+    """
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    for achievement_id, metric, goal in _DEFINITIONS:
+        bind.execute(
+            sa.text(
+                f"""
+                INSERT INTO user_achievements (user_id, achievement_id, progress, goal, unlocked_at, updated_at)
+                SELECT user_id, :achievement_id, {metric}, :goal,
+                       CASE WHEN {metric} >= :goal THEN :now END, :now
+                FROM ({totals}) AS totals
+                """
+            ),
+            {"achievement_id": achievement_id, "goal": goal, "now": now},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_achievements_id'), table_name='user_achievements')
+    op.drop_table('user_achievements')
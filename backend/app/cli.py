@@ -0,0 +1,66 @@
+"""
+Comandos administrativos da API.
+
+Uso:
+    python -m app.cli rebuild-rollups [--user-id ID]
+    python -m app.cli recompute-goals [--user-id ID]
+    python -m app.cli rebuild-achievements [--user-id ID]
+"""
+import argparse
+
+from .db.database import SessionLocal
+from .services import achievements, goals, rollups
+
+
+def rebuild_rollups(args: argparse.Namespace) -> None:
+    """Recalcula os agregados mensais a partir do histórico completo."""
+    db = SessionLocal()
+    try:
+        count = rollups.rebuild_all_rollups(db, user_id=args.user_id)
+        print(f"Agregados mensais reconstruídos para {count} usuário(s).")
+    finally:
+        db.close()
+
+
+def recompute_goals(args: argparse.Namespace) -> None:
+    """Recalcula o progresso das metas ativas a partir do histórico."""
+    db = SessionLocal()
+    try:
+        count = goals.recompute_all_goals(db, user_id=args.user_id)
+        print(f"Progresso recalculado para {count} meta(s).")
+    finally:
+        db.close()
+
+
+def rebuild_achievements(args: argparse.Namespace) -> None:
+    """Recalcula o progresso das conquistas a partir do histórico."""
+    db = SessionLocal()
+    try:
+        count = achievements.rebuild_all_achievements(db, user_id=args.user_id)
+        print(f"Conquistas recalculadas para {count} usuário(s).")
+    finally:
+        db.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser("rebuild-rollups", help="Reconstrói os agregados mensais")
+    rebuild.add_argument("--user-id", type=int, default=None, help="Processa apenas este usuário")
+    rebuild.set_defaults(func=rebuild_rollups)
+
+    recompute = subparsers.add_parser("recompute-goals", help="Recalcula o progresso das metas")
+    recompute.add_argument("--user-id", type=int, default=None, help="Processa apenas este usuário")
+    recompute.set_defaults(func=recompute_goals)
+
+    achievements_parser = subparsers.add_parser("rebuild-achievements", help="Recalcula o progresso das conquistas")
+    achievements_parser.add_argument("--user-id", type=int, default=None, help="Processa apenas este usuário")
+    achievements_parser.set_defaults(func=rebuild_achievements)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
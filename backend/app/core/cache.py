@@ -0,0 +1,159 @@
+"""
+Caches com expiração (TTL) e backends plugáveis.
+
+O backend padrão é um LRU em memória, por processo. Com CACHE_BACKEND=redis
+(e CACHE_URL apontando para o servidor), os caches passam a ser compartilhados
+entre os workers; o pacote `redis` só é exigido nesse caso.
+"""
+import os
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+
+# Todos os caches criados por `build_cache`, para métricas e limpeza
+_registry: Dict[str, "CacheBackend"] = {}
+
+
+class CacheBackend(ABC):
+    """Interface comum dos backends de cache."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class MemoryCache(CacheBackend):
+    """LRU em memória com TTL por entrada, seguro para uso no threadpool."""
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0):
+        super().__init__(name)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "size": len(self._data), "maxsize": self.maxsize}
+
+
+class RedisCache(CacheBackend):
+    """Cache compartilhado entre processos, com as chaves prefixadas pelo nome do cache."""
+
+    def __init__(self, name: str, url: str = CACHE_URL, ttl: float = 60.0):
+        super().__init__(name)
+        import redis  # Dependência opcional, apenas para CACHE_BACKEND=redis
+
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+        self._prefix = f"ride_finance:{name}:"
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(self._prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self._client.set(self._prefix + key, pickle.dumps(value), px=max(int(ttl * 1000), 1))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=self._prefix + "*"):
+            self._client.delete(key)
+
+
+def build_cache(name: str, maxsize: int = 1024, ttl: float = 60.0, backend: Optional[str] = None) -> CacheBackend:
+    """Cria (e registra) um cache com o backend configurado."""
+    backend = backend or CACHE_BACKEND
+    if backend == "redis":
+        cache = RedisCache(name, ttl=ttl)
+    else:
+        cache = MemoryCache(name, maxsize=maxsize, ttl=ttl)
+    _registry[name] = cache
+    return cache
+
+
+def all_stats() -> Dict[str, Dict[str, Any]]:
+    """Contadores de todos os caches registrados."""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+def clear_all() -> None:
+    for cache in _registry.values():
+        cache.clear()
@@ -0,0 +1,75 @@
+"""
+GET condicional (ETag / If-None-Match) baseado na versão dos dados do usuário.
+
+A dependência roda antes do corpo da rota: se o cliente já tem a versão atual,
+a resposta é um 304 sem nenhuma consulta além da leitura da versão.
+"""
+from datetime import datetime
+from typing import Callable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..db import database, models
+from ..services import versioning
+from . import security
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def daily_scope() -> str:
+    """Escopo para respostas que mudam com a data (mês corrente, dados de hoje, status do plano)."""
+    return datetime.utcnow().strftime("%Y%m%d")
+
+
+def cached_response(body: bytes, response: Response) -> Response:
+    """Resposta JSON já serializada, com o ETag publicado pela dependência."""
+    headers = {name: response.headers[name] for name in ("ETag", "Cache-Control") if name in response.headers}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _respond(request: Request, response: Response, etag: str) -> None:
+    if versioning.etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def conditional_get(scope: Optional[Callable[[], str]] = None):
+    """
+    Dependência de rota que publica o ETag e responde 304 quando o
+    If-None-Match corresponde à versão atual dos dados do usuário.
+    Retorna a versão, para rotas que a usam como chave de cache.
+    """
+
+    def dependency(
+        request: Request,
+        response: Response,
+        db: Session = Depends(database.get_db),
+        current_user: models.User = Depends(security.get_current_active_user),
+    ) -> int:
+        version = versioning.get_data_version(db, current_user.id)
+        _respond(request, response, versioning.make_etag(current_user.id, version, scope() if scope else None))
+        return version
+
+    return dependency
+
+
+def conditional_get_async(scope: Optional[Callable[[], str]] = None):
+    """Equivalente de `conditional_get` para as rotas da pilha assíncrona."""
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(database.get_async_db),
+        current_user: models.User = Depends(security.get_current_active_user_async),
+    ) -> int:
+        version = await db.run_sync(versioning.get_data_version, current_user.id)
+        _respond(request, response, versioning.make_etag(current_user.id, version, scope() if scope else None))
+        return version
+
+    return dependency
@@ -1,15 +1,23 @@
+import asyncio
+import hashlib
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 
 from ..db import database, models
+from ..services import stats
+from . import cache
 
 # Carrega as variáveis de ambiente do arquivo .env
 load_dotenv()
@@ -19,8 +27,24 @@ SECRET_KEY = os.getenv("JWT_SECRET")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 dias
 
-# Contexto para hashing de senhas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Contexto para hashing de senhas. Hashes com menos rounds que o configurado
+# são considerados desatualizados e refeitos no próximo login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
+
+# Pool de processos dedicado ao bcrypt, para que uma rajada de logins não
+# ocupe o threadpool dos demais endpoints. Acima de HASH_MAX_PENDING
+# operações em andamento, novas requisições recebem 503.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", 0)) or os.cpu_count() or 1
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", 0)) or HASH_WORKERS * 8
+
+_hash_executor = None
+_hash_pending = 0
 
 # Esquema OAuth2 para obter o token do header Authorization
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
@@ -37,6 +61,53 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica a senha e retorna também o novo hash, se o atual estiver desatualizado."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    """Pool de processos do bcrypt, criado sob demanda."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _hash_executor
+
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(cancel_futures=True)
+        _hash_executor = None
+
+
+async def _run_hasher(fn, *args):
+    """Executa `fn` no pool do bcrypt, recusando com 503 quando a fila está cheia."""
+    global _hash_pending
+    if _hash_pending >= HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes.",
+            headers={"Retry-After": "1"},
+        )
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hash_executor(), fn, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Versão assíncrona de `verify_and_update_password`, fora do threadpool."""
+    return await _run_hasher(verify_and_update_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Versão assíncrona de `get_password_hash`, fora do threadpool."""
+    return await _run_hasher(get_password_hash, password)
+
+
 # --- Funções de Token JWT ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Cria um novo token de acesso JWT."""
@@ -50,30 +121,158 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-# --- Dependências de Autenticação ---
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)
-):
+# --- Cache de Tokens Verificados ---
+# O mesmo token é reenviado em todas as requisições de um cliente; guardamos o
+# payload já verificado, indexado pelo SHA-256 do token, até o seu `exp`.
+# Fica sempre em memória: o custo evitado é a verificação HMAC local.
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", 300))
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", 8192))
+
+token_cache = cache.build_cache(
+    "tokens", maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL_SECONDS, backend="memory"
+)
+
+
+def decode_access_token(token: str) -> dict:
     """
-    Decodifica o token, valida e retorna o usuário.
-    Esta função é uma dependência que pode ser usada para proteger rotas.
+    Decodifica e verifica o token, reaproveitando payloads já verificados.
+    Lança JWTError para tokens inválidos ou expirados.
     """
-    credentials_exception = HTTPException(
+    key = hashlib.sha256(token.encode()).hexdigest()
+    now = time.time()
+    payload = token_cache.get(key)
+    if payload is not None:
+        if "exp" not in payload or payload["exp"] > now:
+            return payload
+        token_cache.delete(key)
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = TOKEN_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - now)
+    if ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+
+# --- Cache de Usuários Autenticados ---
+# Evita o SELECT em users a cada requisição autenticada. As entradas são
+# invalidadas quando a linha do usuário muda (ver eventos abaixo) e expiram
+# pelo TTL, que limita a defasagem entre workers com o backend em memória.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", 4096))
+
+user_cache = cache.build_cache("users", maxsize=USER_CACHE_MAXSIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+# Colunas copiadas para o snapshot (sem a senha e sem a versão dos dados, que muda a cada escrita)
+_SNAPSHOT_COLUMNS = [c.key for c in models.User.__table__.columns if c.key not in ("password", "data_version")]
+
+
+class UserSnapshot:
+    """
+    Cópia leve dos dados do usuário autenticado, desacoplada da sessão.
+    Expõe as colunas como atributos, como o objeto ORM.
+    """
+
+    def __init__(self, data: dict):
+        self.__dict__.update(data)
+
+
+def _snapshot_data(user: models.User) -> dict:
+    return {key: getattr(user, key) for key in _SNAPSHOT_COLUMNS}
+
+
+def load_user_snapshot(db: Session, username: str) -> Optional[UserSnapshot]:
+    """Retorna o usuário pelo username, consultando o banco apenas em caso de miss."""
+    data = user_cache.get(username)
+    if data is None:
+        user = db.query(models.User).filter(models.User.username == username).first()
+        if user is None:
+            return None
+        data = _snapshot_data(user)
+        user_cache.set(username, data)
+    return UserSnapshot(data)
+
+
+async def load_user_snapshot_async(db: AsyncSession, username: str) -> Optional[UserSnapshot]:
+    """Versão de `load_user_snapshot` para a pilha assíncrona."""
+    data = user_cache.get(username)
+    if data is None:
+        user = await db.scalar(select(models.User).where(models.User.username == username))
+        if user is None:
+            return None
+        data = _snapshot_data(user)
+        user_cache.set(username, data)
+    return UserSnapshot(data)
+
+
+def invalidate_user(username: str) -> None:
+    user_cache.delete(username)
+
+
+@event.listens_for(models.User, "after_insert")
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _invalidate_user_on_change(mapper, connection, target):
+    # Invalida também o username anterior, caso ele tenha sido alterado
+    for username in {target.username, *inspect(target).attrs.username.history.deleted}:
+        if username:
+            invalidate_user(username)
+    # O perfil em cache inclui os dados pessoais
+    stats.invalidate_profile(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("invalidated_usernames", set()).add(target.username)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_users_after_commit(session):
+    # Repete a invalidação após o commit: uma leitura concorrente feita antes
+    # do commit pode ter recolocado os dados antigos no cache.
+    for username in session.info.pop("invalidated_usernames", ()):
+        invalidate_user(username)
+
+
+# --- Dependências de Autenticação ---
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _username_from_token(token: str) -> str:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    return username
 
-    user = db.query(models.User).filter(models.User.username == username).first()
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)
+):
+    """
+    Decodifica o token, valida e retorna o usuário.
+    Esta função é uma dependência que pode ser usada para proteger rotas.
+    """
+    user = load_user_snapshot(db, _username_from_token(token))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(database.get_async_db)
+):
+    """Equivalente de `get_current_user` para as rotas da pilha assíncrona."""
+    user = await load_user_snapshot_async(db, _username_from_token(token))
+    if user is None:
+        raise _credentials_exception()
     return user
 
 
@@ -86,4 +285,11 @@ def get_current_active_user(
     # Você pode adicionar lógica aqui para verificar se o usuário está desativado
     # if current_user.disabled:
     #     raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+async def get_current_active_user_async(
+    current_user: models.User = Depends(get_current_user_async),
+):
+    """Equivalente de `get_current_active_user` para a pilha assíncrona."""
+    return current_user
@@ -1,11 +1,197 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from typing import Any, Dict, Tuple, Union
 import os 
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
-engine = create_engine(os.getenv("DATABASE_URL"))
+# Com DB_ASYNC=true as rotas principais usam a pilha assíncrona (AsyncSession);
+# a engine síncrona continua disponível para autenticação, CLI e migrações.
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Driver assíncrono usado para cada banco
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+# --- Pool de conexões ---
+# Com DB_MAX_CONNECTIONS, o limite de conexões do banco é dividido entre os
+# workers (WEB_CONCURRENCY) e vira o tamanho fixo do pool de cada um.
+# Na pilha síncrona, pool_size + max_overflow abaixo do número de threads do
+# threadpool (40) faz requisições esperarem por conexões sob carga.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", 0))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 0)) or (
+    max(1, DB_MAX_CONNECTIONS // WEB_CONCURRENCY) if DB_MAX_CONNECTIONS else 5
+)
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 0 if DB_MAX_CONNECTIONS else 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# --- Ajustes por banco ---
+# PostgreSQL: limite de duração de cada comando (0 desativa)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+# SQLite: WAL permite leituras concorrentes com uma escrita; NORMAL é seguro com WAL
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+
+
+class PoolMetrics:
+    """Contadores do pool de conexões, alimentados pelos eventos do SQLAlchemy."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+        # Ocupação atual (apenas pools com fila, como o QueuePool)
+        if isinstance(pool, QueuePool):
+            for key in ("size", "checkedout", "overflow", "checkedin"):
+                data[key] = getattr(pool, key)()
+        return data
+
+
+class _MeteredPoolMixin:
+    """Mede o tempo de espera por uma conexão livre (inclusive os timeouts)."""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncPool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_sqlite_memory(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _pool_options(url: URL, metrics: PoolMetrics, is_async: bool) -> Dict[str, Any]:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    # SQLite em memória usa um pool próprio, com uma conexão por thread
+    if _is_sqlite_memory(url):
+        return options
+    # Subclasse por engine: o pool recriado em dispose() mantém as mesmas métricas
+    base = MeteredAsyncPool if is_async else MeteredQueuePool
+    options.update(
+        poolclass=type(base.__name__, (base,), {"metrics": metrics}),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def _install_engine_events(engine: Engine, url: URL, metrics: PoolMetrics) -> None:
+    backend = url.get_backend_name()
+    file_database = not _is_sqlite_memory(url)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.incr("connects")
+        cursor = dbapi_connection.cursor()
+        if backend == "sqlite":
+            if file_database:
+                cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        elif backend == "postgresql" and DB_STATEMENT_TIMEOUT_MS:
+            cursor.execute(f"SET statement_timeout = {DB_STATEMENT_TIMEOUT_MS}")
+            # O SET abre uma transação implícita no psycopg2; fecha antes de devolver ao pool
+            dbapi_connection.commit()
+        cursor.close()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.incr("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.incr("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("invalidations")
+
+
+# Engines criadas pela aplicação e suas métricas, expostas em /api/metrics
+_engines: Dict[str, Tuple[Engine, PoolMetrics]] = {}
+
+
+def build_engine(url: Union[str, URL], name: str = "sync") -> Engine:
+    """Cria a engine síncrona com o pool e os ajustes de conexão configurados."""
+    url = make_url(url)
+    metrics = PoolMetrics()
+    engine = create_engine(url, **_pool_options(url, metrics, is_async=False))
+    _install_engine_events(engine, url, metrics)
+    _engines[name] = (engine, metrics)
+    return engine
+
+
+def build_async_engine(url: Union[str, URL], name: str = "async") -> AsyncEngine:
+    """Equivalente de `build_engine` para a pilha assíncrona."""
+    url = make_url(url)
+    metrics = PoolMetrics()
+    engine = create_async_engine(url, **_pool_options(url, metrics, is_async=True))
+    _install_engine_events(engine.sync_engine, url, metrics)
+    _engines[name] = (engine.sync_engine, metrics)
+    return engine
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Estatísticas dos pools das engines da aplicação."""
+    return {name: metrics.stats(engine.pool) for name, (engine, metrics) in _engines.items()}
+
+
+engine = build_engine(os.getenv("DATABASE_URL"))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -16,4 +202,49 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def async_database_url(url: str) -> URL:
+    """Troca o driver da URL pelo equivalente assíncrono (ex.: sqlite -> sqlite+aiosqlite)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Banco sem driver assíncrono configurado: {backend}")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Engine e fábrica de sessões assíncronas, criadas sob demanda (o driver é opcional)."""
+    global _async_engine, _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_engine = build_async_engine(async_database_url(os.getenv("DATABASE_URL")))
+        # Sem expirar no commit: em AsyncSession não há carregamento implícito de atributos
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_sessionmaker = None
+
+
+def dialect_insert(db: Session, model):
+    """
+    Retorna um INSERT do dialeto da sessão, com suporte a ON CONFLICT
+    (PostgreSQL e SQLite expõem a mesma API de upsert no SQLAlchemy).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
@@ -6,9 +6,12 @@ from sqlalchemy import (
     DateTime,
     DECIMAL,
     ForeignKey,
+    Index,
     Integer,
     JSON,
     String,
+    UniqueConstraint,
+    false,
 )
 from sqlalchemy.orm import relationship
 
@@ -32,6 +35,8 @@ class User(Base):
     trial_ends_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Incrementado a cada escrita nos dados do usuário; base do ETag das listagens
+    data_version = Column(Integer, nullable=False, default=0, server_default=false())
 
     categories = relationship("Category", back_populates="user")
     transactions = relationship("Transaction", back_populates="user")
@@ -73,6 +78,24 @@ class Transaction(Base):
     category = relationship("Category", back_populates="transactions")
 
 
+# Índice da paginação por cursor (keyset) em GET /api/transactions
+Index(
+    "ix_transactions_user_id_date_id",
+    Transaction.user_id,
+    Transaction.date.desc(),
+    Transaction.id,
+)
+
+# Deduplicação: o mesmo external_id nunca é gravado duas vezes para um usuário
+# (alvo do ON CONFLICT DO NOTHING nas inserções)
+Index(
+    "uq_transactions_user_id_external_id",
+    Transaction.user_id,
+    Transaction.external_id,
+    unique=True,
+)
+
+
 class WorkSession(Base):
     __tablename__ = "work_sessions"
 
@@ -82,11 +105,26 @@ class WorkSession(Base):
     end_time = Column(DateTime)
     total_minutes = Column(Integer)
     date = Column(String, nullable=False, index=True)
+    # Sessão iniciada por POST /work-sessions/start e ainda não encerrada
+    is_open = Column(Boolean, nullable=False, default=False, server_default=false())
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="work_sessions")
 
 
+# Agregações por dia das sessões (atividade e calendário do perfil)
+Index("ix_work_sessions_user_id_date", WorkSession.user_id, WorkSession.date)
+
+# No máximo uma sessão aberta por usuário; também serve a leitura da sessão ativa
+Index(
+    "uq_work_sessions_user_id_open",
+    WorkSession.user_id,
+    unique=True,
+    sqlite_where=WorkSession.is_open == True,  # noqa: E712
+    postgresql_where=WorkSession.is_open == True,  # noqa: E712
+)
+
+
 class Goal(Base):
     __tablename__ = "goals"
 
@@ -102,11 +140,19 @@ class Goal(Base):
     priority = Column(String, default="medium")
     is_active = Column(Boolean, default=True)
     is_completed = Column(Boolean, default=False)
+    # Início ('YYYY-MM-DD') do período a que `current` se refere (ver app/services/goals.py)
+    period_start = Column(String)
+    # Minutos acumulados no período (metas de horas); `current` é derivado deles
+    current_minutes = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="goals")
 
 
+# Listagem de metas e busca das metas ativas afetadas por uma escrita
+Index("ix_goals_user_id_is_active", Goal.user_id, Goal.is_active)
+
+
 class Setting(Base):
     __tablename__ = "settings"
 
@@ -115,4 +161,59 @@ class Setting(Base):
     key = Column(String, nullable=False)
     value = Column(JSON)
 
-    user = relationship("User", back_populates="settings")
\ No newline at end of file
+    user = relationship("User", back_populates="settings")
+
+
+class MonthlyRollup(Base):
+    """
+    Agregado mensal por usuário, mantido incrementalmente a cada escrita.
+    Evita varrer todo o histórico de transações no perfil.
+    """
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (UniqueConstraint("user_id", "month", name="uq_monthly_rollups_user_month"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    month = Column(String(7), nullable=False)  # Formato YYYY-MM
+    income = Column(DECIMAL(12, 2), nullable=False, default=0)
+    expenses = Column(DECIMAL(12, 2), nullable=False, default=0)
+    trips = Column(Integer, nullable=False, default=0)
+    minutes = Column(Integer, nullable=False, default=0)
+
+
+class MonthlyCategoryRollup(Base):
+    """Ganhos mensais por categoria (base do detalhamento por plataforma)."""
+    __tablename__ = "monthly_category_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "month", "category_id", name="uq_monthly_category_rollups_user_month_category"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    month = Column(String(7), nullable=False)  # Formato YYYY-MM
+    category_id = Column(Integer, nullable=False, default=0)  # 0 = sem categoria ("Outros")
+    earnings = Column(DECIMAL(12, 2), nullable=False, default=0)
+    trips = Column(Integer, nullable=False, default=0)
+    # Menor id de transação do grupo: ordena as plataformas pela primeira receita
+    first_transaction_id = Column(Integer, nullable=False)
+
+
+class UserAchievement(Base):
+    """
+    Progresso de um usuário numa conquista (definições em app/services/achievements.py),
+    mantido incrementalmente a cada escrita.
+    """
+    __tablename__ = "user_achievements"
+    __table_args__ = (
+        UniqueConstraint("user_id", "achievement_id", name="uq_user_achievements_user_achievement"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    achievement_id = Column(Integer, nullable=False)
+    progress = Column(DECIMAL(12, 2), nullable=False, default=0)  # Na unidade da métrica
+    goal = Column(DECIMAL(12, 2), nullable=False)  # Meta na unidade da métrica, quando gravado
+    unlocked_at = Column(DateTime)  # Quando a meta foi alcançada; não muda depois
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -1,13 +1,14 @@
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
 # Importações necessárias para a criação do usuário admin
-from .db.database import SessionLocal
+from .db.database import DB_ASYNC, SessionLocal, dispose_async_engine
 from .db import models
-from .core.security import get_password_hash
+from .core.security import get_password_hash, shutdown_hash_executor
+from .utils.utils import shutdown_pdf_executor
 
-from .routes import auth, transactions, categories, goals, work_sessions, profile
+from .routes import auth, transactions, categories, goals, work_sessions, profile, metrics, dashboard
 
 app = FastAPI()
 
@@ -25,6 +26,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[transactions.NEXT_CURSOR_HEADER],
 )
 
 # --- FIM DA CONFIGURAÇÃO DE CORS ---
@@ -62,12 +64,59 @@ def on_startup():
         db.close()
 
 
-app.include_router(auth.router, prefix="/api", tags=["auth"])
-app.include_router(transactions.router, prefix="/api", tags=["transactions"])
-app.include_router(categories.router, prefix="/api", tags=["categories"])
-app.include_router(goals.router, prefix="/api", tags=["goals"])
-app.include_router(work_sessions.router, prefix="/api", tags=["work_sessions"])
-app.include_router(profile.router, prefix="/api", tags=["profile"])
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Encerra os pools de processos (extração de PDFs e bcrypt) e a engine assíncrona."""
+    shutdown_pdf_executor()
+    shutdown_hash_executor()
+    await dispose_async_engine()
+
+
+ROUTERS = [
+    (auth, "auth"),
+    (transactions, "transactions"),
+    (categories, "categories"),
+    (goals, "goals"),
+    (work_sessions, "work_sessions"),
+    (profile, "profile"),
+    (dashboard, "dashboard"),
+    (metrics, "metrics"),
+]
+
+
+def include_routers(app: FastAPI, use_async: bool = False) -> None:
+    """
+    Registra as rotas da API. Com `use_async`, as variantes assíncronas
+    (app/routes/aio) são registradas primeiro e as rotas síncronas que elas
+    substituem são descartadas; as demais continuam síncronas.
+    """
+    overridden = set()
+    if use_async:
+        from .routes.aio import categories as aio_categories, dashboard as aio_dashboard, goals as aio_goals
+        from .routes.aio import profile as aio_profile, transactions as aio_transactions
+        from .routes.aio import work_sessions as aio_work_sessions
+
+        for module, tag in [
+            (aio_transactions, "transactions"),
+            (aio_categories, "categories"),
+            (aio_goals, "goals"),
+            (aio_work_sessions, "work_sessions"),
+            (aio_profile, "profile"),
+            (aio_dashboard, "dashboard"),
+        ]:
+            app.include_router(module.router, prefix="/api", tags=[tag])
+            overridden.update((route.path, method) for route in module.router.routes for method in route.methods)
+
+    for module, tag in ROUTERS:
+        router = APIRouter()
+        router.routes = [
+            route for route in module.router.routes
+            if not any((route.path, method) in overridden for method in route.methods)
+        ]
+        app.include_router(router, prefix="/api", tags=[tag])
+
+
+include_routers(app, use_async=DB_ASYNC)
 
 @app.get("/")
 def read_root():
@@ -1,8 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import List, Optional, Union
+from typing import Any, Dict, Generic, List, Optional, TypeVar, Union
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
 
 
 # --- Schemas de Token ---
@@ -77,6 +77,8 @@ class TransactionBase(BaseModel):
     source: Optional[str] = None
     date: datetime
     category_id: int
+    # Identificador do cliente ou do extrato; único por usuário (reenvios são ignorados)
+    external_id: Optional[str] = Field(None, max_length=255)
 
 
 class TransactionCreate(TransactionBase):
@@ -86,6 +88,9 @@ class TransactionCreate(TransactionBase):
 class Transaction(TransactionBase):
     id: int
     user_id: int
+    # Linhas legadas podem não ter data nem categoria (colunas anuláveis)
+    date: Optional[datetime] = None
+    category_id: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -98,17 +103,57 @@ class WorkSessionBase(BaseModel):
     date: str  # Formato YYYY-MM-DD
 
 
+# Duração máxima de uma sessão criada por POST /work-sessions (um dia)
+MAX_SESSION_MINUTES = 24 * 60
+
+
+def _as_utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 class WorkSessionCreate(WorkSessionBase):
-    pass
+    @model_validator(mode="after")
+    def _check_minutes(self):
+        """
+        Com end_time, total_minutes é calculado dos horários (o valor enviado é
+        ignorado); sem ele, é o lançamento manual da duração. Em ambos os casos
+        a sessão fica entre 0 e MAX_SESSION_MINUTES, para não inflar metas e
+        conquistas.
+        """
+        if self.end_time is not None:
+            elapsed = _as_utc_naive(self.end_time) - _as_utc_naive(self.start_time)
+            if elapsed.total_seconds() < 0:
+                raise ValueError("end_time anterior ao início da sessão.")
+            self.total_minutes = int(elapsed.total_seconds() // 60)
+        if self.total_minutes is not None and not 0 <= self.total_minutes <= MAX_SESSION_MINUTES:
+            raise ValueError(f"total_minutes deve estar entre 0 e {MAX_SESSION_MINUTES}.")
+        return self
 
 
 class WorkSession(WorkSessionBase):
     id: int
     user_id: int
+    is_open: bool = False
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class WorkSessionStart(BaseModel):
+    start_time: Optional[datetime] = None  # Padrão: horário do servidor
+    date: Optional[str] = None  # Formato YYYY-MM-DD; padrão: data (UTC) do início
+
+
+class WorkSessionStop(BaseModel):
+    end_time: Optional[datetime] = None  # Padrão: horário do servidor
+
+
+class ActiveWorkSession(BaseModel):
+    session: Optional[WorkSession] = None
+    elapsed_minutes: Optional[int] = None
+
+
 # --- Schemas de Meta ---
 class GoalBase(BaseModel):
     title: str
@@ -172,7 +217,22 @@ class Achievement(BaseModel):
     goal: int
 
 class ActivityDay(BaseModel):
-    date: str
+    date: str  # 'YYYY-MM-DD' (na granularidade semanal, a segunda-feira)
+    minutes: int
+    sessions: int
+    earnings: Decimal
+    earnings_per_hour: Decimal
+
+class ActivitySummary(BaseModel):
+    start_date: date
+    end_date: date
+    granularity: str
+    days: List[ActivityDay]
+
+class ActivityCalendar(BaseModel):
+    start_date: date
+    end_date: date
+    minutes: List[int]  # Minutos trabalhados em cada dia, a partir de start_date
 
 class ProfileComprehensive(BaseModel):
     personal_info: User
@@ -180,4 +240,65 @@ class ProfileComprehensive(BaseModel):
     monthly_performance: List[MonthlyPerformance]
     platform_breakdown: List[PlatformBreakdown]
     achievements: List[Achievement]
-    # Adicionaremos o 'activity_calendar' diretamente no endpoint por simplicidade
\ No newline at end of file
+    activity_calendar: ActivityCalendar
+
+# --- Schemas de Importação de Extratos ---
+
+class ImportResult(BaseModel):
+    inserted: int
+    skipped: int
+
+# --- Schemas do Resumo por Período ---
+
+class SummaryBucket(BaseModel):
+    period: str  # Início do período: 'YYYY-MM-DDTHH:00', 'YYYY-MM-DD' (dia ou segunda-feira da semana) ou 'YYYY-MM'
+    category_id: Optional[int] = None  # Com group_by=category
+    group: Optional[str] = None  # Nome da categoria ou origem, com group_by
+    income: Decimal
+    expenses: Decimal
+    profit: Decimal
+    trips: int
+
+class TransactionSummary(BaseModel):
+    start_date: date
+    end_date: date
+    granularity: str
+    group_by: Optional[str] = None
+    buckets: List[SummaryBucket]
+
+# --- Schemas do Dashboard ---
+
+class DashboardSummary(BaseModel):
+    today_income: Decimal
+    today_expenses: Decimal
+    today_trips: int
+    today_minutes: int
+    month_income: Decimal
+    month_expenses: Decimal
+    month_profit: Decimal
+    month_trips: int
+
+class Dashboard(BaseModel):
+    # Todas as seções são opcionais: só as pedidas em `fields` são retornadas
+    user: Optional[User] = None
+    recent_transactions: Optional[List[Transaction]] = None
+    categories: Optional[List[Category]] = None
+    goals: Optional[List[Goal]] = None
+    today_sessions: Optional[List[WorkSession]] = None
+    summary: Optional[DashboardSummary] = None
+
+# --- Schemas de Criação em Lote ---
+
+BulkItemT = TypeVar("BulkItemT")
+
+class BulkItemResult(BaseModel, Generic[BulkItemT]):
+    index: int  # Posição do item na lista enviada
+    status: str  # 'created', 'duplicate' ou 'error'
+    item: Optional[BulkItemT] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+class BulkResult(BaseModel, Generic[BulkItemT]):
+    created: int
+    duplicates: int = 0
+    failed: int
+    results: List[BulkItemResult[BulkItemT]]
@@ -0,0 +1,5 @@
+"""
+Variantes assíncronas (AsyncSession) das rotas principais, usadas com
+DB_ASYNC=true. Cada módulo espelha o módulo síncrono de mesmo nome e reutiliza
+as consultas e serviços dele; rotas sem variante aqui continuam síncronas.
+"""
@@ -0,0 +1,46 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core import conditional, security
+from ...db import database, models
+from ...models import schemas
+from ...services import stats, versioning
+
+router = APIRouter()
+
+
+@router.post("/categories", response_model=schemas.Category, status_code=status.HTTP_201_CREATED)
+async def create_category(
+    category: schemas.CategoryCreate,
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    """
+    Cria uma nova categoria para o usuário autenticado.
+    """
+    db_category = models.Category(**category.model_dump(), user_id=current_user.id)
+    db.add(db_category)
+    await db.run_sync(versioning.bump_data_version, current_user.id)
+    await db.commit()
+    stats.invalidate_profile(current_user.id)
+    await db.refresh(db_category)
+    return db_category
+
+
+@router.get(
+    "/categories",
+    response_model=List[schemas.Category],
+    dependencies=[Depends(conditional.conditional_get_async())],
+)
+async def get_categories(
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    """
+    Retorna todas as categorias do usuário autenticado.
+    """
+    result = await db.scalars(select(models.Category).where(models.Category.user_id == current_user.id))
+    return result.all()
@@ -0,0 +1,37 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core import conditional, security
+from ...db import database, models
+from ...models import schemas
+from ...services import dashboard
+
+router = APIRouter()
+
+
+@router.get(
+    "/dashboard",
+    response_model=schemas.Dashboard,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(conditional.conditional_get_async(conditional.daily_scope))],
+)
+async def get_dashboard(
+    fields: Optional[str] = Query(
+        None,
+        description=f"Seções a retornar, separadas por vírgula ({', '.join(dashboard.SECTIONS)}). Padrão: todas",
+    ),
+    recent_limit: int = Query(dashboard.RECENT_TRANSACTIONS, ge=1, le=100, description="Número de transações recentes"),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    """
+    Mesmos dados da rota síncrona, com as seções consultadas concorrentemente
+    (uma sessão por seção, sobre a mesma engine da requisição).
+    """
+    try:
+        sections = dashboard.parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return await dashboard.build_dashboard_async(db.bind, current_user, sections, recent_limit)
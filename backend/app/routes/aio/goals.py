@@ -0,0 +1,41 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core import conditional, security
+from ...db import database, models
+from ...models import schemas
+from ...services import goals as goal_progress, versioning
+
+router = APIRouter()
+
+
+@router.post("/goals", response_model=schemas.Goal, status_code=status.HTTP_201_CREATED)
+async def create_goal(
+    goal: schemas.GoalCreate,
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    db_goal = models.Goal(**goal.model_dump(), user_id=current_user.id)
+    db.add(db_goal)
+    await db.flush()
+    await db.run_sync(goal_progress.recompute_goal, db_goal)
+    await db.run_sync(versioning.bump_data_version, current_user.id)
+    await db.commit()
+    await db.refresh(db_goal)
+    return goal_progress.goal_view(db_goal)
+
+
+@router.get(
+    "/goals",
+    response_model=List[schemas.Goal],
+    dependencies=[Depends(conditional.conditional_get_async(conditional.daily_scope))],
+)
+async def get_goals(
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    result = await db.scalars(select(models.Goal).where(models.Goal.user_id == current_user.id))
+    return [goal_progress.goal_view(goal) for goal in result.all()]
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core import conditional, security
+from ...db import database, models
+from ...services import achievements, activity, stats
+from ..profile import build_comprehensive_profile, serialize_profile
+
+router = APIRouter()
+
+profile_etag = conditional.conditional_get_async(conditional.daily_scope)
+
+
+@router.get(
+    "/profile/comprehensive",
+    tags=["Profile"],
+)
+async def get_comprehensive_profile(
+    response: Response,
+    data_version: int = Depends(profile_etag),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    """
+    Busca e calcula um perfil de dados abrangente para o usuário autenticado.
+    As agregações e o cache da resposta são os mesmos da rota síncrona.
+    """
+    body = stats.get_cached_profile(current_user.id, data_version)
+    if body is None:
+        profile = await db.run_sync(stats.compute_profile, current_user.id)
+        calendar = await db.run_sync(activity.profile_calendar, current_user.id)
+        unlocked = await db.run_sync(achievements.list_achievements, current_user.id)
+        body = serialize_profile(
+            build_comprehensive_profile(current_user, *profile, achievements=unlocked, activity_calendar=calendar)
+        )
+        stats.store_profile(current_user.id, data_version, body, current_user.trial_ends_at)
+    return conditional.cached_response(body, response)
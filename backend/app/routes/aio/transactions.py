@@ -0,0 +1,133 @@
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core import conditional, security
+from ...db import database, models
+from ...models import schemas
+from ...services import ledger, stats, summary
+from .. import transactions as sync_routes
+from ..transactions import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+router = APIRouter()
+
+
+@router.get(
+    "/transactions",
+    response_model=List[schemas.Transaction],
+    dependencies=[Depends(conditional.conditional_get_async())],
+)
+async def get_transactions(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Número de transações a retornar"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado no header X-Next-Cursor"),
+    offset: Optional[int] = Query(None, ge=0, deprecated=True, description="Número de transações a pular (prefira o cursor)"),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    """
+    Busca as transações do usuário, da mais recente para a mais antiga,
+    paginadas por cursor (header X-Next-Cursor).
+    """
+    stmt = sync_routes._page_statement(current_user.id, limit, cursor, offset)
+    transactions = (await db.scalars(stmt)).all()
+    return sync_routes._paginate(response, transactions, limit)
+
+
+@router.post("/transactions", response_model=schemas.Transaction, status_code=status.HTTP_201_CREATED)
+async def create_transaction(
+    transaction: schemas.TransactionCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=sync_routes.IDEMPOTENCY_HEADER, max_length=255),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    """
+    Cria uma nova transação. Com external_id (ou o header Idempotency-Key),
+    uma repetição devolve a transação já criada com status 200.
+    """
+    data = sync_routes._with_idempotency_key(transaction.model_dump(), idempotency_key)
+    db_transaction, created = await db.run_sync(sync_routes._create_transaction, current_user.id, data)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+        return db_transaction
+    # O RETURNING já trouxe todas as colunas: serializa antes do commit, sem refresh
+    result = schemas.Transaction.model_validate(db_transaction)
+    await db.commit()
+    stats.invalidate_profile(current_user.id)
+    await db.run_sync(ledger.refresh, current_user.id)
+    return result
+
+
+@router.get(
+    "/transactions/summary",
+    response_model=schemas.TransactionSummary,
+    dependencies=[Depends(conditional.conditional_get_async())],
+)
+async def get_transactions_summary(
+    start_date: date,
+    end_date: date,
+    granularity: Literal["hour", "day", "week", "month"] = Query("day", description="Tamanho de cada período"),
+    group_by: Optional[Literal["category", "source"]] = Query(None, description="Separa cada período por categoria ou origem"),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    """
+    Receitas, despesas, lucro e corridas por período entre as datas (inclusivas),
+    calculados no banco.
+    """
+    buckets = await db.run_sync(summary.summarize, current_user.id, start_date, end_date, granularity, group_by)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "granularity": granularity,
+        "group_by": group_by,
+        "buckets": buckets,
+    }
+
+
+@router.get("/transactions/date-range", response_model=List[schemas.Transaction])
+async def get_transactions_by_date_range(
+    start_date: date,
+    end_date: date,
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    """
+    Busca transações dentro de um período específico.
+    """
+    result = await db.scalars(sync_routes._date_range_statement(current_user.id, start_date, end_date))
+    return result.all()
+
+
+async def _aiter_export(db: AsyncSession, user_id: int, start_date, end_date, format: str):
+    """Mesmo conteúdo de `_iter_ndjson`/`_iter_csv`, lido com um cursor assíncrono."""
+    if format == "csv":
+        yield sync_routes._csv_chunk([], header=True)
+    chunk = sync_routes._csv_chunk if format == "csv" else sync_routes._ndjson_chunk
+    result = await db.stream(sync_routes._export_statement(user_id, start_date, end_date))
+    async for batch in result.mappings().partitions():
+        yield chunk(batch)
+
+
+@router.get("/transactions/export")
+async def export_transactions(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Formato do arquivo exportado"),
+    start_date: Optional[date] = Query(None, description="Data inicial (inclusiva)"),
+    end_date: Optional[date] = Query(None, description="Data final (inclusiva)"),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    """
+    Exporta o histórico de transações em NDJSON ou CSV via streaming.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"transacoes.{format}"
+    return StreamingResponse(
+        _aiter_export(db, current_user.id, start_date, end_date, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,43 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core import conditional, security
+from ...db import database, models
+from ...models import schemas
+from ...services import achievements, goals as goal_progress, rollups, stats, versioning
+
+router = APIRouter()
+
+
+@router.post("/work-sessions", response_model=schemas.WorkSession, status_code=status.HTTP_201_CREATED)
+async def create_work_session(
+    session: schemas.WorkSessionCreate,
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    db_session = models.WorkSession(**session.model_dump(), user_id=current_user.id)
+    db.add(db_session)
+    await db.run_sync(rollups.apply_work_sessions, current_user.id, [db_session])
+    await db.run_sync(goal_progress.apply_work_sessions, current_user.id, [db_session])
+    await db.run_sync(achievements.apply_work_sessions, current_user.id, [db_session])
+    await db.run_sync(versioning.bump_data_version, current_user.id)
+    await db.commit()
+    stats.invalidate_profile(current_user.id)
+    await db.refresh(db_session)
+    return db_session
+
+
+@router.get(
+    "/work-sessions",
+    response_model=List[schemas.WorkSession],
+    dependencies=[Depends(conditional.conditional_get_async())],
+)
+async def get_work_sessions(
+    db: AsyncSession = Depends(database.get_async_db),
+    current_user: models.User = Depends(security.get_current_active_user_async),
+):
+    result = await db.scalars(select(models.WorkSession).where(models.WorkSession.user_id == current_user.id))
+    return result.all()
@@ -1,7 +1,10 @@
 from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from ..core import security
@@ -11,11 +14,7 @@ from ..models import schemas
 router = APIRouter()
 
 
-@router.post("/auth/register", response_model=schemas.User)
-def register_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
-    """
-    Registra um novo usuário no sistema.
-    """
+def _ensure_user_available(db: Session, user: schemas.UserCreate) -> None:
     db_user_by_username = (
         db.query(models.User).filter(models.User.username == user.username).first()
     )
@@ -31,8 +30,11 @@ def register_user(user: schemas.UserCreate, db: Session = Depends(database.get_d
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email já está em uso.",
         )
+    # Libera a conexão enquanto o hash da senha é gerado
+    db.close()
 
-    hashed_password = security.get_password_hash(user.password)
+
+def _create_user(db: Session, user: schemas.UserCreate, hashed_password: str) -> models.User:
     # Exclui o campo 'password' do dicionário antes de criar o modelo
     user_data = user.model_dump(exclude={"password"})
     db_user = models.User(**user_data, password=hashed_password)
@@ -40,6 +42,43 @@ def register_user(user: schemas.UserCreate, db: Session = Depends(database.get_d
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    return db_user
+
+
+def _find_credentials(db: Session, username_or_email: str) -> Optional[Tuple[int, str, str]]:
+    """
+    Retorna (id, username, hash da senha) e libera a conexão da sessão, para
+    que ela não fique presa enquanto o bcrypt roda.
+    """
+    row = (
+        db.query(models.User.id, models.User.username, models.User.password)
+        .filter(
+            or_(
+                models.User.username == username_or_email,
+                models.User.email == username_or_email,
+            )
+        )
+        .first()
+    )
+    db.close()
+    return tuple(row) if row else None
+
+
+def _update_password_hash(db: Session, user_id: int, new_hash: str) -> None:
+    db.query(models.User).filter(models.User.id == user_id).update({"password": new_hash})
+    db.commit()
+
+
+@router.post("/auth/register", response_model=schemas.User)
+async def register_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
+    """
+    Registra um novo usuário no sistema.
+    O hash da senha é gerado no pool de processos do bcrypt e o acesso ao
+    banco roda no threadpool, fora do event loop.
+    """
+    await run_in_threadpool(_ensure_user_available, db, user)
+    hashed_password = await security.get_password_hash_async(user.password)
+    db_user = await run_in_threadpool(_create_user, db, user, hashed_password)
 
     # Lógica para determinar o status do plano
     now = datetime.now(timezone.utc)
@@ -54,28 +93,32 @@ def register_user(user: schemas.UserCreate, db: Session = Depends(database.get_d
 
 
 @router.post("/auth/token", response_model=schemas.Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(database.get_db),
 ):
     """
     Autentica o usuário e retorna um token de acesso.
+    Hashes gerados com parâmetros antigos são refeitos de forma transparente.
     """
-    
-    
-    
-    user = db.query(models.User).filter(models.User.username == form_data.username or models.User.email == form_data.username).first()
-    
-    if not user or not security.verify_password(form_data.password, user.password):
+    credentials = await run_in_threadpool(_find_credentials, db, form_data.username)
+
+    valid, new_hash = False, None
+    if credentials:
+        user_id, username, hashed_password = credentials
+        valid, new_hash = await security.verify_password_async(form_data.password, hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário ou senha incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        await run_in_threadpool(_update_password_hash, db, user_id, new_hash)
 
     access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": username}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
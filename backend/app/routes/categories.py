@@ -3,9 +3,10 @@ from typing import List
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 
-from ..core import security
+from ..core import conditional, security
 from ..db import database, models
 from ..models import schemas
+from ..services import stats, versioning
 
 router = APIRouter()
 
@@ -21,12 +22,18 @@ def create_category(
     """
     db_category = models.Category(**category.model_dump(), user_id=current_user.id)
     db.add(db_category)
+    versioning.bump_data_version(db, current_user.id)
     db.commit()
+    stats.invalidate_profile(current_user.id)
     db.refresh(db_category)
     return db_category
 
 
-@router.get("/categories", response_model=List[schemas.Category])
+@router.get(
+    "/categories",
+    response_model=List[schemas.Category],
+    dependencies=[Depends(conditional.conditional_get())],
+)
 def get_categories(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(security.get_current_active_user),
@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ..core import conditional, security
+from ..db import database, models
+from ..models import schemas
+from ..services import dashboard
+
+router = APIRouter()
+
+
+@router.get(
+    "/dashboard",
+    response_model=schemas.Dashboard,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(conditional.conditional_get(conditional.daily_scope))],
+)
+def get_dashboard(
+    fields: Optional[str] = Query(
+        None,
+        description=f"Seções a retornar, separadas por vírgula ({', '.join(dashboard.SECTIONS)}). Padrão: todas",
+    ),
+    recent_limit: int = Query(dashboard.RECENT_TRANSACTIONS, ge=1, le=100, description="Número de transações recentes"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """
+    Retorna os dados da primeira tela em uma única requisição: usuário,
+    transações recentes, categorias, metas ativas, sessões de hoje e totais
+    do dia e do mês. Use `fields` para receber apenas as seções exibidas.
+    """
+    try:
+        sections = dashboard.parse_fields(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return dashboard.build_dashboard(db, current_user, sections, recent_limit)
@@ -1,9 +1,10 @@
-from typing import List
-from fastapi import APIRouter, Depends, status
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body, Depends, status
 from sqlalchemy.orm import Session
-from ..core import security
+from ..core import conditional, security
 from ..db import database, models
 from ..models import schemas
+from ..services import bulk, goals as goal_progress, versioning
 
 router = APIRouter()
 
@@ -15,15 +16,45 @@ def create_goal(
 ):
     db_goal = models.Goal(**goal.model_dump(), user_id=current_user.id)
     db.add(db_goal)
+    db.flush()
+    # Progresso inicial a partir do histórico do período corrente
+    goal_progress.recompute_goal(db, db_goal)
+    versioning.bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(db_goal)
-    return db_goal
+    return goal_progress.goal_view(db_goal)
 
-@router.get("/goals", response_model=List[schemas.Goal])
+@router.post(
+    "/goals/bulk",
+    response_model=schemas.BulkResult[schemas.Goal],
+    status_code=status.HTTP_201_CREATED,
+)
+def create_goals_bulk(
+    items: List[Dict[str, Any]] = Body(..., description="Metas no formato de POST /goals"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """Cria várias metas em uma única transação do banco."""
+    valid, errors = bulk.validate_items(items, schemas.GoalCreate)
+    rows = [{**item.model_dump(), "user_id": current_user.id} for _, item in valid]
+    created = bulk.insert_returning(db, models.Goal, rows)
+    if created:
+        for goal in created:
+            goal_progress.recompute_goal(db, goal)
+        versioning.bump_data_version(db, current_user.id)
+        db.commit()
+    views = [goal_progress.goal_view(goal) for goal in created]
+    return bulk.build_result(list(zip((index for index, _ in valid), views)), errors)
+
+@router.get(
+    "/goals",
+    response_model=List[schemas.Goal],
+    dependencies=[Depends(conditional.conditional_get(conditional.daily_scope))],
+)
 def get_goals(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(security.get_current_active_user),
 ):
-    # A lógica de cálculo de progresso em tempo real pode ser adicionada aqui
+    # O progresso é mantido nas escritas (app/services/goals.py); aqui é só leitura
     goals = db.query(models.Goal).filter(models.Goal.user_id == current_user.id).all()
-    return goals
\ No newline at end of file
+    return [goal_progress.goal_view(goal) for goal in goals]
\ No newline at end of file
@@ -0,0 +1,30 @@
+import os
+import secrets
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from ..core import cache
+from ..db import database
+
+router = APIRouter()
+
+# Token de operação exigido no cabeçalho X-Metrics-Token. As métricas cobrem
+# todos os usuários do processo, então a rota fica desativada (404) sem ele.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+def require_metrics_token(x_metrics_token: Optional[str] = Header(None)) -> None:
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_metrics_token or not secrets.compare_digest(x_metrics_token, METRICS_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token de métricas inválido.")
+
+
+@router.get("/metrics", dependencies=[Depends(require_metrics_token)])
+def read_metrics() -> Dict[str, Any]:
+    """
+    Retorna métricas internas da API (acertos dos caches e uso dos pools de
+    conexão). Restrita à operação: exige o cabeçalho X-Metrics-Token.
+    """
+    return {"caches": cache.all_stats(), "database": database.pool_stats()}
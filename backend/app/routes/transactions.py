@@ -1,51 +1,268 @@
-from datetime import date
-from typing import List, Optional
+import csv
+import io
+import itertools
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Body, Depends, File, Form, Header, HTTPException, Query, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
 
-from ..core import security
+from ..core import conditional, security
 from ..db import database, models
 from ..models import schemas
+from ..services import bulk, imports, ledger, stats, summary, versioning
+from ..utils import pagination, utils
 
 router = APIRouter()
 
+# Tamanho de página padrão e máximo de GET /api/transactions
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
-@router.get("/transactions", response_model=List[schemas.Transaction])
+# CSVs acima deste tamanho (em bytes) são importados em streaming
+STREAMING_IMPORT_THRESHOLD = int(os.getenv("STREAMING_IMPORT_THRESHOLD", 5 * 1024 * 1024))
+
+
+def _page_statement(user_id: int, limit: int, cursor: Optional[str], offset: Optional[int]):
+    """
+    SELECT de uma página de transações (keyset em data, id), com um item a mais.
+    Transações sem data (legadas) vêm primeiro, na mesma ordem do índice
+    (date DESC tem NULLS FIRST no PostgreSQL); o SQLite recebe a ordem explícita.
+    """
+    stmt = (
+        select(models.Transaction)
+        .where(models.Transaction.user_id == user_id)
+        .order_by(models.Transaction.date.desc().nulls_first(), models.Transaction.id)
+    )
+
+    if cursor:
+        try:
+            last_date, last_id = pagination.decode_cursor(cursor)
+        except pagination.InvalidCursor as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        if last_date is None:
+            stmt = stmt.where(
+                or_(
+                    and_(models.Transaction.date.is_(None), models.Transaction.id > last_id),
+                    models.Transaction.date.is_not(None),
+                )
+            )
+        else:
+            stmt = stmt.where(
+                or_(
+                    models.Transaction.date < last_date,
+                    and_(models.Transaction.date == last_date, models.Transaction.id > last_id),
+                )
+            )
+    elif offset:
+        stmt = stmt.offset(offset)
+
+    # Busca um item a mais para saber se existe uma próxima página
+    return stmt.limit(limit + 1)
+
+
+def _paginate(response: Response, transactions, limit: int):
+    """Corta o item extra e publica o cursor da próxima página no header."""
+    transactions = list(transactions)
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        response.headers[NEXT_CURSOR_HEADER] = pagination.encode_cursor(last.date, last.id)
+    return transactions
+
+
+@router.get(
+    "/transactions",
+    response_model=List[schemas.Transaction],
+    dependencies=[Depends(conditional.conditional_get())],
+)
 def get_transactions(
-    limit: Optional[int] = Query(None, description="Número de transações a retornar"),
-    offset: Optional[int] = Query(None, description="Número de transações a pular"),
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Número de transações a retornar"),
+    cursor: Optional[str] = Query(None, description="Cursor opaco retornado no header X-Next-Cursor"),
+    offset: Optional[int] = Query(None, ge=0, deprecated=True, description="Número de transações a pular (prefira o cursor)"),
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(security.get_current_active_user),
 ):
     """
-    Busca as transações do usuário com paginação opcional.
+    Busca as transações do usuário, da mais recente para a mais antiga.
+    A paginação é por cursor (keyset em data, id): o cursor da próxima página
+    é retornado no header X-Next-Cursor, ausente na última página. O cursor
+    fica no header, e não no corpo, para que a resposta continue sendo a lista
+    de transações esperada pelos clientes atuais.
     """
-    query = db.query(models.Transaction).filter(models.Transaction.user_id == current_user.id)
-    
-    if offset:
-        query = query.offset(offset)
-    if limit:
-        query = query.limit(limit)
-        
-    transactions = query.order_by(models.Transaction.date.desc()).all()
-    return transactions
+    stmt = _page_statement(current_user.id, limit, cursor, offset)
+    transactions = db.scalars(stmt).all()
+    return _paginate(response, transactions, limit)
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Prefixo das chaves de idempotência no external_id, separando-as dos ids da
+# importação de extratos (uma chave do cliente nunca coincide com uma corrida importada)
+IDEMPOTENCY_PREFIX = "idem:"
+
+
+def _with_idempotency_key(data: dict, key: Optional[str]) -> dict:
+    """O Idempotency-Key (com o prefixo) vira o external_id quando o corpo não traz um."""
+    if key and not data.get("external_id"):
+        return {**data, "external_id": f"{IDEMPOTENCY_PREFIX}{key}"}
+    return data
+
+
+def _create_transaction(db: Session, user_id: int, data: dict) -> Tuple[models.Transaction, bool]:
+    """
+    Insere a transação, ou devolve a já gravada com o mesmo external_id.
+    A criação é um único INSERT ... ON CONFLICT DO NOTHING RETURNING; a busca
+    pela transação existente só acontece no conflito (repetição).
+    Retorna (transação, criada). Não faz commit.
+    """
+    transaction = imports.insert_transactions(db, user_id, [data])[0]
+    if transaction is None:
+        return imports.find_by_external_ids(db, user_id, [data["external_id"]])[data["external_id"]], False
+    versioning.bump_data_version(db, user_id)
+    return transaction, True
 
 
 @router.post("/transactions", response_model=schemas.Transaction, status_code=status.HTTP_201_CREATED)
 def create_transaction(
     transaction: schemas.TransactionCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(security.get_current_active_user),
 ):
     """
-    Cria uma nova transação.
+    Cria uma nova transação. Com external_id (ou o header Idempotency-Key),
+    uma repetição devolve a transação já criada com status 200.
     """
-    db_transaction = models.Transaction(**transaction.model_dump(), user_id=current_user.id)
-    db.add(db_transaction)
+    data = _with_idempotency_key(transaction.model_dump(), idempotency_key)
+    db_transaction, created = _create_transaction(db, current_user.id, data)
+    if not created:
+        response.status_code = status.HTTP_200_OK
+        return db_transaction
+    # O RETURNING já trouxe todas as colunas: serializa antes do commit, sem refresh
+    result = schemas.Transaction.model_validate(db_transaction)
     db.commit()
-    db.refresh(db_transaction)
-    return db_transaction
+    stats.invalidate_profile(current_user.id)
+    ledger.refresh(db, current_user.id)
+    return result
+
+
+@router.post(
+    "/transactions/bulk",
+    response_model=schemas.BulkResult[schemas.Transaction],
+    status_code=status.HTTP_201_CREATED,
+)
+def create_transactions_bulk(
+    items: List[Dict[str, Any]] = Body(..., description="Transações no formato de POST /transactions"),
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """
+    Cria várias transações em uma única transação do banco (sincronização offline).
+    Itens inválidos são reportados individualmente e não impedem os demais; itens
+    já gravados (mesmo external_id) são reportados como duplicados. Com o header
+    Idempotency-Key, cada item sem external_id usa a chave seguida da sua posição.
+    """
+    valid, errors = bulk.validate_items(items, schemas.TransactionCreate)
+    rows = [
+        _with_idempotency_key(item.model_dump(), f"{idempotency_key}:{index}" if idempotency_key else None)
+        for index, item in valid
+    ]
+    inserted = imports.insert_transactions(db, current_user.id, rows)
+
+    created, duplicates = [], []
+    for (index, _), row, transaction in zip(valid, rows, inserted):
+        if transaction is None:
+            duplicates.append((index, row["external_id"]))
+        else:
+            created.append((index, transaction))
+    if duplicates:
+        existing = imports.find_by_external_ids(db, current_user.id, (ext_id for _, ext_id in duplicates))
+        duplicates = [(index, existing.get(ext_id)) for index, ext_id in duplicates]
+    if created:
+        versioning.bump_data_version(db, current_user.id)
+        db.commit()
+        stats.invalidate_profile(current_user.id)
+        ledger.refresh(db, current_user.id)
+    return bulk.build_result(created, errors, duplicates)
+
+
+@router.post("/transactions/import", response_model=schemas.ImportResult, status_code=status.HTTP_201_CREATED)
+async def import_statement(
+    file: UploadFile = File(..., description="Extrato em CSV, XLSX ou PDF"),
+    platform: Optional[str] = Form(None, description="Plataforma do CSV: uber, 99 ou indrive"),
+    category_id: Optional[int] = Form(None, description="Categoria para todas as linhas (padrão: uma por plataforma)"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """
+    Importa um extrato de plataforma, inserindo as corridas em lote e
+    ignorando as que já foram importadas (mesmo external_id).
+    CSVs grandes são lidos em blocos, sem carregar o arquivo inteiro na memória,
+    e PDFs são extraídos em paralelo por páginas num pool de processos.
+    O trabalho síncrono (parsing e banco) roda fora do event loop.
+    """
+    if category_id is not None and not await run_in_threadpool(
+        imports.owns_category, db, current_user.id, category_id
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria não encontrada.")
+
+    filename = (file.filename or "").lower()
+    try:
+        if filename.endswith(".pdf"):
+            rows = await utils.parse_pdf_async(await file.read())
+        elif filename.endswith(".csv") and (file.size or 0) > STREAMING_IMPORT_THRESHOLD:
+            batches = await run_in_threadpool(utils.iter_csv_batches, file.file, platform)
+            rows = itertools.chain.from_iterable(batches)
+        else:
+            rows = await run_in_threadpool(utils.parse_statement, file.filename, await file.read(), platform)
+        inserted, skipped = await run_in_threadpool(
+            imports.import_transactions, db, current_user.id, rows, category_id
+        )
+    except ValueError as exc:
+        # import_transactions já descartou o que tinha gravado
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if inserted:
+        stats.invalidate_profile(current_user.id)
+        await run_in_threadpool(ledger.refresh, db, current_user.id)
+
+    return {"inserted": inserted, "skipped": skipped}
+
+
+@router.get(
+    "/transactions/summary",
+    response_model=schemas.TransactionSummary,
+    dependencies=[Depends(conditional.conditional_get())],
+)
+def get_transactions_summary(
+    start_date: date,
+    end_date: date,
+    granularity: Literal["hour", "day", "week", "month"] = Query("day", description="Tamanho de cada período"),
+    group_by: Optional[Literal["category", "source"]] = Query(None, description="Separa cada período por categoria ou origem"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """
+    Receitas, despesas, lucro e corridas por período entre as datas (inclusivas),
+    calculados no banco. Períodos sem transações são omitidos.
+    """
+    buckets = summary.summarize(db, current_user.id, start_date, end_date, granularity, group_by)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "granularity": granularity,
+        "group_by": group_by,
+        "buckets": buckets,
+    }
 
 
 @router.get("/transactions/date-range", response_model=List[schemas.Transaction])
@@ -58,14 +275,104 @@ def get_transactions_by_date_range(
     """
     Busca transações dentro de um período específico.
     """
-    transactions = (
-        db.query(models.Transaction)
-        .filter(
-            models.Transaction.user_id == current_user.id,
+    return db.scalars(_date_range_statement(current_user.id, start_date, end_date)).all()
+
+
+def _date_range_statement(user_id: int, start_date: date, end_date: date):
+    return (
+        select(models.Transaction)
+        .where(
+            models.Transaction.user_id == user_id,
             models.Transaction.date >= start_date,
             models.Transaction.date <= end_date,
         )
         .order_by(models.Transaction.date.desc())
-        .all()
     )
-    return transactions
\ No newline at end of file
+
+EXPORT_COLUMNS = ["id", "user_id", "category_id", "amount", "description", "type", "source", "external_id", "date"]
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_statement(user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    stmt = (
+        select(*(getattr(models.Transaction, col) for col in EXPORT_COLUMNS))
+        .where(models.Transaction.user_id == user_id)
+        .order_by(models.Transaction.date.desc(), models.Transaction.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if start_date:
+        stmt = stmt.where(models.Transaction.date >= start_date)
+    if end_date:
+        stmt = stmt.where(models.Transaction.date <= end_date)
+    return stmt
+
+
+def _export_rows(db: Session, user_id: int, start_date: Optional[date], end_date: Optional[date]):
+    """
+    Lê as transações com um cursor do lado do servidor (yield_per), em lotes,
+    sem carregar objetos ORM nem o histórico inteiro em memória.
+    """
+    return db.execute(_export_statement(user_id, start_date, end_date)).mappings().partitions()
+
+
+def _serialize_value(value):
+    """Serializa como o Pydantic faz no JSON da API (Decimal como string, datas em ISO)."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _ndjson_chunk(batch) -> str:
+    return "".join(
+        json.dumps({col: _serialize_value(row[col]) for col in EXPORT_COLUMNS}, ensure_ascii=False) + "\n"
+        for row in batch
+    )
+
+
+def _csv_chunk(batch, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows([_serialize_value(row[col]) for col in EXPORT_COLUMNS] for row in batch)
+    return buffer.getvalue()
+
+
+def _iter_ndjson(batches):
+    for batch in batches:
+        yield _ndjson_chunk(batch)
+
+
+def _iter_csv(batches):
+    # O cabeçalho sai mesmo quando não há transações
+    yield _csv_chunk([], header=True)
+    for batch in batches:
+        yield _csv_chunk(batch)
+
+
+@router.get("/transactions/export")
+def export_transactions(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Formato do arquivo exportado"),
+    start_date: Optional[date] = Query(None, description="Data inicial (inclusiva)"),
+    end_date: Optional[date] = Query(None, description="Data final (inclusiva)"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """
+    Exporta o histórico de transações em NDJSON ou CSV via streaming.
+    O uso de memória é constante, independente do tamanho do histórico.
+    """
+    batches = _export_rows(db, current_user.id, start_date, end_date)
+    if format == "csv":
+        content, media_type = _iter_csv(batches), "text/csv"
+    else:
+        content, media_type = _iter_ndjson(batches), "application/x-ndjson"
+
+    filename = f"transacoes.{format}"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,9 +1,11 @@
-from typing import List
-from fastapi import APIRouter, Depends, status
+from datetime import date
+from typing import Any, Dict, List, Literal
+from fastapi import APIRouter, Body, Depends, Query, status
 from sqlalchemy.orm import Session
-from ..core import security
+from ..core import conditional, security
 from ..db import database, models
 from ..models import schemas
+from ..services import achievements, activity, bulk, goals as goal_progress, rollups, stats, versioning, work_sessions
 
 router = APIRouter()
 
@@ -15,14 +17,105 @@ def create_work_session(
 ):
     db_session = models.WorkSession(**session.model_dump(), user_id=current_user.id)
     db.add(db_session)
+    rollups.apply_work_sessions(db, current_user.id, [db_session])
+    goal_progress.apply_work_sessions(db, current_user.id, [db_session])
+    achievements.apply_work_sessions(db, current_user.id, [db_session])
+    versioning.bump_data_version(db, current_user.id)
     db.commit()
+    stats.invalidate_profile(current_user.id)
     db.refresh(db_session)
     return db_session
 
-@router.get("/work-sessions", response_model=List[schemas.WorkSession])
+@router.post(
+    "/work-sessions/bulk",
+    response_model=schemas.BulkResult[schemas.WorkSession],
+    status_code=status.HTTP_201_CREATED,
+)
+def create_work_sessions_bulk(
+    items: List[Dict[str, Any]] = Body(..., description="Sessões no formato de POST /work-sessions"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """Cria várias sessões de trabalho em uma única transação do banco."""
+    valid, errors = bulk.validate_items(items, schemas.WorkSessionCreate)
+    rows = [{**item.model_dump(), "user_id": current_user.id} for _, item in valid]
+    created = bulk.insert_returning(db, models.WorkSession, rows)
+    if created:
+        rollups.apply_work_sessions(db, current_user.id, rows)
+        goal_progress.apply_work_sessions(db, current_user.id, rows)
+        achievements.apply_work_sessions(db, current_user.id, rows)
+        versioning.bump_data_version(db, current_user.id)
+        db.commit()
+        stats.invalidate_profile(current_user.id)
+    return bulk.build_result(list(zip((index for index, _ in valid), created)), errors)
+
+@router.post("/work-sessions/start", response_model=schemas.WorkSession, status_code=status.HTTP_201_CREATED)
+def start_work_session(
+    start: schemas.WorkSessionStart = Body(default_factory=schemas.WorkSessionStart),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """Abre uma sessão de trabalho. Só pode haver uma aberta por usuário (409)."""
+    return work_sessions.start_session(db, current_user.id, start)
+
+@router.post("/work-sessions/stop", response_model=schemas.WorkSession)
+def stop_work_session(
+    stop: schemas.WorkSessionStop = Body(default_factory=schemas.WorkSessionStop),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """Encerra a sessão aberta; total_minutes é calculado pelo servidor."""
+    return work_sessions.stop_session(db, current_user.id, stop)
+
+@router.get("/work-sessions/active", response_model=schemas.ActiveWorkSession)
+def get_active_work_session(
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """Sessão aberta do usuário (ou nula) e os minutos decorridos, sem ler o histórico."""
+    return work_sessions.get_active_session(db, current_user.id)
+
+@router.get(
+    "/work-sessions",
+    response_model=List[schemas.WorkSession],
+    dependencies=[Depends(conditional.conditional_get())],
+)
 def get_work_sessions(
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(security.get_current_active_user),
 ):
     sessions = db.query(models.WorkSession).filter(models.WorkSession.user_id == current_user.id).all()
-    return sessions
\ No newline at end of file
+    return sessions
+
+@router.get(
+    "/work-sessions/activity",
+    response_model=schemas.ActivitySummary,
+    dependencies=[Depends(conditional.conditional_get())],
+)
+def get_work_session_activity(
+    start_date: date,
+    end_date: date,
+    granularity: Literal["day", "week"] = Query("day", description="Agrupamento por dia ou semana"),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """
+    Minutos, sessões, ganhos e ganhos por hora de cada dia (ou semana) com
+    atividade entre as datas (inclusivas), calculados no banco.
+    """
+    days = activity.daily_activity(db, current_user.id, start_date, end_date, granularity)
+    return {"start_date": start_date, "end_date": end_date, "granularity": granularity, "days": days}
+
+@router.get(
+    "/work-sessions/calendar",
+    response_model=schemas.ActivityCalendar,
+    dependencies=[Depends(conditional.conditional_get())],
+)
+def get_activity_calendar(
+    start_date: date,
+    end_date: date,
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(security.get_current_active_user),
+):
+    """Calendário de atividade: minutos trabalhados em cada dia do intervalo."""
+    return activity.activity_calendar(db, current_user.id, start_date, end_date)
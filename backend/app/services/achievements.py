@@ -0,0 +1,171 @@
+"""
+Motor de conquistas.
+
+As conquistas são definidas como dados em `DEFINITIONS`: cada uma acompanha
+uma métrica (corridas, ganhos ou minutos trabalhados) até uma meta. O progresso
+de cada usuário fica em `user_achievements`, mantido incrementalmente pelas
+rotas de escrita (`apply_transactions` / `apply_work_sessions`, na mesma
+transação dos registros), e o horário em que a meta foi alcançada é gravado
+uma única vez em `unlocked_at`.
+
+A leitura é uma única consulta pelo índice (user_id, achievement_id); novas
+definições não deixam o perfil mais lento. Ao criar uma definição, rode
+`python -m app.cli rebuild-achievements` para gravar o progresso do histórico.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from ..db import models
+from ..db.database import dialect_insert
+from ..models import schemas
+from ..utils.records import get_field
+
+METRICS = ("trips", "earnings", "minutes")
+
+
+@dataclass(frozen=True)
+class AchievementDefinition:
+    id: int
+    title: str
+    description: str
+    metric: str  # Um de METRICS
+    goal: int  # Meta exibida, na unidade da conquista
+    unit: int = 1  # Quantas unidades da métrica valem uma unidade da meta (ex.: 60 minutos = 1 hora)
+
+    @property
+    def threshold(self) -> Decimal:
+        """Meta na unidade da métrica."""
+        return Decimal(self.goal * self.unit)
+
+
+DEFINITIONS = (
+    AchievementDefinition(1, "Primeira Centena", "Complete 100 corridas", "trips", 100),
+    AchievementDefinition(2, "Estrela de Ouro", "Alcance R$ 1.000 em ganhos", "earnings", 1000),
+    AchievementDefinition(3, "Maratonista", "Trabalhe 100+ horas", "minutes", 100, unit=60),
+    AchievementDefinition(4, "Especialista", "Complete 500 corridas", "trips", 500),
+)
+
+
+def _apply(db: Session, user_id: int, deltas: Dict[str, Decimal], replace: bool = False) -> None:
+    """
+    Soma (ou, com `replace`, substitui) o progresso das conquistas das métricas
+    informadas, num único INSERT ... ON CONFLICT. Quem cruza a meta recebe
+    `unlocked_at`, que não muda mais.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "achievement_id": definition.id,
+            "progress": deltas[definition.metric],
+            "goal": definition.threshold,
+            "unlocked_at": now if deltas[definition.metric] >= definition.threshold else None,
+            "updated_at": now,
+        }
+        for definition in DEFINITIONS
+        if definition.metric in deltas
+    ]
+    if not rows:
+        return
+
+    table = models.UserAchievement
+    stmt = dialect_insert(db, table).values(rows)
+    progress = stmt.excluded.progress if replace else table.progress + stmt.excluded.progress
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "achievement_id"],
+        set_={
+            "progress": progress,
+            "goal": stmt.excluded.goal,
+            "unlocked_at": func.coalesce(
+                table.unlocked_at, case((progress >= stmt.excluded.goal, stmt.excluded.updated_at), else_=None)
+            ),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def apply_transactions(db: Session, user_id: int, transactions: Iterable[Any]) -> None:
+    """Soma corridas e ganhos das transações de receita informadas. Não faz commit."""
+    trips, earnings = 0, Decimal(0)
+    for t in transactions:
+        if get_field(t, "type") == "income":
+            trips += 1
+            earnings += Decimal(get_field(t, "amount"))
+    if trips:
+        _apply(db, user_id, {"trips": Decimal(trips), "earnings": earnings})
+
+
+def apply_work_sessions(db: Session, user_id: int, sessions: Iterable[Any]) -> None:
+    """Soma os minutos trabalhados das sessões informadas. Não faz commit."""
+    minutes = sum(get_field(ws, "total_minutes") or 0 for ws in sessions)
+    if minutes:
+        _apply(db, user_id, {"minutes": Decimal(minutes)})
+
+
+def history_totals(db: Session, user_id: int) -> Dict[str, Decimal]:
+    """Valor de cada métrica a partir do histórico completo (GROUP BY no banco)."""
+    trips, earnings = db.execute(
+        select(func.count(models.Transaction.id), func.sum(models.Transaction.amount)).where(
+            models.Transaction.user_id == user_id, models.Transaction.type == "income"
+        )
+    ).one()
+    minutes = db.scalar(
+        select(func.sum(models.WorkSession.total_minutes)).where(models.WorkSession.user_id == user_id)
+    )
+    return {"trips": Decimal(trips or 0), "earnings": earnings or Decimal(0), "minutes": Decimal(minutes or 0)}
+
+
+def rebuild_user_achievements(db: Session, user_id: int) -> None:
+    """Recalcula o progresso a partir do histórico, mantendo os unlocked_at já gravados. Não faz commit."""
+    _apply(db, user_id, history_totals(db, user_id), replace=True)
+
+
+def rebuild_all_achievements(db: Session, user_id: Optional[int] = None) -> int:
+    """Recalcula as conquistas de um usuário ou de todos. Retorna quantos usuários foram processados."""
+    query = db.query(models.User.id)
+    if user_id is not None:
+        query = query.filter(models.User.id == user_id)
+
+    user_ids = [row.id for row in query.all()]
+    for uid in user_ids:
+        rebuild_user_achievements(db, uid)
+        db.commit()
+    return len(user_ids)
+
+
+def list_achievements(db: Session, user_id: int) -> List[schemas.Achievement]:
+    """
+    Conquistas do usuário, na ordem das definições. O histórico anterior ao
+    motor foi gravado pela migração f3b6d0e8a925, e toda escrita depois dela
+    grava as linhas da métrica: conquista sem linha ainda não tem progresso.
+    """
+    rows = {
+        row.achievement_id: row
+        for row in db.scalars(select(models.UserAchievement).where(models.UserAchievement.user_id == user_id))
+    }
+
+    achievements = []
+    for definition in DEFINITIONS:
+        row = rows.get(definition.id)
+        if row is not None:
+            progress, unlocked_at = Decimal(row.progress), row.unlocked_at
+        else:
+            progress, unlocked_at = Decimal(0), None
+        achievements.append(
+            schemas.Achievement(
+                id=definition.id,
+                title=definition.title,
+                description=definition.description,
+                achieved=unlocked_at is not None or progress >= definition.threshold,
+                date=unlocked_at,
+                progress=min(float(progress / definition.threshold) * 100, 100),
+                goal=definition.goal,
+            )
+        )
+    return achievements
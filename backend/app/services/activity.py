@@ -0,0 +1,116 @@
+"""
+Atividade diária das sessões de trabalho.
+
+Minutos, sessões e ganhos por dia (ou semana) são agregados pelo banco com
+GROUP BY, usando o índice (user_id, date) de work_sessions. O calendário de
+atividade é compacto: um inteiro (minutos trabalhados) por dia do intervalo,
+para ser embutido no perfil sem listar as sessões.
+"""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, cast, func, select
+from sqlalchemy.orm import Session
+
+from ..db import models
+from . import stats, summary
+
+# Limite de dias por consulta de atividade ou calendário
+MAX_ACTIVITY_DAYS = 3 * 366
+
+
+def check_range(start_date: date, end_date: date) -> None:
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date anterior a start_date.")
+    if (end_date - start_date).days + 1 > MAX_ACTIVITY_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Intervalo máximo de {MAX_ACTIVITY_DAYS} dias.",
+        )
+
+
+def _session_period(dialect: str, granularity: str):
+    """Chave do período de WorkSession.date (texto 'YYYY-MM-DD')."""
+    if granularity == "day":
+        return models.WorkSession.date
+    column = cast(models.WorkSession.date, DateTime) if dialect == "postgresql" else models.WorkSession.date
+    return summary.period_expr(dialect, granularity, column)
+
+
+def _earnings_per_hour(earnings: Decimal, minutes: int) -> Decimal:
+    if not minutes:
+        return Decimal(0)
+    return (earnings * 60 / minutes).quantize(Decimal("0.01"))
+
+
+def daily_activity(
+    db: Session, user_id: int, start_date: date, end_date: date, granularity: str = "day"
+) -> List[Dict]:
+    """
+    Minutos, sessões, ganhos e ganhos por hora de cada dia (ou semana) com
+    atividade entre as datas (inclusivas), do mais antigo ao mais recente.
+    """
+    check_range(start_date, end_date)
+    dialect = db.get_bind().dialect.name
+    ws = models.WorkSession
+    tx = models.Transaction
+
+    period = _session_period(dialect, granularity).label("period")
+    session_rows = db.execute(
+        select(period, func.sum(ws.total_minutes), func.count(ws.id))
+        .where(ws.user_id == user_id, ws.date >= start_date.isoformat(), ws.date <= end_date.isoformat())
+        .group_by(period)
+    ).all()
+
+    tx_period = summary.period_expr(dialect, granularity, tx.date).label("period")
+    earning_rows = db.execute(
+        select(tx_period, func.sum(tx.amount))
+        .where(
+            tx.user_id == user_id,
+            tx.type == "income",
+            tx.date >= datetime.combine(start_date, datetime.min.time()),
+            tx.date < datetime.combine(end_date + timedelta(days=1), datetime.min.time()),
+        )
+        .group_by(tx_period)
+    ).all()
+
+    days: Dict[str, Dict] = {}
+    for key, minutes, count in session_rows:
+        days[str(key)] = {"date": str(key), "minutes": minutes or 0, "sessions": count, "earnings": Decimal(0)}
+    for key, earnings in earning_rows:
+        day = days.setdefault(str(key), {"date": str(key), "minutes": 0, "sessions": 0, "earnings": Decimal(0)})
+        day["earnings"] = earnings or Decimal(0)
+
+    result = [days[key] for key in sorted(days)]
+    for day in result:
+        day["earnings_per_hour"] = _earnings_per_hour(day["earnings"], day["minutes"])
+    return result
+
+
+def activity_calendar(db: Session, user_id: int, start_date: date, end_date: date) -> Dict:
+    """Calendário compacto: minutos trabalhados em cada dia, de start_date a end_date."""
+    check_range(start_date, end_date)
+    ws = models.WorkSession
+    rows = db.execute(
+        select(ws.date, func.sum(ws.total_minutes))
+        .where(ws.user_id == user_id, ws.date >= start_date.isoformat(), ws.date <= end_date.isoformat())
+        .group_by(ws.date)
+    ).all()
+
+    minutes = [0] * ((end_date - start_date).days + 1)
+    for day, total in rows:
+        minutes[(date.fromisoformat(day[:10]) - start_date).days] = total or 0
+    return {"start_date": start_date, "end_date": end_date, "minutes": minutes}
+
+
+def profile_calendar(db: Session, user_id: int, now: Optional[datetime] = None) -> Dict:
+    """
+    Calendário do perfil: do primeiro mês da janela de 12 meses ao fim do mês
+    atual, o mesmo intervalo durante todo o mês (como o perfil em cache).
+    """
+    now = now or datetime.now(timezone.utc)
+    start_date = stats.month_window(now)[-1].date()
+    end_date = (now.replace(day=28) + timedelta(days=4)).replace(day=1).date() - timedelta(days=1)
+    return activity_calendar(db, user_id, start_date, end_date)
@@ -0,0 +1,65 @@
+"""
+Criação em lote (sincronização de registros feitos offline).
+
+Os itens são validados em uma única passada, os válidos são inseridos com um
+único INSERT ... RETURNING em lote por tabela, e a resposta traz o resultado
+de cada item na ordem enviada.
+"""
+import os
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 500))
+
+
+def validate_items(
+    items: Sequence[Dict[str, Any]], schema: Type[BaseModel]
+) -> Tuple[List[Tuple[int, BaseModel]], List[Dict[str, Any]]]:
+    """
+    Valida todos os itens. Retorna os válidos (com a posição original) e os
+    resultados de erro; lança 413 acima de BULK_MAX_ITEMS.
+    """
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"Máximo de {BULK_MAX_ITEMS} itens por lote.",
+        )
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as exc:
+            errors.append(
+                {"index": index, "status": "error", "errors": exc.errors(include_url=False, include_context=False)}
+            )
+    return valid, errors
+
+
+def insert_returning(db: Session, model, rows: List[Dict[str, Any]]) -> list:
+    """INSERT em lote (executemany com RETURNING), devolvendo os objetos na ordem das linhas."""
+    if not rows:
+        return []
+    return db.scalars(insert(model).returning(model, sort_by_parameter_order=True), rows).all()
+
+
+def build_result(
+    created: List[Tuple[int, Any]],
+    errors: List[Dict[str, Any]],
+    duplicates: Sequence[Tuple[int, Any]] = (),
+) -> dict:
+    """
+    Corpo de `schemas.BulkResult`, com os resultados na ordem dos itens enviados.
+    `duplicates` traz os itens já gravados anteriormente, com o registro existente.
+    """
+    results = (
+        errors
+        + [{"index": index, "status": "created", "item": obj} for index, obj in created]
+        + [{"index": index, "status": "duplicate", "item": obj} for index, obj in duplicates]
+    )
+    results.sort(key=lambda result: result["index"])
+    return {"created": len(created), "duplicates": len(duplicates), "failed": len(errors), "results": results}
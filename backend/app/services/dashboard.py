@@ -0,0 +1,174 @@
+"""
+Montagem do dashboard (primeira tela após o login) em uma única requisição.
+
+Cada seção é carregada por uma função própria, e apenas as seções pedidas em
+`fields` são consultadas; cada seção custa uma única consulta. Na pilha
+síncrona as seções rodam em sequência na mesma sessão. Na assíncrona
+(`build_dashboard_async`) rodam concorrentemente, cada uma numa sessão própria
+sobre a mesma engine, já que uma AsyncSession não executa comandos em paralelo:
+a latência passa a ser a da seção mais lenta, não a soma de todas.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from ..db import models
+from ..models import schemas
+from . import goals as goal_progress
+
+RECENT_TRANSACTIONS = 10
+
+
+def _personal_info(db: Session, user, now: datetime, recent_limit: int) -> schemas.User:
+    # Mesma regra de status do plano de /auth/user
+    trial_active = user.trial_ends_at and datetime.now(timezone.utc) <= user.trial_ends_at
+    user.plan_status = "active" if user.is_paid or trial_active else "inactive"
+    return schemas.User.model_validate(user)
+
+
+def _recent_transactions(db: Session, user, now: datetime, recent_limit: int):
+    return db.scalars(
+        select(models.Transaction)
+        .where(models.Transaction.user_id == user.id)
+        .order_by(models.Transaction.date.desc(), models.Transaction.id)
+        .limit(recent_limit)
+    ).all()
+
+
+def _categories(db: Session, user, now: datetime, recent_limit: int):
+    return db.scalars(select(models.Category).where(models.Category.user_id == user.id)).all()
+
+
+def _active_goals(db: Session, user, now: datetime, recent_limit: int):
+    # Mesmo progresso de /goals: metas recorrentes de um período que já virou aparecem zeradas
+    goals = db.scalars(
+        select(models.Goal).where(models.Goal.user_id == user.id, models.Goal.is_active.is_(True))
+    ).all()
+    return [goal_progress.goal_view(goal, now.date()) for goal in goals]
+
+
+def _today_sessions(db: Session, user, now: datetime, recent_limit: int):
+    return db.scalars(
+        select(models.WorkSession)
+        .where(models.WorkSession.user_id == user.id, models.WorkSession.date == now.strftime("%Y-%m-%d"))
+        .order_by(models.WorkSession.start_time)
+    ).all()
+
+
+def _summary(db: Session, user, now: datetime, recent_limit: int) -> schemas.DashboardSummary:
+    """
+    Totais do dia e do mês em uma consulta (intervalo de datas coberto pelo
+    índice user_id, date), com os minutos de hoje numa subconsulta.
+    """
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + timedelta(days=1)
+    tx = models.Transaction
+    is_income = tx.type == "income"
+    is_expense = tx.type == "expense"
+    is_today = tx.date >= day_start
+
+    today_minutes = (
+        select(func.sum(models.WorkSession.total_minutes))
+        .where(
+            models.WorkSession.user_id == user.id,
+            models.WorkSession.date == now.strftime("%Y-%m-%d"),
+        )
+        .scalar_subquery()
+    )
+
+    row = db.execute(
+        select(
+            func.sum(case((is_income, tx.amount), else_=0)),
+            func.sum(case((is_expense, tx.amount), else_=0)),
+            func.sum(case((is_income, 1), else_=0)),
+            func.sum(case((is_income & is_today, tx.amount), else_=0)),
+            func.sum(case((is_expense & is_today, tx.amount), else_=0)),
+            func.sum(case((is_income & is_today, 1), else_=0)),
+            today_minutes,
+        ).where(tx.user_id == user.id, tx.date >= month_start, tx.date < day_end)
+    ).one()
+
+    month_income, month_expenses, month_trips, today_income, today_expenses, today_trips, today_minutes = (
+        value or 0 for value in row
+    )
+    return schemas.DashboardSummary(
+        today_income=Decimal(today_income),
+        today_expenses=Decimal(today_expenses),
+        today_trips=today_trips,
+        today_minutes=today_minutes,
+        month_income=Decimal(month_income),
+        month_expenses=Decimal(month_expenses),
+        month_profit=Decimal(month_income) - Decimal(month_expenses),
+        month_trips=month_trips,
+    )
+
+
+SECTIONS: Dict[str, Callable] = {
+    "user": _personal_info,
+    "recent_transactions": _recent_transactions,
+    "categories": _categories,
+    "goals": _active_goals,
+    "today_sessions": _today_sessions,
+    "summary": _summary,
+}
+
+
+def parse_fields(fields: Optional[str]) -> Iterable[str]:
+    """
+    Converte o parâmetro `fields` ("summary,goals") na lista de seções.
+    Lança ValueError para seções desconhecidas; vazio significa todas.
+    """
+    if not fields:
+        return list(SECTIONS)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = sorted(set(requested) - set(SECTIONS))
+    if unknown:
+        raise ValueError(f"Campos desconhecidos: {', '.join(unknown)}. Disponíveis: {', '.join(SECTIONS)}")
+    return requested
+
+
+def build_dashboard(
+    db: Session,
+    user,
+    fields: Iterable[str],
+    recent_limit: int = RECENT_TRANSACTIONS,
+    now: Optional[datetime] = None,
+) -> dict:
+    """Carrega as seções pedidas, na ordem de SECTIONS, reutilizando a mesma sessão."""
+    now = now or datetime.utcnow()  # As datas das transações são gravadas em UTC sem fuso
+    wanted = set(fields)
+    return {
+        name: loader(db, user, now, recent_limit)
+        for name, loader in SECTIONS.items()
+        if name in wanted
+    }
+
+
+async def build_dashboard_async(
+    bind: AsyncEngine,
+    user,
+    fields: Iterable[str],
+    recent_limit: int = RECENT_TRANSACTIONS,
+    now: Optional[datetime] = None,
+) -> dict:
+    """
+    Carrega as seções pedidas concorrentemente, cada uma numa AsyncSession
+    própria sobre `bind` (uma conexão do pool por seção), na ordem de SECTIONS.
+    """
+    now = now or datetime.utcnow()
+    requested = set(fields)
+    wanted = [name for name in SECTIONS if name in requested]
+
+    async def load(name: str):
+        if name == "user":  # Sem consulta: não ocupa uma conexão
+            return _personal_info(None, user, now, recent_limit)
+        async with AsyncSession(bind, autoflush=False, expire_on_commit=False) as session:
+            return await session.run_sync(SECTIONS[name], user, now, recent_limit)
+
+    return dict(zip(wanted, await asyncio.gather(*(load(name) for name in wanted))))
@@ -0,0 +1,235 @@
+"""
+Motor de progresso das metas.
+
+O `current` de cada meta é mantido incrementalmente: as rotas de escrita
+chamam `apply_transactions` / `apply_work_sessions` na mesma transação em que
+os registros são criados, e a listagem apenas lê as metas.
+
+Tipos ('type') recorrentes acumulam dentro do período corrente e recomeçam a
+cada período: daily (dia), weekly (semana de segunda a domingo), monthly e
+yearly. Os demais tipos acumulam da criação da meta até o `deadline`.
+
+Categorias ('category') acompanhadas: income (ganhos), expenses (despesas),
+profit (ganhos - despesas), trips (corridas) e hours (horas trabalhadas).
+Metas de outras categorias mantêm o `current` informado pelo cliente.
+
+Metas de horas acumulam minutos inteiros em `current_minutes`; o `current`
+(em horas, com duas casas) é sempre derivado do total, então o progresso
+incremental é igual ao recalculado. `is_completed` acompanha `current` a cada
+mudança, inclusive para baixo (lucro após uma despesa).
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from ..db import models
+from ..models import schemas
+from ..utils.records import get_field
+
+RECURRING_TYPES = ("daily", "weekly", "monthly", "yearly")
+TRANSACTION_CATEGORIES = ("income", "expenses", "profit", "trips")
+SESSION_CATEGORIES = ("hours",)
+TRACKED_CATEGORIES = TRANSACTION_CATEGORIES + SESSION_CATEGORIES
+
+_HUNDREDTH = Decimal("0.01")
+
+
+def _today() -> date:
+    return datetime.utcnow().date()  # As datas são gravadas em UTC sem fuso
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    """Aceita datetime, date ou string ISO ('YYYY-MM-DD...')."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def period_bounds(goal: models.Goal, today: date) -> Tuple[date, Optional[date]]:
+    """Intervalo [início, fim) do período corrente da meta (fim None = sem limite)."""
+    if goal.type == "daily":
+        return today, today + timedelta(days=1)
+    if goal.type == "weekly":
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=7)
+    if goal.type == "monthly":
+        start = today.replace(day=1)
+        return start, (start + timedelta(days=32)).replace(day=1)
+    if goal.type == "yearly":
+        start = today.replace(month=1, day=1)
+        return start, start.replace(year=start.year + 1)
+
+    start = _parse_date(goal.created_at) or date.min
+    deadline = _parse_date(goal.deadline)
+    return start, deadline + timedelta(days=1) if deadline else None
+
+
+def _roll_over(goal: models.Goal, today: date) -> Tuple[date, Optional[date]]:
+    """Zera o progresso se a meta entrou em um novo período desde a última atualização."""
+    start, end = period_bounds(goal, today)
+    if goal.period_start != start.isoformat():
+        goal.period_start = start.isoformat()
+        goal.current = Decimal(0)
+        goal.current_minutes = 0
+        goal.is_completed = False
+    return start, end
+
+
+def _set_current(goal: models.Goal, current: Decimal) -> None:
+    goal.current = current
+    goal.is_completed = current >= goal.target
+
+
+def _add(goal: models.Goal, delta: Decimal) -> None:
+    _set_current(goal, Decimal(goal.current or 0) + delta)
+
+
+def _add_minutes(goal: models.Goal, minutes: int) -> None:
+    """Acumula minutos e deriva as horas do total, arredondando uma única vez."""
+    goal.current_minutes = (goal.current_minutes or 0) + minutes
+    _set_current(goal, _hours(goal.current_minutes))
+
+
+def _transaction_delta(category: str, tx_type: str, amount: Decimal) -> Decimal:
+    if category == "income":
+        return amount if tx_type == "income" else Decimal(0)
+    if category == "expenses":
+        return amount if tx_type == "expense" else Decimal(0)
+    if category == "profit":
+        return amount if tx_type == "income" else -amount if tx_type == "expense" else Decimal(0)
+    if category == "trips":
+        return Decimal(1) if tx_type == "income" else Decimal(0)
+    return Decimal(0)
+
+
+def _hours(minutes: int) -> Decimal:
+    return (Decimal(minutes) / 60).quantize(_HUNDREDTH)
+
+
+def _active_goals(db: Session, user_id: int, categories: Iterable[str]) -> List[models.Goal]:
+    """Metas ativas do usuário nas categorias informadas (índice user_id, is_active)."""
+    return db.scalars(
+        select(models.Goal).where(
+            models.Goal.user_id == user_id,
+            models.Goal.is_active.is_(True),
+            models.Goal.category.in_(categories),
+        )
+    ).all()
+
+
+def _within(day: Optional[date], start: date, end: Optional[date]) -> bool:
+    return day is not None and day >= start and (end is None or day < end)
+
+
+def apply_transactions(db: Session, user_id: int, transactions: Iterable[Any], today: Optional[date] = None) -> None:
+    """
+    Soma as transações informadas ao progresso das metas afetadas.
+    Não faz commit: o chamador controla a transação.
+    """
+    today = today or _today()
+    items = [
+        (_parse_date(get_field(t, "date")) or today, get_field(t, "type"), Decimal(get_field(t, "amount")))
+        for t in transactions
+    ]
+    if not items:
+        return
+    for goal in _active_goals(db, user_id, TRANSACTION_CATEGORIES):
+        start, end = _roll_over(goal, today)
+        delta = sum(
+            (_transaction_delta(goal.category, tx_type, amount) for day, tx_type, amount in items if _within(day, start, end)),
+            Decimal(0),
+        )
+        if delta:
+            _add(goal, delta)
+
+
+def apply_work_sessions(db: Session, user_id: int, sessions: Iterable[Any], today: Optional[date] = None) -> None:
+    """Soma as horas das sessões informadas às metas de horas afetadas."""
+    today = today or _today()
+    items = [(_parse_date(get_field(ws, "date")), get_field(ws, "total_minutes") or 0) for ws in sessions]
+    if not items:
+        return
+    for goal in _active_goals(db, user_id, SESSION_CATEGORIES):
+        start, end = _roll_over(goal, today)
+        minutes = sum(m for day, m in items if _within(day, start, end))
+        if minutes:
+            _add_minutes(goal, minutes)
+
+
+def recompute_goal(db: Session, goal: models.Goal, today: Optional[date] = None) -> None:
+    """Recalcula o progresso da meta no período corrente a partir do histórico (GROUP BY no banco)."""
+    if goal.category not in TRACKED_CATEGORIES:
+        return
+    start, end = period_bounds(goal, today or _today())
+    goal.period_start = start.isoformat()
+
+    if goal.category in SESSION_CATEGORIES:
+        ws = models.WorkSession
+        conditions = [ws.user_id == goal.user_id, ws.date >= start.isoformat()]
+        if end:
+            conditions.append(ws.date < end.isoformat())
+        minutes = db.scalar(select(func.sum(ws.total_minutes)).where(*conditions)) or 0
+        goal.current_minutes = minutes
+        current = _hours(minutes)
+    else:
+        tx = models.Transaction
+        conditions = [tx.user_id == goal.user_id, tx.date >= datetime.combine(start, datetime.min.time())]
+        if end:
+            conditions.append(tx.date < datetime.combine(end, datetime.min.time()))
+        income, expenses, trips = db.execute(
+            select(
+                func.sum(case((tx.type == "income", tx.amount), else_=0)),
+                func.sum(case((tx.type == "expense", tx.amount), else_=0)),
+                func.sum(case((tx.type == "income", 1), else_=0)),
+            ).where(*conditions)
+        ).one()
+        income, expenses = Decimal(income or 0), Decimal(expenses or 0)
+        current = {
+            "income": income,
+            "expenses": expenses,
+            "profit": income - expenses,
+            "trips": Decimal(trips or 0),
+        }[goal.category]
+
+    _set_current(goal, current)
+
+
+def recompute_all_goals(db: Session, user_id: Optional[int] = None, today: Optional[date] = None) -> int:
+    """Recalcula as metas ativas de um usuário ou de todos. Retorna quantas metas foram processadas."""
+    query = select(models.Goal).where(models.Goal.is_active.is_(True))
+    if user_id is not None:
+        query = query.where(models.Goal.user_id == user_id)
+
+    count = 0
+    for goal in db.scalars(query).all():
+        recompute_goal(db, goal, today)
+        count += 1
+    db.commit()
+    return count
+
+
+def current_progress(goal: models.Goal, today: Optional[date] = None) -> Tuple[Decimal, bool]:
+    """
+    Progresso a exibir na leitura: metas recorrentes cujo período virou desde a
+    última escrita aparecem zeradas, sem recalcular nada.
+    """
+    start, _ = period_bounds(goal, today or _today())
+    if goal.category in TRACKED_CATEGORIES and goal.period_start != start.isoformat():
+        return Decimal(0), False
+    return Decimal(goal.current or 0), bool(goal.is_completed)
+
+
+def goal_view(goal: models.Goal, today: Optional[date] = None) -> schemas.Goal:
+    """Schema de resposta da meta com o progresso de `current_progress`."""
+    current, is_completed = current_progress(goal, today)
+    return schemas.Goal.model_validate(goal).model_copy(update={"current": current, "is_completed": is_completed})
@@ -0,0 +1,157 @@
+"""
+Inserção em lote de transações vindas de extratos (CSV, XLSX, PDF) e das
+rotas de criação.
+
+O par (user_id, external_id) é único no banco: as linhas com external_id são
+inseridas com INSERT ... ON CONFLICT DO NOTHING RETURNING, então reenviar um
+extrato ou repetir uma sincronização custa um único comando e nunca cria uma
+segunda linha. Os agregados, as metas e as conquistas recebem apenas as
+linhas inseridas.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..db import database, models
+from ..utils import money
+from . import achievements, goals, rollups, versioning
+
+# Linhas por lote; também limita o tamanho da lista IN usada na deduplicação
+IMPORT_BATCH_SIZE = 500
+
+
+def resolve_category_id(db: Session, user_id: int, name: str, cache: Dict[str, int]) -> int:
+    """Busca (ou cria) a categoria de receita com o nome da plataforma."""
+    if name in cache:
+        return cache[name]
+
+    category = (
+        db.query(models.Category)
+        .filter(
+            models.Category.user_id == user_id,
+            models.Category.type == "income",
+            models.Category.name == name,
+        )
+        .first()
+    )
+    if category is None:
+        category = models.Category(user_id=user_id, name=name, type="income")
+        db.add(category)
+        db.flush()
+    cache[name] = category.id
+    return category.id
+
+
+def owns_category(db: Session, user_id: int, category_id: int) -> bool:
+    """Indica se a categoria existe e pertence ao usuário."""
+    return db.scalar(
+        select(models.Category.id).where(models.Category.id == category_id, models.Category.user_id == user_id)
+    ) is not None
+
+
+def insert_transactions(db: Session, user_id: int, rows: List[Dict]) -> List[Optional[models.Transaction]]:
+    """
+    Insere as transações ignorando as duplicadas (mesmo external_id do usuário,
+    já gravado ou repetido no próprio lote). Retorna, na ordem das linhas, a
+    transação criada ou None para as ignoradas. Não faz commit.
+    """
+    rows = [{**row, "user_id": user_id} for row in rows]
+    keyed = [i for i, row in enumerate(rows) if row.get("external_id")]
+    plain = [i for i, row in enumerate(rows) if not row.get("external_id")]
+    created: List[Optional[models.Transaction]] = [None] * len(rows)
+
+    if keyed:
+        stmt = (
+            database.dialect_insert(db, models.Transaction)
+            .on_conflict_do_nothing(index_elements=["user_id", "external_id"])
+            .returning(models.Transaction)
+        )
+        # Sem ordem garantida no RETURNING: as linhas são associadas pelo external_id
+        inserted = {t.external_id: t for t in db.scalars(stmt, [rows[i] for i in keyed])}
+        for i in keyed:
+            created[i] = inserted.pop(rows[i]["external_id"], None)
+    if plain:
+        stmt = insert(models.Transaction).returning(models.Transaction, sort_by_parameter_order=True)
+        for i, transaction in zip(plain, db.scalars(stmt, [rows[i] for i in plain])):
+            created[i] = transaction
+
+    new_rows = [t for t in created if t is not None]
+    if new_rows:
+        rollups.apply_transactions(db, user_id, new_rows)
+        goals.apply_transactions(db, user_id, new_rows)
+        achievements.apply_transactions(db, user_id, new_rows)
+    return created
+
+
+def find_by_external_ids(db: Session, user_id: int, external_ids: Iterable[str]) -> Dict[str, models.Transaction]:
+    """Transações já gravadas do usuário com os external_id informados."""
+    external_ids = set(external_ids)
+    if not external_ids:
+        return {}
+    stmt = select(models.Transaction).where(
+        models.Transaction.user_id == user_id,
+        models.Transaction.external_id.in_(external_ids),
+    )
+    return {t.external_id: t for t in db.scalars(stmt)}
+
+
+def insert_batch(
+    db: Session,
+    user_id: int,
+    rows: List[Dict],
+    category_id: Optional[int] = None,
+    categories: Optional[Dict[str, int]] = None,
+) -> Tuple[int, int]:
+    """
+    Insere um lote de transações já parseadas, ignorando as que já existem
+    (mesmo external_id). Os valores dos parsers chegam como lidos do extrato e
+    são gravados em centavos, arredondados como no NUMERIC(10, 2), em qualquer
+    banco. Retorna (inseridas, ignoradas). Não faz commit.
+    """
+    categories = {} if categories is None else categories
+    to_insert = [
+        {
+            **row,
+            "amount": money.to_decimal(money.to_cents(row["amount"])),
+            "category_id": category_id
+            or resolve_category_id(db, user_id, row.get("source") or "Outros", categories),
+        }
+        for row in rows
+    ]
+    inserted = sum(1 for t in insert_transactions(db, user_id, to_insert) if t is not None)
+    return inserted, len(rows) - inserted
+
+
+def import_transactions(
+    db: Session, user_id: int, rows: Iterable[Dict], category_id: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Importa todas as linhas em lotes, numa única transação do banco. As linhas
+    podem ser lidas sob demanda (streaming): se o extrato se revelar inválido
+    (ValueError) depois de algum lote gravado, os lotes são descartados.
+    """
+    inserted = skipped = 0
+    written = False
+    categories: Dict[str, int] = {}
+    batch: List[Dict] = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                written = True
+                ins, skip = insert_batch(db, user_id, batch, category_id, categories)
+                inserted, skipped = inserted + ins, skipped + skip
+                batch = []
+    except ValueError:
+        if written:
+            db.rollback()
+        raise
+    if batch:
+        ins, skip = insert_batch(db, user_id, batch, category_id, categories)
+        inserted, skipped = inserted + ins, skipped + skip
+
+    if inserted:
+        versioning.bump_data_version(db, user_id)
+    db.commit()
+    return inserted, skipped
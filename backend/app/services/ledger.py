@@ -0,0 +1,267 @@
+"""
+Livro-razão colunar, em memória, das transações de cada usuário.
+
+As transações do usuário ficam em arrays NumPy (data em segundos desde a
+época, valor em centavos int64, tipo, categoria e origem) em vez de objetos
+ORM com Decimal. O livro fica em cache por usuário, marcado com a versão dos
+dados (users.data_version); quando a versão muda, apenas as transações novas
+(id maior que o último carregado) são lidas e anexadas.
+
+O resumo por período tem aqui uma versão vetorizada que soma centavos
+inteiros e devolve os mesmos Decimal das consultas SQL; com
+LEDGER_ANALYTICS=true, `summary` passa a usá-la. As escritas de transações
+chamam `refresh` depois do commit, então o livro em cache já está estendido
+quando a próxima leitura chega. (O perfil não passa pelo livro: ele lê os
+agregados mensais de `rollups`.)
+"""
+import os
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from ..core import cache
+from ..db import models
+from ..utils import money
+from . import versioning
+
+LEDGER_ANALYTICS = os.getenv("LEDGER_ANALYTICS", "false").lower() in ("1", "true", "yes")
+LEDGER_CACHE_TTL_SECONDS = float(os.getenv("LEDGER_CACHE_TTL_SECONDS", 3600))
+LEDGER_CACHE_MAXSIZE = int(os.getenv("LEDGER_CACHE_MAXSIZE", 256))
+
+ledger_cache = cache.build_cache("ledger", maxsize=LEDGER_CACHE_MAXSIZE, ttl=LEDGER_CACHE_TTL_SECONDS)
+
+# Tipo da transação
+INCOME, EXPENSE, OTHER = 1, -1, 0
+_KINDS = {"income": INCOME, "expense": EXPENSE}
+
+# Transações sem categoria (category_id nulo)
+NO_CATEGORY = -1
+# Chave de ordenação dos nulos no resumo: por último, como o ORDER BY ... NULLS LAST do SQL
+_NULLS_LAST = np.iinfo(np.int64).max
+
+_EPOCH = np.datetime64(0, "s")
+_NAT = int(np.datetime64("NaT", "s").astype(np.int64))  # Datas nulas
+
+
+def _empty(dtype) -> np.ndarray:
+    return np.empty(0, dtype=dtype)
+
+
+@dataclass(frozen=True)
+class Ledger:
+    """Colunas das transações de um usuário, na ordem do id."""
+    user_id: int
+    data_version: int = -1
+    last_id: int = 0
+    dates: np.ndarray = field(default_factory=lambda: _empty(np.int64))  # Segundos desde a época (UTC); NaT se nula
+    cents: np.ndarray = field(default_factory=lambda: _empty(np.int64))
+    kinds: np.ndarray = field(default_factory=lambda: _empty(np.int8))  # INCOME, EXPENSE ou OTHER
+    category_ids: np.ndarray = field(default_factory=lambda: _empty(np.int64))  # NO_CATEGORY se nula
+    source_codes: np.ndarray = field(default_factory=lambda: _empty(np.int32))  # Índices em `sources`
+    sources: Tuple[Optional[str], ...] = ()
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    def extended(self, rows, data_version: int) -> "Ledger":
+        """Novo livro com as linhas (id, segundos, centavos, tipo, categoria, origem) anexadas."""
+        if not rows:
+            return replace(self, data_version=data_version)
+        ids, dates, cents, kinds, category_ids, row_sources = zip(*rows)
+
+        sources = list(self.sources)
+        codes = {source: code for code, source in enumerate(sources)}
+        for source in set(row_sources) - codes.keys():
+            codes[source] = len(sources)
+            sources.append(source)
+
+        return Ledger(
+            user_id=self.user_id,
+            data_version=data_version,
+            last_id=ids[-1],
+            dates=np.concatenate([self.dates, np.array(dates, dtype=np.int64)]),
+            cents=np.concatenate([self.cents, np.array(cents, dtype=np.int64)]),
+            kinds=np.concatenate([self.kinds, np.array(kinds, dtype=np.int8)]),
+            category_ids=np.concatenate([self.category_ids, np.array(category_ids, dtype=np.int64)]),
+            source_codes=np.concatenate(
+                [self.source_codes, np.fromiter(map(codes.__getitem__, row_sources), dtype=np.int32, count=len(ids))]
+            ),
+            sources=tuple(sources),
+        )
+
+
+def _epoch_seconds(db: Session, column):
+    """Segundos desde a época de uma coluna DateTime (UTC sem fuso), conforme o dialeto."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.extract("epoch", column), BigInteger)
+    return cast(func.strftime("%s", column), BigInteger)
+
+
+def _load_rows(db: Session, user_id: int, after_id: int = 0):
+    """
+    Colunas do livro já convertidas pelo banco (segundos, centavos inteiros,
+    tipo e categoria), sem hidratar objetos nem passar por Decimal.
+    """
+    tx = models.Transaction
+    return db.execute(
+        select(
+            tx.id,
+            func.coalesce(_epoch_seconds(db, tx.date), _NAT),
+            cast(func.round(tx.amount * 100), BigInteger),
+            case((tx.type == "income", INCOME), (tx.type == "expense", EXPENSE), else_=OTHER),
+            func.coalesce(tx.category_id, NO_CATEGORY),
+            tx.source,
+        )
+        .where(tx.user_id == user_id, tx.id > after_id)
+        .order_by(tx.id)
+    ).all()
+
+
+def get_ledger(db: Session, user_id: int) -> Ledger:
+    """
+    Livro do usuário, do cache quando a versão dos dados não mudou. Caso
+    contrário, anexa as transações novas (ou recarrega tudo se a contagem não
+    bater, por exemplo quando ids menores foram gravados depois).
+    """
+    # A versão é lida antes das linhas: uma escrita concorrente deixa o livro
+    # com a versão antiga, e a próxima leitura apenas anexa o que faltar
+    version = versioning.get_data_version(db, user_id)
+    ledger = ledger_cache.get(str(user_id))
+    if ledger is not None and ledger.data_version == version:
+        return ledger
+
+    if ledger is not None:
+        ledger = ledger.extended(_load_rows(db, user_id, ledger.last_id), version)
+        total = db.scalar(select(func.count(models.Transaction.id)).where(models.Transaction.user_id == user_id))
+        if total != len(ledger):
+            ledger = None
+    if ledger is None:
+        ledger = Ledger(user_id).extended(_load_rows(db, user_id), version)
+    ledger_cache.set(str(user_id), ledger)
+    return ledger
+
+
+def refresh(db: Session, user_id: int) -> None:
+    """
+    Anexa ao livro em cache as transações recém-gravadas. Chamada após o commit
+    das escritas; sem livro em cache não faz nada (ele é montado na primeira leitura).
+    """
+    if LEDGER_ANALYTICS and ledger_cache.get(str(user_id)) is not None:
+        get_ledger(db, user_id)
+
+
+def _group(keys: List[np.ndarray], values: List[np.ndarray]) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    """
+    Agrupa pelas chaves (ordenadas pela primeira, depois pelas seguintes) e soma
+    cada coluna de valores com aritmética inteira. Retorna (chaves, somas) por grupo.
+    """
+    if not len(keys[0]):
+        return [k[:0] for k in keys], [v[:0] for v in values]
+    order = np.lexsort(tuple(reversed(keys)))
+    sorted_keys = [k[order] for k in keys]
+    changed = np.zeros(len(order), dtype=bool)
+    changed[0] = True
+    for k in sorted_keys:
+        changed[1:] |= k[1:] != k[:-1]
+    starts = np.flatnonzero(changed)
+    return [k[starts] for k in sorted_keys], [np.add.reduceat(v[order], starts) for v in values]
+
+
+def _columns(ledger: Ledger, mask: Optional[np.ndarray] = None):
+    """Centavos de receita, centavos de despesa e corridas (receitas) por transação."""
+    kinds = ledger.kinds if mask is None else ledger.kinds[mask]
+    cents = ledger.cents if mask is None else ledger.cents[mask]
+    is_income = kinds == INCOME
+    return (
+        np.where(is_income, cents, 0),
+        np.where(kinds == EXPENSE, cents, 0),
+        is_income.astype(np.int64),
+    )
+
+
+_PERIOD_UNITS = {"hour": "h", "day": "D", "week": "D", "month": "M"}
+
+
+def _periods(seconds: np.ndarray, granularity: str) -> np.ndarray:
+    """Início do período de cada data, como inteiro na unidade do período (horas, dias ou meses)."""
+    periods = seconds.astype("datetime64[s]").astype(f"datetime64[{_PERIOD_UNITS[granularity]}]").astype(np.int64)
+    if granularity == "week":
+        periods = periods - (periods + 3) % 7  # 1970-01-01 foi uma quinta-feira; recua até a segunda
+    return periods
+
+
+def _labels(periods: np.ndarray, granularity: str) -> List[str]:
+    """Chaves dos períodos no mesmo formato de `summary.period_expr`."""
+    unit = _PERIOD_UNITS[granularity]
+    labels = np.datetime_as_string(periods.astype(f"datetime64[{unit}]"), unit=unit)
+    if granularity == "hour":
+        return [f"{label}:00" for label in labels]
+    return labels.tolist()
+
+
+def summarize(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    granularity: str = "day",
+    group_by: Optional[str] = None,
+) -> List[Dict]:
+    """Mesmo resultado de `summary.summarize`, calculado sobre o livro em memória."""
+    ledger = get_ledger(db, user_id)
+    start = (np.datetime64(datetime.combine(start_date, time.min), "s") - _EPOCH).astype(np.int64)
+    end = (np.datetime64(datetime.combine(end_date + timedelta(days=1), time.min), "s") - _EPOCH).astype(np.int64)
+    # NaT é o menor int64, então datas nulas ficam de fora como no SQL
+    mask = (ledger.dates >= start) & (ledger.dates < end)
+
+    keys = [_periods(ledger.dates[mask], granularity)]
+    if group_by == "category":
+        category_ids = ledger.category_ids[mask]
+        keys.append(np.where(category_ids == NO_CATEGORY, _NULLS_LAST, category_ids))
+    elif group_by == "source":
+        # Ordena as origens como o ORDER BY do banco (nulas por último)
+        ranking = sorted(
+            range(len(ledger.sources)), key=lambda code: (ledger.sources[code] is None, ledger.sources[code] or "")
+        )
+        rank = np.empty(len(ledger.sources), dtype=np.int64)
+        rank[ranking] = np.arange(len(ranking))
+        keys.append(rank[ledger.source_codes[mask]])
+
+    group_keys, (income, expenses, trips) = _group(keys, list(_columns(ledger, mask)))
+    labels = _labels(group_keys[0], granularity)
+
+    names: Dict[int, str] = {}
+    if group_by == "category":
+        wanted = [int(c) for c in np.unique(group_keys[1]) if c != _NULLS_LAST]
+        if wanted:
+            names = dict(
+                db.execute(select(models.Category.id, models.Category.name).where(models.Category.id.in_(wanted))).all()
+            )
+    if group_by == "source":
+        by_rank = [ledger.sources[code] for code in ranking]
+
+    buckets = []
+    for i, label in enumerate(labels):
+        category_id, group = None, None
+        if group_by == "category":
+            category_id = None if group_keys[1][i] == _NULLS_LAST else int(group_keys[1][i])
+            group = names.get(category_id)
+        elif group_by == "source":
+            group = by_rank[group_keys[1][i]]
+        buckets.append(
+            {
+                "period": label,
+                "category_id": category_id,
+                "group": group,
+                "income": money.to_decimal(income[i]),
+                "expenses": money.to_decimal(expenses[i]),
+                "profit": money.difference(income[i], expenses[i]),
+                "trips": int(trips[i]),
+            }
+        )
+    return buckets
+
@@ -0,0 +1,201 @@
+"""
+Manutenção incremental dos agregados mensais por usuário.
+
+As rotas de escrita chamam `apply_transactions` / `apply_work_sessions` na
+mesma transação do banco em que os registros são criados, e o perfil lê
+apenas os agregados em vez de todo o histórico.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.orm import Session
+
+from ..db import models
+from ..db.database import dialect_insert
+from ..utils.records import get_field
+
+
+# Mês das transações sem data (legadas): entram nos totais, mas em nenhum mês
+# da janela, como no cálculo original e no GROUP BY de `stats`
+UNDATED_MONTH = ""
+
+
+def month_key(value: Any) -> str:
+    """
+    Converte uma data para a chave de mês 'YYYY-MM'.
+    Aceita datetime (Transaction.date) ou string 'YYYY-MM-DD' (WorkSession.date).
+    """
+    if value is None:
+        return UNDATED_MONTH
+    if isinstance(value, str):
+        return value[:7]
+    return value.strftime("%Y-%m")
+
+
+def month_expr(db: Session, column):
+    """Expressão SQL equivalente a `month_key` para uma coluna DateTime, conforme o dialeto."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def apply_transactions(db: Session, user_id: int, transactions: Iterable[Any]) -> None:
+    """
+    Acumula as transações informadas nos agregados mensais do usuário.
+    Não faz commit: o chamador controla a transação.
+    """
+    _apply_groups(
+        db,
+        user_id,
+        (
+            (
+                month_key(get_field(t, "date")),
+                get_field(t, "type"),
+                get_field(t, "category_id"),
+                Decimal(get_field(t, "amount")),
+                1,
+                get_field(t, "id"),
+            )
+            for t in transactions
+        ),
+    )
+
+
+def _apply_groups(db: Session, user_id: int, groups: Iterable[tuple]) -> None:
+    """Acumula grupos (mês, tipo, categoria, soma, quantidade, menor id) nos agregados."""
+    monthly = defaultdict(lambda: {"income": Decimal(0), "expenses": Decimal(0), "trips": 0})
+    by_category = defaultdict(lambda: {"earnings": Decimal(0), "trips": 0, "first_transaction_id": None})
+
+    for month, tx_type, category_id, amount, count, first_id in groups:
+        if tx_type == "income":
+            monthly[month]["income"] += amount
+            monthly[month]["trips"] += count
+            category = by_category[(month, category_id or 0)]
+            category["earnings"] += amount
+            category["trips"] += count
+            if category["first_transaction_id"] is None or first_id < category["first_transaction_id"]:
+                category["first_transaction_id"] = first_id
+        elif tx_type == "expense":
+            monthly[month]["expenses"] += amount
+
+    if monthly:
+        _upsert_monthly(
+            db,
+            [{"user_id": user_id, "month": m, "minutes": 0, **v} for m, v in monthly.items()],
+        )
+    if by_category:
+        _upsert_categories(
+            db,
+            [
+                {"user_id": user_id, "month": m, "category_id": c, **v}
+                for (m, c), v in by_category.items()
+            ],
+        )
+
+
+def apply_work_sessions(db: Session, user_id: int, sessions: Iterable[Any]) -> None:
+    """Acumula os minutos trabalhados das sessões nos agregados mensais."""
+    minutes = defaultdict(int)
+    for ws in sessions:
+        minutes[month_key(get_field(ws, "date"))] += get_field(ws, "total_minutes") or 0
+
+    if minutes:
+        _upsert_monthly(
+            db,
+            [
+                {
+                    "user_id": user_id,
+                    "month": m,
+                    "income": Decimal(0),
+                    "expenses": Decimal(0),
+                    "trips": 0,
+                    "minutes": v,
+                }
+                for m, v in minutes.items()
+            ],
+        )
+
+
+def _upsert_monthly(db: Session, rows: list) -> None:
+    table = models.MonthlyRollup
+    stmt = dialect_insert(db, table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "month"],
+        set_={
+            "income": table.income + stmt.excluded.income,
+            "expenses": table.expenses + stmt.excluded.expenses,
+            "trips": table.trips + stmt.excluded.trips,
+            "minutes": table.minutes + stmt.excluded.minutes,
+        },
+    )
+    db.execute(stmt)
+
+
+def _upsert_categories(db: Session, rows: list) -> None:
+    table = models.MonthlyCategoryRollup
+    stmt = dialect_insert(db, table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "month", "category_id"],
+        set_={
+            "earnings": table.earnings + stmt.excluded.earnings,
+            "trips": table.trips + stmt.excluded.trips,
+            "first_transaction_id": case(
+                (stmt.excluded.first_transaction_id < table.first_transaction_id, stmt.excluded.first_transaction_id),
+                else_=table.first_transaction_id,
+            ),
+        },
+    )
+    db.execute(stmt)
+
+
+def rebuild_user_rollups(db: Session, user_id: int) -> None:
+    """
+    Descarta e recalcula os agregados de um usuário a partir do histórico.
+    O histórico é agrupado por mês no próprio banco (GROUP BY), sem hidratar linhas.
+    """
+    db.execute(delete(models.MonthlyRollup).where(models.MonthlyRollup.user_id == user_id))
+    db.execute(
+        delete(models.MonthlyCategoryRollup).where(models.MonthlyCategoryRollup.user_id == user_id)
+    )
+
+    tx_month = month_expr(db, models.Transaction.date)
+    tx_groups = db.execute(
+        select(
+            tx_month,
+            models.Transaction.type,
+            models.Transaction.category_id,
+            func.sum(models.Transaction.amount),
+            func.count(models.Transaction.id),
+            func.min(models.Transaction.id),
+        )
+        .where(models.Transaction.user_id == user_id)
+        .group_by(tx_month, models.Transaction.type, models.Transaction.category_id)
+    )
+    _apply_groups(
+        db,
+        user_id,
+        ((month or UNDATED_MONTH, t, c, amount, count, first_id) for month, t, c, amount, count, first_id in tx_groups),
+    )
+
+    ws_month = func.substr(models.WorkSession.date, 1, 7)
+    ws_groups = db.execute(
+        select(ws_month.label("date"), func.sum(models.WorkSession.total_minutes).label("total_minutes"))
+        .where(models.WorkSession.user_id == user_id)
+        .group_by(ws_month)
+    )
+    apply_work_sessions(db, user_id, (row._asdict() for row in ws_groups))
+
+
+def rebuild_all_rollups(db: Session, user_id: Optional[int] = None) -> int:
+    """Reconstrói os agregados de um usuário ou de todos. Retorna quantos usuários foram processados."""
+    query = db.query(models.User.id)
+    if user_id is not None:
+        query = query.filter(models.User.id == user_id)
+
+    user_ids = [row.id for row in query.all()]
+    for uid in user_ids:
+        rebuild_user_rollups(db, uid)
+        db.commit()
+    return len(user_ids)
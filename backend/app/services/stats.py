@@ -0,0 +1,280 @@
+"""
+Camada de agregação das estatísticas do perfil.
+
+Os totais, a performance dos últimos 12 meses e o detalhamento por plataforma
+são calculados pelo banco (SUM/COUNT com GROUP BY) em um número constante de
+consultas, lendo dos agregados mensais quando existirem ou diretamente das
+tabelas de transações e sessões caso contrário.
+
+Os valores monetários são somados em centavos inteiros (ver app/utils/money.py)
+e convertidos para Decimal apenas ao montar os schemas de resposta.
+
+Diferenças em relação ao cálculo original em Python, que percorria o histórico:
+- Os meses são meses de calendário completos (UTC). O original começava cada
+  mês na hora corrente do dia 1 e terminava um segundo antes da virada, então
+  as transações do dia 1 anteriores a essa hora e as do último segundo do mês
+  não entravam em mês nenhum (continuavam nos totais).
+- As plataformas saem na ordem da primeira receita de cada uma (menor id), a
+  ordem em que o original as encontrava; antes ela dependia da ordem em que o
+  banco devolvia as linhas.
+"""
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from ..core import cache
+from ..db import models
+from ..models import schemas
+from ..utils import money
+from . import rollups
+
+MONTHS_IN_WINDOW = 12
+
+# Cache da resposta serializada do perfil, por usuário. Cada entrada guarda a
+# versão dos dados (users.data_version) com que foi gerada, então uma entrada
+# antiga nunca é servida, mesmo em outro worker; as rotas de escrita também a
+# removem. Expira na virada do mês, quando a janela de 12 meses se desloca.
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", 3600))
+PROFILE_CACHE_MAXSIZE = int(os.getenv("PROFILE_CACHE_MAXSIZE", 2048))
+
+profile_cache = cache.build_cache("profile", maxsize=PROFILE_CACHE_MAXSIZE, ttl=PROFILE_CACHE_TTL_SECONDS)
+
+
+@dataclass
+class MonthTotals:
+    income: int = 0  # Centavos
+    expenses: int = 0  # Centavos
+    trips: int = 0
+
+
+@dataclass
+class ProfileAggregates:
+    """
+    Resultado bruto das consultas, independente da origem (agregados ou
+    histórico). Valores monetários em centavos inteiros.
+    """
+    total_earnings: int = 0
+    total_expenses: int = 0
+    total_trips: int = 0
+    total_minutes: int = 0
+    months: Dict[str, MonthTotals] = field(default_factory=dict)
+    # (nome da categoria ou None, ganhos em centavos, corridas), na ordem da
+    # primeira receita de cada categoria (menor id de transação)
+    platforms: List[Tuple[Optional[str], int, int]] = field(default_factory=list)
+
+
+def month_window(now: datetime) -> List[datetime]:
+    """Primeiro dia de cada um dos últimos 12 meses, do mais recente ao mais antigo."""
+    return [
+        (now.replace(day=1) - timedelta(days=i * 30)).replace(day=1)
+        for i in range(MONTHS_IN_WINDOW)
+    ]
+
+
+def load_from_rollups(db: Session, user_id: int, months: List[str]) -> Optional[ProfileAggregates]:
+    """
+    Lê os agregados mensais mantidos incrementalmente. Retorna None se o
+    usuário não possui agregados. Quem tem algum agregado tem todos: o
+    histórico anterior aos agregados é populado pela migração 3f1a9c2b7d41.
+    """
+    totals = (
+        db.query(
+            func.count(models.MonthlyRollup.id),
+            func.sum(models.MonthlyRollup.income),
+            func.sum(models.MonthlyRollup.expenses),
+            func.sum(models.MonthlyRollup.trips),
+            func.sum(models.MonthlyRollup.minutes),
+        )
+        .filter(models.MonthlyRollup.user_id == user_id)
+        .one()
+    )
+    if not totals[0]:
+        return None
+
+    month_rows = db.query(models.MonthlyRollup).filter(
+        models.MonthlyRollup.user_id == user_id,
+        models.MonthlyRollup.month.in_(set(months)),
+    )
+    platform_rows = (
+        db.query(
+            models.Category.name,
+            func.sum(models.MonthlyCategoryRollup.earnings),
+            func.sum(models.MonthlyCategoryRollup.trips),
+        )
+        .outerjoin(models.Category, models.Category.id == models.MonthlyCategoryRollup.category_id)
+        .filter(models.MonthlyCategoryRollup.user_id == user_id)
+        .group_by(models.MonthlyCategoryRollup.category_id, models.Category.name)
+        .order_by(func.min(models.MonthlyCategoryRollup.first_transaction_id))
+    )
+
+    return ProfileAggregates(
+        total_earnings=money.to_cents(totals[1]),
+        total_expenses=money.to_cents(totals[2]),
+        total_trips=totals[3] or 0,
+        total_minutes=totals[4] or 0,
+        months={
+            r.month: MonthTotals(money.to_cents(r.income), money.to_cents(r.expenses), r.trips) for r in month_rows
+        },
+        platforms=[(name, money.to_cents(earnings), trips) for name, earnings, trips in platform_rows],
+    )
+
+
+def load_from_transactions(db: Session, user_id: int, months: List[str]) -> ProfileAggregates:
+    """Agrega diretamente o histórico com GROUP BY (três consultas, sem hidratar objetos ORM)."""
+    is_income = models.Transaction.type == "income"
+    is_expense = models.Transaction.type == "expense"
+    month = rollups.month_expr(db, models.Transaction.date).label("month")
+
+    month_rows = (
+        db.query(
+            month,
+            func.sum(case((is_income, models.Transaction.amount), else_=0)).label("income"),
+            func.sum(case((is_expense, models.Transaction.amount), else_=0)).label("expenses"),
+            func.sum(case((is_income, 1), else_=0)).label("trips"),
+        )
+        .filter(models.Transaction.user_id == user_id)
+        .group_by(month)
+        .all()
+    )
+    total_minutes = (
+        db.query(func.sum(models.WorkSession.total_minutes))
+        .filter(models.WorkSession.user_id == user_id)
+        .scalar()
+    )
+    platform_rows = (
+        db.query(
+            models.Category.name,
+            func.sum(models.Transaction.amount),
+            func.count(models.Transaction.id),
+        )
+        .outerjoin(models.Category, models.Category.id == models.Transaction.category_id)
+        .filter(models.Transaction.user_id == user_id, is_income)
+        .group_by(models.Transaction.category_id, models.Category.name)
+        .order_by(func.min(models.Transaction.id))
+    )
+
+    aggregates = ProfileAggregates(
+        total_minutes=total_minutes or 0,
+        platforms=[(name, money.to_cents(earnings), trips) for name, earnings, trips in platform_rows],
+    )
+    wanted = set(months)
+    for row in month_rows:
+        income, expenses = money.to_cents(row.income), money.to_cents(row.expenses)
+        aggregates.total_earnings += income
+        aggregates.total_expenses += expenses
+        aggregates.total_trips += row.trips or 0
+        if row.month in wanted:
+            aggregates.months[row.month] = MonthTotals(income, expenses, row.trips or 0)
+    return aggregates
+
+
+def build_profile(
+    aggregates: ProfileAggregates, month_starts: List[datetime]
+) -> Tuple[schemas.ProfileStats, List[schemas.MonthlyPerformance], List[schemas.PlatformBreakdown]]:
+    """
+    Monta os schemas de resposta a partir dos agregados. Somas e comparações são
+    feitas em centavos; os Decimal (e as divisões das médias e percentuais) só
+    aparecem nos valores da resposta.
+    """
+    total_trips = aggregates.total_trips
+    total_minutes = aggregates.total_minutes
+    total_earnings = money.to_decimal(aggregates.total_earnings)
+
+    month_totals = [aggregates.months.get(rollups.month_key(m), MonthTotals()) for m in month_starts]
+    monthly_stats = [
+        schemas.MonthlyPerformance(
+            month=month_start.strftime("%b/%Y"),
+            income=money.to_decimal(totals.income),
+            expenses=money.to_decimal(totals.expenses),
+            profit=money.difference(totals.income, totals.expenses),
+            trips=totals.trips,
+        )
+        for month_start, totals in zip(month_starts, month_totals)
+    ]
+    monthly_stats.reverse()  # para mostrar do mais antigo ao mais recente
+
+    best_month_income = max((t.income for t in month_totals), default=0)
+    monthly_average = (
+        money.to_decimal(sum(t.income for t in month_totals)) / len(month_totals) if month_totals else Decimal(0)
+    )
+
+    # Categorias com o mesmo nome são somadas, como no detalhamento original
+    platform_stats = defaultdict(lambda: {"earnings": 0, "trips": 0})
+    for name, earnings, trips in aggregates.platforms:
+        platform_name = name if name else "Outros"
+        platform_stats[platform_name]["earnings"] += earnings
+        platform_stats[platform_name]["trips"] += trips
+
+    platform_breakdown = []
+    for name, stats in platform_stats.items():
+        earnings = money.to_decimal(stats["earnings"])
+        platform_breakdown.append(
+            schemas.PlatformBreakdown(
+                name=name,
+                earnings=earnings,
+                trips=stats["trips"],
+                percentage=round((earnings / total_earnings) * 100, 2) if aggregates.total_earnings > 0 else 0,
+            )
+        )
+
+    profile_stats = schemas.ProfileStats(
+        total_trips=total_trips,
+        total_earnings=total_earnings,
+        total_expenses=money.to_decimal(aggregates.total_expenses),
+        net_profit=money.difference(aggregates.total_earnings, aggregates.total_expenses),
+        total_hours=round(total_minutes / 60),
+        average_per_trip=total_earnings / total_trips if total_trips > 0 else Decimal(0),
+        average_per_hour=total_earnings / (Decimal(total_minutes) / 60) if total_minutes > 0 else Decimal(0),
+        best_month_earnings=money.to_decimal(best_month_income),
+        monthly_average_earnings=monthly_average,
+    )
+    return profile_stats, monthly_stats, platform_breakdown
+
+
+def compute_profile(
+    db: Session, user_id: int, now: Optional[datetime] = None
+) -> Tuple[schemas.ProfileStats, List[schemas.MonthlyPerformance], List[schemas.PlatformBreakdown]]:
+    """
+    Calcula as estatísticas do perfil. Usa os agregados mensais se existirem e
+    recorre ao GROUP BY sobre o histórico para usuários sem agregados (ainda
+    sem escritas).
+    """
+    month_starts = month_window(now or datetime.now(timezone.utc))
+    months = [rollups.month_key(m) for m in month_starts]
+
+    aggregates = load_from_rollups(db, user_id, months)
+    if aggregates is None:
+        aggregates = load_from_transactions(db, user_id, months)
+    return build_profile(aggregates, month_starts)
+
+
+def profile_cache_ttl(now: datetime, trial_ends_at: Optional[datetime] = None) -> float:
+    """TTL do perfil em cache: até a virada do mês (ou o fim do teste grátis, se antes)."""
+    next_month = (now.replace(day=28) + timedelta(days=4)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    ttl = min(PROFILE_CACHE_TTL_SECONDS, (next_month - now).total_seconds())
+    if trial_ends_at and trial_ends_at > now:
+        ttl = min(ttl, (trial_ends_at - now).total_seconds())
+    return ttl
+
+
+def get_cached_profile(user_id: int, data_version: int) -> Optional[bytes]:
+    entry = profile_cache.get(str(user_id))
+    if entry is None or entry[0] != data_version:
+        return None
+    return entry[1]
+
+
+def store_profile(user_id: int, data_version: int, body: bytes, trial_ends_at: Optional[datetime] = None) -> None:
+    ttl = profile_cache_ttl(datetime.utcnow(), trial_ends_at)
+    if ttl > 0:
+        profile_cache.set(str(user_id), (data_version, body), ttl=ttl)
+
+
+def invalidate_profile(user_id: int) -> None:
+    profile_cache.delete(str(user_id))
@@ -0,0 +1,116 @@
+"""
+Resumo das transações por período, para os gráficos.
+
+Receitas, despesas e corridas são somadas pelo banco com GROUP BY sobre o
+início de cada período (hora, dia, semana ou mês), usando o índice
+(user_id, date) da paginação; o cliente recebe alguns valores por período em
+vez de todas as transações do intervalo. Com LEDGER_ANALYTICS, a soma é feita
+sobre o livro colunar em memória (ver app/services/ledger.py).
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from ..db import models
+from . import ledger
+
+# Limite de períodos por consulta (um ano por hora passaria de 8 mil)
+MAX_SUMMARY_PERIODS = 2000
+
+# Formatos da chave do período. A semana é identificada pela segunda-feira.
+_SQLITE_FORMATS = {"hour": "%Y-%m-%dT%H:00", "day": "%Y-%m-%d", "month": "%Y-%m"}
+_POSTGRES_FORMATS = {"hour": 'YYYY-MM-DD"T"HH24:00', "day": "YYYY-MM-DD", "week": "YYYY-MM-DD", "month": "YYYY-MM"}
+_DAYS_PER_PERIOD = {"hour": 1 / 24, "day": 1, "week": 7, "month": 28}
+
+
+def period_expr(dialect: str, granularity: str, column):
+    """Expressão SQL com a chave do período de `column`, conforme o dialeto."""
+    if dialect == "postgresql":
+        return func.to_char(func.date_trunc(granularity, column), _POSTGRES_FORMATS[granularity])
+    if granularity == "week":
+        # 'weekday 0' avança até o domingo; seis dias antes é a segunda-feira da semana
+        return func.date(column, "weekday 0", "-6 days")
+    return func.strftime(_SQLITE_FORMATS[granularity], column)
+
+
+def check_range(start_date: date, end_date: date, granularity: str) -> None:
+    """Rejeita intervalos invertidos ou com períodos demais para a granularidade."""
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date anterior a start_date.")
+    periods = ((end_date - start_date).days + 1) / _DAYS_PER_PERIOD[granularity]
+    if periods > MAX_SUMMARY_PERIODS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Intervalo longo demais para granularidade '{granularity}' (máximo de {MAX_SUMMARY_PERIODS} períodos).",
+        )
+
+
+def summarize(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    granularity: str = "day",
+    group_by: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Totais por período (e por categoria ou origem, se pedido), do mais antigo ao
+    mais recente. Períodos sem transações não aparecem. `end_date` é inclusiva.
+    """
+    check_range(start_date, end_date, granularity)
+    if ledger.LEDGER_ANALYTICS:
+        return ledger.summarize(db, user_id, start_date, end_date, granularity, group_by)
+    tx = models.Transaction
+    is_income = tx.type == "income"
+    is_expense = tx.type == "expense"
+    period = period_expr(db.get_bind().dialect.name, granularity, tx.date).label("period")
+
+    if group_by == "category":
+        group_columns = [tx.category_id.label("category_id"), models.Category.name.label("group")]
+    elif group_by == "source":
+        group_columns = [tx.source.label("group")]
+    else:
+        group_columns = []
+
+    stmt = select(
+        period,
+        *group_columns,
+        func.sum(case((is_income, tx.amount), else_=0)).label("income"),
+        func.sum(case((is_expense, tx.amount), else_=0)).label("expenses"),
+        func.sum(case((is_income, 1), else_=0)).label("trips"),
+    ).where(
+        tx.user_id == user_id,
+        tx.date >= datetime.combine(start_date, time.min),
+        tx.date < datetime.combine(end_date + timedelta(days=1), time.min),
+    )
+    if group_by == "category":
+        stmt = stmt.outerjoin(models.Category, models.Category.id == tx.category_id)
+        # NULLS LAST explícito: o SQLite ordena os nulos primeiro e o PostgreSQL por último
+        stmt = stmt.group_by(period, tx.category_id, models.Category.name).order_by(
+            period, tx.category_id.nulls_last()
+        )
+    elif group_by == "source":
+        stmt = stmt.group_by(period, tx.source).order_by(period, tx.source.nulls_last())
+    else:
+        stmt = stmt.group_by(period).order_by(period)
+
+    buckets = []
+    for row in db.execute(stmt).mappings():
+        income = row["income"] or Decimal(0)
+        expenses = row["expenses"] or Decimal(0)
+        buckets.append(
+            {
+                "period": str(row["period"]),
+                "category_id": row.get("category_id"),
+                "group": row.get("group"),
+                "income": income,
+                "expenses": expenses,
+                "profit": income - expenses,
+                "trips": row["trips"] or 0,
+            }
+        )
+    return buckets
@@ -0,0 +1,48 @@
+"""
+Versão dos dados de cada usuário, usada como ETag nas listagens.
+
+Toda escrita nos dados do usuário chama `bump_data_version` na mesma transação;
+as rotas de leitura comparam a versão atual com o If-None-Match antes de
+executar qualquer consulta pesada.
+"""
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..db import models
+
+
+def bump_data_version(db: Session, user_id: int) -> None:
+    """Incrementa a versão dos dados do usuário. Não faz commit."""
+    db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        # Mantém updated_at: a versão muda com os dados, não com o cadastro
+        .values(data_version=models.User.data_version + 1, updated_at=models.User.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_data_version(db: Session, user_id: int) -> int:
+    """Lê a versão atual (consulta pela chave primária)."""
+    return db.scalar(select(models.User.data_version).where(models.User.id == user_id)) or 0
+
+
+def make_etag(user_id: int, version: int, scope: Optional[str] = None) -> str:
+    """ETag fraco: o corpo pode variar na serialização sem mudança nos dados."""
+    tag = f"u{user_id}-v{version}"
+    if scope:
+        tag += f"-{scope}"
+    return f'W/"{tag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara o If-None-Match com o ETag (comparação fraca, aceita listas e '*')."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.removeprefix("W/") == opaque for candidate in candidates)
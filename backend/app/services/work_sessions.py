@@ -0,0 +1,121 @@
+"""
+Sessões de trabalho abertas (início e fim registrados pelo servidor).
+
+Cada usuário tem no máximo uma sessão aberta, garantido pelo índice único
+parcial `uq_work_sessions_user_id_open`. O total de minutos é calculado no
+encerramento, e só então a sessão entra nos agregados, nas metas e nas
+conquistas.
+
+A sessão ativa fica num cache pequeno por usuário, com a versão dos dados
+(users.data_version) com que foi lida: início e fim incrementam a versão, então
+uma entrada antiga nunca é servida, mesmo em outro worker. Na falta do cache, a
+leitura usa o índice parcial e nunca percorre o histórico.
+"""
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core import cache
+from ..db import models
+from ..models import schemas
+from . import achievements, goals, rollups, stats, versioning
+
+ACTIVE_SESSION_CACHE_TTL_SECONDS = float(os.getenv("ACTIVE_SESSION_CACHE_TTL_SECONDS", 300))
+
+SESSION_ALREADY_OPEN = "Já existe uma sessão de trabalho aberta."
+
+active_cache = cache.build_cache("active_sessions", maxsize=4096, ttl=ACTIVE_SESSION_CACHE_TTL_SECONDS)
+
+
+def _utc_naive(value: Optional[datetime]) -> datetime:
+    """Normaliza para UTC sem fuso, como as demais colunas DateTime."""
+    if value is None:
+        return datetime.utcnow()
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def elapsed_minutes(start: datetime, end: datetime) -> int:
+    return max(int((end - start).total_seconds() // 60), 0)
+
+
+def find_open_session(db: Session, user_id: int) -> Optional[models.WorkSession]:
+    """Sessão aberta do usuário (busca pelo índice parcial)."""
+    return db.scalar(
+        select(models.WorkSession).where(
+            models.WorkSession.user_id == user_id,
+            models.WorkSession.is_open == True,  # noqa: E712 (mesma expressão do índice parcial)
+        )
+    )
+
+
+def start_session(db: Session, user_id: int, start: schemas.WorkSessionStart) -> models.WorkSession:
+    """Abre uma sessão; 409 se o usuário já tem uma aberta. Faz commit."""
+    if find_open_session(db, user_id) is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=SESSION_ALREADY_OPEN)
+    start_time = _utc_naive(start.start_time)
+    session = models.WorkSession(
+        user_id=user_id,
+        start_time=start_time,
+        date=start.date or start_time.date().isoformat(),
+        is_open=True,
+    )
+    db.add(session)
+    versioning.bump_data_version(db, user_id)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Outra requisição abriu uma sessão entre a verificação e o INSERT
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=SESSION_ALREADY_OPEN)
+    active_cache.delete(str(user_id))
+    db.refresh(session)
+    return session
+
+
+def stop_session(db: Session, user_id: int, stop: schemas.WorkSessionStop) -> models.WorkSession:
+    """Encerra a sessão aberta, calculando total_minutes; 404 se não houver. Faz commit."""
+    session = find_open_session(db, user_id)
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhuma sessão de trabalho aberta.")
+    end_time = _utc_naive(stop.end_time)
+    if end_time < session.start_time:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_time anterior ao início da sessão.")
+
+    session.end_time = end_time
+    session.total_minutes = elapsed_minutes(session.start_time, end_time)
+    session.is_open = False
+    rollups.apply_work_sessions(db, user_id, [session])
+    goals.apply_work_sessions(db, user_id, [session])
+    achievements.apply_work_sessions(db, user_id, [session])
+    versioning.bump_data_version(db, user_id)
+    db.commit()
+    active_cache.delete(str(user_id))
+    stats.invalidate_profile(user_id)
+    db.refresh(session)
+    return session
+
+
+def get_active_session(db: Session, user_id: int, now: Optional[datetime] = None) -> dict:
+    """Sessão aberta (ou None) e os minutos decorridos até agora."""
+    version = versioning.get_data_version(db, user_id)
+    entry = active_cache.get(str(user_id))
+    if entry is None or entry[0] != version:
+        session = find_open_session(db, user_id)
+        snapshot = schemas.WorkSession.model_validate(session) if session else None
+        entry = (version, snapshot)
+        active_cache.set(str(user_id), entry)
+
+    snapshot = entry[1]
+    if snapshot is None:
+        return {"session": None, "elapsed_minutes": None}
+    return {
+        "session": snapshot,
+        "elapsed_minutes": elapsed_minutes(snapshot.start_time, now or datetime.utcnow()),
+    }
@@ -0,0 +1,49 @@
+"""
+Valores monetários em centavos inteiros.
+
+Somas, comparações e máximos de dinheiro feitos com int são exatos e bem mais
+baratos que com Decimal. As agregações trabalham em centavos e convertem para
+Decimal apenas na borda (schemas de resposta e gravação no banco).
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
+
+CENT = Decimal("0.01")
+
+
+def to_cents(value: Any) -> int:
+    """
+    Centavos de um valor vindo do banco (Decimal, int ou str), sem passar por
+    float. None vira 0; casas além da segunda são arredondadas como no NUMERIC(10, 2).
+    """
+    if not value:
+        return 0
+    return int(quantize(value).scaleb(2))
+
+
+def quantize(value: Any) -> Decimal:
+    """
+    Forma canônica de um valor monetário: Decimal com exatamente duas casas,
+    arredondado como no NUMERIC(10, 2). Ex.: '10' -> Decimal('10.00').
+    """
+    return Decimal(value).quantize(CENT, ROUND_HALF_UP)
+
+
+def to_decimal(cents: int) -> Decimal:
+    """
+    Decimal com duas casas a partir de centavos. Zero vira Decimal(0), como as
+    somas vazias do banco normalizadas pelas estatísticas.
+    """
+    if not cents:
+        return Decimal(0)
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def difference(cents: int, other: int) -> Decimal:
+    """
+    `to_decimal(cents) - to_decimal(other)` sem as conversões intermediárias:
+    o zero mantém as duas casas quando algum dos lados não é zero.
+    """
+    if not cents and not other:
+        return Decimal(0)
+    return Decimal(int(cents) - int(other)).scaleb(-2)
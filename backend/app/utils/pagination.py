@@ -0,0 +1,28 @@
+"""
+Cursores opacos para paginação por keyset (data, id).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Cursor malformado ou adulterado."""
+
+
+def encode_cursor(date: Optional[datetime], item_id: int) -> str:
+    """Codifica a posição (data, id) do último item da página. A data pode ser nula (linhas legadas)."""
+    raw = json.dumps({"d": date.isoformat() if date else None, "i": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decodifica um cursor gerado por `encode_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_date = None if data["d"] is None else datetime.fromisoformat(data["d"])
+        return last_date, int(data["i"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor("Cursor inválido.") from exc
@@ -0,0 +1,12 @@
+"""
+Acesso uniforme a registros que chegam tanto como objetos ORM quanto como
+dicionários (linhas de INSERT em lote, resultados de GROUP BY).
+"""
+from typing import Any
+
+
+def get_field(item: Any, name: str) -> Any:
+    """Lê um campo tanto de objetos ORM quanto de dicionários (None se ausente)."""
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
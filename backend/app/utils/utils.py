@@ -1,12 +1,17 @@
+import asyncio
 import hashlib
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from decimal import Decimal
 from io import BytesIO
-from typing import Dict, List, Any
+from typing import Any, BinaryIO, Dict, Iterator, List
 
+import numpy as np
 import pandas as pd
 import pypdf
+from pandas.tseries.api import guess_datetime_format
 
 
 def generate_external_id(date: str, amount: str, source: str) -> str:
@@ -18,9 +23,22 @@ def generate_external_id(date: str, amount: str, source: str) -> str:
     return hashlib.md5(unique_string.encode()).hexdigest()
 
 
+def _clean_amount_str(amount_str: str) -> str:
+    """Mantém apenas dígitos e um ponto decimal. Ex: 'R$ 1.234,50' -> '1234.50'"""
+    # Troca a vírgula do decimal por ponto e remove outros caracteres não numéricos
+    cleaned_str = re.sub(r"[^0-9,.]", "", amount_str).replace(",", ".")
+
+    # Se houver mais de um ponto, remove todos exceto o último
+    if cleaned_str.count('.') > 1:
+        parts = cleaned_str.split('.')
+        cleaned_str = "".join(parts[:-1]) + "." + parts[-1]
+    return cleaned_str
+
+
 def _clean_amount(amount_str: Any) -> Decimal:
     """
-    Limpa e converte o valor monetário para Decimal.
+    Limpa e converte o valor monetário para Decimal, sem arredondar: as casas
+    além dos centavos são arredondadas só na gravação (`imports.insert_batch`).
     Ex: 'R$ 25,50' -> Decimal('25.50')
     """
     if isinstance(amount_str, (int, float, Decimal)):
@@ -29,32 +47,22 @@ def _clean_amount(amount_str: Any) -> Decimal:
     if not isinstance(amount_str, str):
         return Decimal(0)
 
-    # Troca a vírgula do decimal por ponto e remove outros caracteres não numéricos
-    cleaned_str = re.sub(r"[^0-9,.]", "", amount_str).replace(",", ".")
-    
-    # Se houver mais de um ponto, remove todos exceto o último
-    if cleaned_str.count('.') > 1:
-        parts = cleaned_str.split('.')
-        cleaned_str = "".join(parts[:-1]) + "." + parts[-1]
+    return _to_decimal(_clean_amount_str(amount_str))
 
-    try:
-        return Decimal(cleaned_str)
-    except Exception:
-        return Decimal(0)
 
-
-def parse_uber_csv(contents: bytes) -> List[Dict]:
-    """Processa um extrato CSV da Uber."""
-    transactions = []
-    df = pd.read_csv(BytesIO(contents))
-    
-    # Detecta colunas de data e valor com nomes comuns em extratos da Uber
+def _detect_columns(df: pd.DataFrame):
+    """Detecta colunas de data e valor com nomes comuns em extratos da Uber."""
     date_col = next((col for col in df.columns if 'date' in col.lower() or 'data' in col.lower()), None)
     amount_col = next((col for col in df.columns if 'amount' in col.lower() or 'valor' in col.lower() or 'ganhos' in col.lower()), None)
-    
-    if not date_col or not amount_col:
-        return []
+    return date_col, amount_col
 
+
+def _parse_frame_rows(df: pd.DataFrame, date_col: str, amount_col: str) -> List[Dict]:
+    """
+    Implementação linha a linha (iterrows). Mantida como referência de
+    comportamento e como fallback do caminho vetorizado.
+    """
+    transactions = []
     for _, row in df.iterrows():
         date_str = str(row[date_col])
         amount_val = str(row[amount_col])
@@ -77,10 +85,117 @@ def parse_uber_csv(contents: bytes) -> List[Dict]:
                 "source": "Uber",
                 "external_id": generate_external_id(date_str, amount_val, "Uber")
             })
-            
+
     return transactions
 
 
+def _to_decimal(cleaned_str: str) -> Decimal:
+    try:
+        return Decimal(cleaned_str)
+    except Exception:
+        return Decimal(0)
+
+
+def _parse_dates_dayfirst(date_strs: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna de datas reproduzindo `pd.to_datetime(valor, dayfirst=True)`
+    aplicado a cada elemento: para cada valor, a interpretação com o dia antes do
+    mês tem preferência e a com o mês antes do dia é usada quando a primeira é
+    inválida. Valores em outro formato ficam como NaT (tratados individualmente).
+    """
+    fmt = next((f for f in (guess_datetime_format(v, dayfirst=True) for v in date_strs.head(5)) if f), None)
+    if not fmt or "%d" not in fmt or "%m" not in fmt:
+        return pd.Series(pd.NaT, index=date_strs.index)
+
+    swapped = fmt.replace("%d", "\0").replace("%m", "%d").replace("\0", "%m")
+    day_first, month_first = (fmt, swapped) if fmt.index("%d") < fmt.index("%m") else (swapped, fmt)
+
+    parsed = pd.to_datetime(date_strs, format=day_first, errors='coerce')
+    missing = parsed.isna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(date_strs[missing], format=month_first, errors='coerce')
+    return parsed
+
+
+def _parse_frame_vectorized(df: pd.DataFrame, date_col: str, amount_col: str) -> List[Dict]:
+    """
+    Mesmo resultado de `_parse_frame_rows`, mas processando colunas inteiras:
+    limpeza de valores com operações de string do pandas, conversão das datas
+    com `to_datetime` sobre a coluna e chaves do external_id montadas de uma vez.
+    """
+    if df.empty:
+        return []
+
+    date_values, amount_values = df[date_col], df[amount_col]
+    # O iterrows converte cada linha para o dtype comum do DataFrame (ex.: int -> float
+    # quando todas as colunas são numéricas); replica isso para gerar as mesmas strings.
+    row_dtype = df.iloc[:1].to_numpy().dtype
+    if row_dtype != object:
+        date_values, amount_values = date_values.astype(row_dtype), amount_values.astype(row_dtype)
+    date_strs = date_values.map(str)
+    amount_strs = amount_values.map(str)
+
+    # Equivalente vetorizado de _clean_amount: mantém apenas dígitos, vírgula e ponto,
+    # troca vírgula por ponto e remove todos os pontos exceto o último.
+    cleaned = (
+        amount_strs.str.replace(r"[^0-9,.]", "", regex=True)
+        .str.replace(",", ".", regex=False)
+        .str.replace(r"\.(?=.*\.)", "", regex=True)
+    )
+    amounts = [_to_decimal(v) for v in cleaned.tolist()]
+
+    parsed_dates = _parse_dates_dayfirst(date_strs)
+    missing_dates = parsed_dates.isna().tolist()
+    py_dates = parsed_dates.dt.to_pydatetime().tolist()
+    # Chave do external_id montada de uma vez para a coluna (mesma de generate_external_id)
+    id_keys = (date_strs + "-" + amount_strs + "-Uber").tolist()
+
+    transactions = []
+    for date_str, amount, missing, parsed, id_key in zip(
+        date_strs.tolist(), amounts, missing_dates, py_dates, id_keys
+    ):
+        if not (date_str and amount > 0):
+            continue
+        if missing:
+            # Datas em formato diferente do inferido para a coluna: tenta individualmente
+            try:
+                parsed = pd.to_datetime(date_str, dayfirst=True, errors='coerce')
+            except Exception:
+                continue
+            if pd.isna(parsed):
+                continue
+            parsed = parsed.to_pydatetime()
+
+        transactions.append({
+            "date": parsed,
+            "amount": amount,
+            "description": "Corrida Uber",
+            "type": "income",
+            "source": "Uber",
+            "external_id": hashlib.md5(id_key.encode()).hexdigest()
+        })
+
+    return transactions
+
+
+def parse_uber_frame(df: pd.DataFrame) -> List[Dict]:
+    """Converte um DataFrame de extrato da Uber em transações."""
+    date_col, amount_col = _detect_columns(df)
+    if not date_col or not amount_col:
+        return []
+
+    try:
+        return _parse_frame_vectorized(df, date_col, amount_col)
+    except (ValueError, TypeError):
+        # Ex.: fusos horários misturados na coluna de data
+        return _parse_frame_rows(df, date_col, amount_col)
+
+
+def parse_uber_csv(contents: bytes) -> List[Dict]:
+    """Processa um extrato CSV da Uber."""
+    return parse_uber_frame(pd.read_csv(BytesIO(contents)))
+
+
 def parse_99_csv(contents: bytes) -> List[Dict]:
     """Processa um extrato CSV da 99."""
     # A lógica é similar à da Uber, mas pode ter colunas diferentes
@@ -95,17 +210,23 @@ def parse_indrive_csv(contents: bytes) -> List[Dict]:
     return parse_uber_csv(contents) # Reutiliza a lógica genérica por enquanto
 
 
+def detect_platform(text: str) -> str:
+    """Identifica a plataforma do extrato por palavras-chave no texto."""
+    text = text.lower()
+    if 'uber' in text:
+        return "uber"
+    if '99' in text:
+        return "99"
+    if 'indrive' in text:
+        return "indrive"
+    # Fallback para o parser da Uber
+    return "uber"
+
+
 def parse_generic_csv(contents: bytes) -> List[Dict]:
     """Tenta processar um CSV genérico, identificando a plataforma pelo conteúdo."""
-    text_content = contents.decode('utf-8', errors='ignore').lower()
-    if 'uber' in text_content:
-        return parse_uber_csv(contents)
-    if '99' in text_content:
-        return parse_99_csv(contents)
-    if 'indrive' in text_content:
-        return parse_indrive_csv(contents)
-    # Fallback para o parser da Uber
-    return parse_uber_csv(contents)
+    platform = detect_platform(contents.decode('utf-8', errors='ignore'))
+    return CSV_PARSERS[platform](contents)
 
 
 def parse_xlsx(contents: bytes) -> List[Dict]:
@@ -115,23 +236,21 @@ def parse_xlsx(contents: bytes) -> List[Dict]:
     return parse_generic_csv(csv_buffer)
 
 
-def parse_pdf(contents: bytes) -> List[Dict]:
-    """
-    Processa um extrato em PDF.
-    AVISO: PDF parsing é frágil e depende muito do layout do documento.
-    Esta função é um exemplo e provavelmente precisará de ajustes.
-    """
-    transactions = []
-    reader = pypdf.PdfReader(BytesIO(contents))
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text()
+# Regex para encontrar data e valor (ex: 21/07/2025 ... R$ 35,50)
+# Este Regex é um exemplo e precisa ser adaptado ao formato exato do seu PDF.
+PDF_PATTERN = re.compile(r"(\d{2}/\d{2}/\d{4}).*?R\$\s*([\d,]+\.?\d*)", re.IGNORECASE)
+_PDF_DATE = re.compile(r"\d{2}/\d{2}/\d{4}")
 
-    # Regex para encontrar data e valor (ex: 21/07/2025 ... R$ 35,50)
-    # Este Regex é um exemplo e precisa ser adaptado ao formato exato do seu PDF.
-    pattern = re.compile(r"(\d{2}/\d{2}/\d{4}).*?R\$\s*([\d,]+\.?\d*)", re.IGNORECASE)
-    matches = pattern.findall(text)
+# Número de processos da extração paralela de PDFs (padrão: número de CPUs)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", 0)) or os.cpu_count() or 1
+# PDFs com menos páginas que isso são processados no próprio processo
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 8))
 
+_pdf_executor = None
+
+
+def _pdf_matches_to_transactions(matches) -> List[Dict]:
+    transactions = []
     for date_str, amount_str in matches:
         amount = _clean_amount(amount_str)
         if amount > 0:
@@ -148,5 +267,204 @@ def parse_pdf(contents: bytes) -> List[Dict]:
                 "source": "Uber", # Assumindo que o PDF é da Uber
                 "external_id": generate_external_id(date_str, amount_str, "Uber-PDF")
             })
+    return transactions
+
 
-    return transactions
\ No newline at end of file
+def parse_pdf(contents: bytes) -> List[Dict]:
+    """
+    Processa um extrato em PDF.
+    AVISO: PDF parsing é frágil e depende muito do layout do documento.
+    Esta função é um exemplo e provavelmente precisará de ajustes.
+    """
+    reader = pypdf.PdfReader(BytesIO(contents))
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text()
+
+    return _pdf_matches_to_transactions(PDF_PATTERN.findall(text))
+
+
+def _extract_pdf_pages(contents: bytes, start: int, stop: int) -> List[tuple]:
+    """
+    Executado nos processos filhos: extrai o texto de um intervalo de páginas
+    e aplica o padrão em cada uma. Retorna (texto, ocorrências) por página.
+    """
+    reader = pypdf.PdfReader(BytesIO(contents))
+    pages = []
+    for page in reader.pages[start:stop]:
+        text = page.extract_text()
+        pages.append((text, PDF_PATTERN.findall(text)))
+    return pages
+
+
+def _page_may_continue(text: str) -> bool:
+    """
+    Indica se uma ocorrência do padrão pode atravessar o fim da página: isso só
+    acontece se a última linha com conteúdo tiver uma data ou se o texto
+    terminar no meio de uma data.
+    """
+    if text and text[-1] in "0123456789/":
+        return True
+    last_line = text.rstrip().rsplit("\n", 1)[-1]
+    return bool(_PDF_DATE.search(last_line))
+
+
+def _merge_pdf_pages(pages: List[tuple]) -> List[Dict]:
+    """
+    Junta os resultados por página na ordem original. Se alguma ocorrência puder
+    atravessar a quebra de página, reaplica o padrão ao texto completo, que é
+    exatamente o que `parse_pdf` faz.
+    """
+    if any(_page_may_continue(text) for text, _ in pages[:-1]):
+        return _pdf_matches_to_transactions(PDF_PATTERN.findall("".join(text for text, _ in pages)))
+    return _pdf_matches_to_transactions([m for _, matches in pages for m in matches])
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """Pool de processos compartilhado da extração de PDFs, criado sob demanda."""
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(cancel_futures=True)
+        _pdf_executor = None
+
+
+def _pdf_page_ranges(contents: bytes, workers: int) -> List[tuple]:
+    """Divide as páginas em um intervalo contíguo por processo."""
+    total = len(pypdf.PdfReader(BytesIO(contents)).pages)
+    if total < PDF_PARALLEL_MIN_PAGES or workers <= 1:
+        return []
+    size = -(-total // workers)
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def parse_pdf_parallel(contents: bytes, workers: int = None) -> List[Dict]:
+    """
+    Mesmo resultado de `parse_pdf`, com a extração de texto distribuída por
+    páginas entre processos. PDFs pequenos são processados localmente.
+    """
+    workers = workers or PDF_WORKERS
+    ranges = _pdf_page_ranges(contents, workers)
+    if not ranges:
+        return parse_pdf(contents)
+
+    executor = get_pdf_executor()
+    futures = [executor.submit(_extract_pdf_pages, contents, start, stop) for start, stop in ranges]
+    return _merge_pdf_pages([page for future in futures for page in future.result()])
+
+
+async def parse_pdf_async(contents: bytes, workers: int = None) -> List[Dict]:
+    """Versão assíncrona de `parse_pdf_parallel`, que não bloqueia o event loop."""
+    loop = asyncio.get_running_loop()
+    workers = workers or PDF_WORKERS
+    ranges = await loop.run_in_executor(None, _pdf_page_ranges, contents, workers)
+    if not ranges:
+        return await loop.run_in_executor(None, parse_pdf, contents)
+
+    executor = get_pdf_executor()
+    chunks = await asyncio.gather(
+        *(loop.run_in_executor(executor, _extract_pdf_pages, contents, start, stop) for start, stop in ranges)
+    )
+    return _merge_pdf_pages([page for chunk in chunks for page in chunk])
+
+
+CSV_PARSERS = {
+    "uber": parse_uber_csv,
+    "99": parse_99_csv,
+    "indrive": parse_indrive_csv,
+}
+
+# Parsers por DataFrame, usados na importação em streaming (99 e inDrive
+# reutilizam a lógica da Uber, como nos parsers acima)
+FRAME_PARSERS = {
+    "uber": parse_uber_frame,
+    "99": parse_uber_frame,
+    "indrive": parse_uber_frame,
+}
+
+# Linhas lidas por vez na importação em streaming
+CSV_CHUNK_SIZE = 10_000
+
+
+_TEXT = np.dtype(object)
+
+
+def _merge_dtypes(dtypes: Dict[str, np.dtype], chunk: pd.DataFrame) -> Dict[str, np.dtype]:
+    """
+    Combina os tipos inferidos de um bloco com os dos blocos anteriores, como o
+    `read_csv` do arquivo inteiro faria: inteiros com NaN ou decimais viram
+    float e qualquer mistura com texto vira texto.
+    """
+    merged = dict(dtypes)
+    for column, dtype in chunk.dtypes.items():
+        dtype = dtype if dtype.kind in "iufb" else _TEXT
+        previous = merged.setdefault(column, dtype)
+        if previous == dtype:
+            continue
+        if previous.kind in "iuf" and dtype.kind in "iuf":
+            merged[column] = np.result_type(previous, dtype)
+        else:
+            merged[column] = _TEXT
+    return merged
+
+
+def iter_csv_batches(
+    stream: BinaryIO, platform: str = None, chunksize: int = None
+) -> Iterator[List[Dict]]:
+    """
+    Lê um extrato CSV de forma incremental e gera lotes de transações.
+    A plataforma é detectada apenas pelo cabeçalho e pelo primeiro bloco, e o
+    uso de memória fica limitado ao tamanho do bloco, não ao do arquivo.
+
+    O arquivo é lido duas vezes: a primeira passada só infere o tipo de cada
+    coluna no arquivo inteiro, e a segunda lê os blocos com esses tipos. Assim
+    as células viram as mesmas strings (e os mesmos external_id) do modo em
+    memória, que infere os tipos de uma vez. O stream precisa aceitar seek.
+    Lança ValueError imediatamente se o arquivo não for um CSV legível.
+    """
+    chunksize = chunksize or CSV_CHUNK_SIZE
+    start = stream.tell()
+    dtypes: Dict[str, np.dtype] = {}
+    for chunk in pd.read_csv(stream, chunksize=chunksize):
+        dtypes = _merge_dtypes(dtypes, chunk)
+    stream.seek(start)
+
+    # Colunas de texto seguem com a inferência padrão (str), como no modo em memória
+    dtype = {column: t for column, t in dtypes.items() if t != _TEXT}
+    reader = pd.read_csv(stream, chunksize=chunksize, dtype=dtype)
+    first = next(reader, None)
+    if first is None:
+        return iter(())
+
+    if not platform or platform.lower() not in FRAME_PARSERS:
+        platform = detect_platform(" ".join(map(str, first.columns)) + "\n" + first.to_csv(index=False))
+    parse_frame = FRAME_PARSERS[platform.lower()]
+
+    def batches():
+        yield parse_frame(first)
+        for chunk in reader:
+            yield parse_frame(chunk)
+
+    return batches()
+
+
+def parse_statement(filename: str, contents: bytes, platform: str = None) -> List[Dict]:
+    """
+    Escolhe o parser pelo tipo do arquivo (e pela plataforma, no caso de CSV).
+    Lança ValueError para formatos não suportados.
+    """
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        parser = CSV_PARSERS.get((platform or "").lower(), parse_generic_csv)
+        return parser(contents)
+    if extension in ("xlsx", "xls"):
+        return parse_xlsx(contents)
+    if extension == "pdf":
+        return parse_pdf(contents)
+    raise ValueError(f"Formato de arquivo não suportado: .{extension}")
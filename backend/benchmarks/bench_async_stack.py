@@ -0,0 +1,85 @@
+"""
+Compara a pilha síncrona (threadpool) com a assíncrona (AsyncSession) em
+GET /api/transactions sob níveis crescentes de concorrência, reportando
+vazão e p99 de latência. Aponte DATABASE_URL para um PostgreSQL para medir
+o cenário de produção; o padrão é o SQLite temporário dos benchmarks.
+
+    python -m benchmarks.bench_async_stack [--transactions 5000] [--requests 2000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import reset_database, seed_user
+
+import httpx
+from fastapi import FastAPI
+
+from app.core import security
+from app.db import database
+from app.main import include_routers
+
+
+async def run_level(app: FastAPI, token: str, concurrency: int, n_requests: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        async def one():
+            async with semaphore:
+                t0 = time.perf_counter()
+                response = await client.get("/api/transactions", params={"limit": 50})
+                latencies.append(time.perf_counter() - t0)
+                assert response.status_code == 200
+
+        t0 = time.perf_counter()
+        outcomes = await asyncio.gather(*(one() for _ in range(n_requests)), return_exceptions=True)
+        elapsed = time.perf_counter() - t0
+
+    # Na pilha síncrona, acima do tamanho do pool as threads esperam conexões
+    # que só voltam quando outras threads terminam: alguns pedidos falham por timeout
+    errors = sum(isinstance(outcome, Exception) for outcome in outcomes)
+    return {
+        "errors": errors,
+        "rps": (n_requests - errors) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": statistics.quantiles(latencies, n=100)[-1],
+    }
+
+
+async def run_stack(use_async: bool, token: str, levels, n_requests: int) -> dict:
+    app = FastAPI()
+    include_routers(app, use_async=use_async)
+    results = {level: await run_level(app, token, level, n_requests) for level in levels}
+    await database.dispose_async_engine()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=5_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--levels", default="5,15,50,100")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(",")]
+
+    db = reset_database()
+    seed_user(db, args.transactions)
+    db.close()
+    token = security.create_access_token({"sub": "bench42"})
+
+    for use_async in (False, True):
+        results = asyncio.run(run_stack(use_async, token, levels, args.requests))
+        print(f"\nGET /api/transactions, pilha {'assíncrona' if use_async else 'síncrona'}")
+        for level, r in results.items():
+            print(
+                f"  concorrência {level:>4}: {r['rps']:8.1f} req/s"
+                f"  p50 {r['p50'] * 1000:7.1f} ms  p99 {r['p99'] * 1000:7.1f} ms  erros {r['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
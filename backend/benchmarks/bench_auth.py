@@ -0,0 +1,47 @@
+"""
+Mede o custo de autenticar o mesmo token repetidamente, com e sem o cache
+de payloads verificados.
+
+    python -m benchmarks.bench_auth [--requests 20000]
+"""
+import argparse
+from datetime import timedelta
+
+from benchmarks.common import report, timed
+
+from jose import jwt
+
+from app.core import security
+
+
+def decode_uncached(token: str, n: int):
+    for _ in range(n):
+        payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
+    return payload
+
+
+def decode_cached(token: str, n: int):
+    for _ in range(n):
+        payload = security.decode_access_token(token)
+    return payload
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    token = security.create_access_token({"sub": "bench"}, expires_delta=timedelta(hours=1))
+    uncached_s, expected = timed(decode_uncached, token, args.requests)
+    cached_s, payload = timed(decode_cached, token, args.requests)
+
+    assert payload == expected
+    report(
+        f"Verificação de {args.requests} tokens repetidos",
+        {"jwt.decode a cada requisição": uncached_s, "Cache de payloads": cached_s},
+    )
+    print(f"  por requisição: {uncached_s / args.requests * 1e6:.1f} us -> {cached_s / args.requests * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Latência de um endpoint comum (GET /api/categories) durante uma rajada de
+logins, com o bcrypt no threadpool (comportamento original) e no pool de
+processos dedicado.
+
+    python -m benchmarks.bench_auth_load [--logins 100] [--probes 50]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import report, reset_database
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import security
+from app.main import app
+from app.db import models
+
+PASSWORD = "bench-password"
+
+
+async def threadpool_verify(plain_password: str, hashed_password: str):
+    """Verificação como era antes: bcrypt no mesmo threadpool dos endpoints síncronos."""
+    return await run_in_threadpool(security.verify_and_update_password, plain_password, hashed_password)
+
+
+async def probe_latencies(client: httpx.AsyncClient, n: int) -> list:
+    latencies = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        response = await client.get("/api/categories")
+        latencies.append(time.perf_counter() - t0)
+        assert response.status_code == 200
+    return latencies
+
+
+async def run_scenario(n_logins: int, n_probes: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        token = (await client.post("/api/auth/token", data={"username": "bench", "password": PASSWORD})).json()
+        client.headers["Authorization"] = f"Bearer {token['access_token']}"
+
+        idle = await probe_latencies(client, n_probes)
+        logins = [
+            client.post("/api/auth/token", data={"username": "bench", "password": PASSWORD})
+            for _ in range(n_logins)
+        ]
+        burst = asyncio.gather(*logins)
+        await asyncio.sleep(0.05)  # deixa a rajada ocupar os workers
+        loaded = await probe_latencies(client, n_probes)
+        statuses = [r.status_code for r in await burst]
+
+    return {
+        "idle_p50": statistics.median(idle),
+        "burst_p50": statistics.median(loaded),
+        "burst_p95": statistics.quantiles(loaded, n=20)[-1],
+        "rejected": statuses.count(503),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--probes", type=int, default=50)
+    args = parser.parse_args()
+
+    db = reset_database()
+    db.add(models.User(username="bench", email="bench@example.com", password=security.get_password_hash(PASSWORD)))
+    db.commit()
+    db.close()
+
+    process_pool = security.verify_password_async
+    security.verify_password_async = threadpool_verify
+    threadpool = asyncio.run(run_scenario(args.logins, args.probes))
+    security.verify_password_async = process_pool
+    pooled = asyncio.run(run_scenario(args.logins, args.probes))
+    security.shutdown_hash_executor()
+
+    for name, result in [("bcrypt no threadpool", threadpool), ("bcrypt no pool de processos", pooled)]:
+        report(
+            f"GET /api/categories durante {args.logins} logins ({name}, {result['rejected']} recusados com 503)",
+            {"p50 sem carga": result["idle_p50"], "p50 durante a rajada": result["burst_p50"], "p95 durante a rajada": result["burst_p95"]},
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Mede a importação de um extrato CSV grande: parser + deduplicação + INSERT em lote.
+
+    python -m benchmarks.bench_import [--rows 20000]
+"""
+import argparse
+
+from benchmarks.common import build_statement, report, reset_database, seed_user, timed
+
+from app.services import imports
+from app.utils import utils
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    statement = build_statement(args.rows)
+    db = reset_database()
+    user_id = seed_user(db, 0)
+
+    parse_s, rows = timed(utils.parse_statement, "uber.csv", statement, "uber", repeat=1)
+    first_s, (inserted, _) = timed(imports.import_transactions, db, user_id, rows, repeat=1)
+    again_s, (_, skipped) = timed(imports.import_transactions, db, user_id, rows, repeat=1)
+
+    assert inserted == skipped == len(rows)
+    report(
+        f"Importação de extrato com {args.rows} linhas",
+        {
+            "Parser (parse_statement)": parse_s,
+            "Inserção em lote": first_s,
+            "Reimportação (tudo duplicado)": again_s,
+        },
+    )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
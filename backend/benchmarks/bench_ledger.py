@@ -0,0 +1,51 @@
+"""
+Compara o resumo por período calculado com GROUP BY no banco com a versão
+vetorizada sobre o livro colunar (app/services/ledger.py), com o livro frio
+(carga completa) e em cache.
+
+    python -m benchmarks.bench_ledger [--transactions 100000]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from benchmarks.common import report, reset_database, seed_user, timed
+
+from app.core import cache
+from app.services import ledger, summary
+
+
+def sql_summary(db, user_id, start, end):
+    ledger.LEDGER_ANALYTICS = False
+    return summary.summarize(db, user_id, start, end, "week", "category")
+
+
+def ledger_summary(db, user_id, start, end, cold: bool = False):
+    if cold:
+        cache.clear_all()
+    ledger.LEDGER_ANALYTICS = True
+    return summary.summarize(db, user_id, start, end, "week", "category")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    db = reset_database()
+    user_id = seed_user(db, args.transactions, n_sessions=1000)
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=365)
+
+    sql_s, expected = timed(sql_summary, db, user_id, start, end)
+    cold_s, cold = timed(ledger_summary, db, user_id, start, end, cold=True)
+    warm_s, warm = timed(ledger_summary, db, user_id, start, end)
+    assert expected == cold == warm
+    report(
+        f"Resumo semanal por categoria (1 ano) com {args.transactions} transações",
+        {"SQL GROUP BY (summary)": sql_s, "Livro colunar (frio)": cold_s, "Livro colunar (em cache)": warm_s},
+    )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
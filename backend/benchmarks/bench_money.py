@@ -0,0 +1,150 @@
+"""
+Compara a agregação do perfil somando Decimal (implementação original) com a
+soma em centavos inteiros de app/utils/money.py, sobre um histórico sintético
+em memória: totais, meses e plataformas acumulados linha a linha e os schemas
+de resposta montados por `stats.build_profile`.
+
+    python -m benchmarks.bench_money [--transactions 100000]
+"""
+import argparse
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from benchmarks.common import report, timed
+
+from app.models import schemas
+from app.services import rollups, stats
+
+PLATFORMS = ["Uber", "99", "inDrive", None]
+
+
+def build_history(n_transactions: int, seed: int = 42):
+    """(mês 'YYYY-MM', tipo, plataforma, centavos) de cada transação, em três anos."""
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=3 * 365)
+    history = []
+    for _ in range(n_transactions):
+        when = start + timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60))
+        kind = "income" if rng.random() < 0.85 else "expense"
+        history.append((rollups.month_key(when), kind, rng.choice(PLATFORMS), rng.randint(500, 9000)))
+    return history
+
+
+def aggregate(history, amounts, zero):
+    """Acumula totais, meses e plataformas; `amounts` em Decimal ou em centavos."""
+    aggregates = stats.ProfileAggregates(total_earnings=zero, total_expenses=zero, total_minutes=90_000)
+    platforms = defaultdict(lambda: [zero, 0])
+    for (month, kind, platform, _), amount in zip(history, amounts):
+        totals = aggregates.months.get(month)
+        if totals is None:
+            totals = aggregates.months[month] = stats.MonthTotals(zero, zero, 0)
+        if kind == "income":
+            aggregates.total_earnings += amount
+            aggregates.total_trips += 1
+            totals.income += amount
+            totals.trips += 1
+            platforms[platform][0] += amount
+            platforms[platform][1] += 1
+        else:
+            aggregates.total_expenses += amount
+            totals.expenses += amount
+    aggregates.platforms = [(name, earnings, trips) for name, (earnings, trips) in platforms.items()]
+    return aggregates
+
+
+def decimal_build_profile(aggregates, month_starts):
+    """Reprodução de `stats.build_profile` com somas, máximo e diferenças em Decimal."""
+    total_earnings = aggregates.total_earnings
+    total_trips = aggregates.total_trips
+    total_minutes = aggregates.total_minutes
+
+    monthly_stats = []
+    for month_start in month_starts:
+        totals = aggregates.months.get(rollups.month_key(month_start), stats.MonthTotals(Decimal(0), Decimal(0), 0))
+        monthly_stats.append(
+            schemas.MonthlyPerformance(
+                month=month_start.strftime("%b/%Y"),
+                income=totals.income,
+                expenses=totals.expenses,
+                profit=totals.income - totals.expenses,
+                trips=totals.trips,
+            )
+        )
+    monthly_stats.reverse()
+
+    best_month = max(monthly_stats, key=lambda m: m.income, default=None)
+    monthly_average = sum(m.income for m in monthly_stats) / len(monthly_stats) if monthly_stats else Decimal(0)
+
+    platform_stats = defaultdict(lambda: {"earnings": Decimal(0), "trips": 0})
+    for name, earnings, trips in aggregates.platforms:
+        platform_stats[name if name else "Outros"]["earnings"] += earnings
+        platform_stats[name if name else "Outros"]["trips"] += trips
+
+    platform_breakdown = [
+        schemas.PlatformBreakdown(
+            name=name,
+            earnings=values["earnings"],
+            trips=values["trips"],
+            percentage=round((values["earnings"] / total_earnings) * 100, 2) if total_earnings > 0 else 0,
+        )
+        for name, values in platform_stats.items()
+    ]
+    profile_stats = schemas.ProfileStats(
+        total_trips=total_trips,
+        total_earnings=total_earnings,
+        total_expenses=aggregates.total_expenses,
+        net_profit=total_earnings - aggregates.total_expenses,
+        total_hours=round(total_minutes / 60),
+        average_per_trip=total_earnings / total_trips if total_trips > 0 else Decimal(0),
+        average_per_hour=total_earnings / (Decimal(total_minutes) / 60) if total_minutes > 0 else Decimal(0),
+        best_month_earnings=best_month.income if best_month else Decimal(0),
+        monthly_average_earnings=monthly_average,
+    )
+    return profile_stats, monthly_stats, platform_breakdown
+
+
+def decimal_profile(history, amounts, month_starts):
+    return decimal_build_profile(aggregate(history, amounts, Decimal(0)), month_starts)
+
+
+def cents_profile(history, amounts, month_starts):
+    return stats.build_profile(aggregate(history, amounts, 0), month_starts)
+
+
+def dump(profile):
+    profile_stats, monthly, platforms = profile
+    return profile_stats.model_dump_json(), [m.model_dump_json() for m in monthly], [p.model_dump_json() for p in platforms]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    history = build_history(args.transactions)
+    cents = [row[3] for row in history]
+    # Mesmos valores que o banco devolve para NUMERIC(10, 2)
+    decimals = [Decimal(c).scaleb(-2) for c in cents]
+    month_starts = stats.month_window(datetime.now(timezone.utc))
+
+    decimal_s, expected = timed(sum, decimals, Decimal(0))
+    cents_s, total = timed(sum, cents)
+    assert Decimal(total).scaleb(-2) == expected
+    report(
+        f"Soma de {args.transactions} valores",
+        {"Decimal": decimal_s, "Centavos (int)": cents_s},
+    )
+
+    decimal_s, expected = timed(decimal_profile, history, decimals, month_starts)
+    cents_s, profile = timed(cents_profile, history, cents, month_starts)
+    assert dump(expected) == dump(profile)
+    report(
+        f"Agregação do perfil com {args.transactions} transações (saídas idênticas)",
+        {"Decimal (original)": decimal_s, "Centavos (int)": cents_s},
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Compara o parser de extratos linha a linha (iterrows) com o vetorizado.
+
+    python -m benchmarks.bench_parsers [--rows 100000]
+"""
+import argparse
+import warnings
+from io import BytesIO
+
+import pandas as pd
+
+from benchmarks.common import build_statement, report, timed
+
+from app.utils import utils
+
+
+def parse_rows(contents: bytes):
+    df = pd.read_csv(BytesIO(contents))
+    date_col, amount_col = utils._detect_columns(df)
+    return utils._parse_frame_rows(df, date_col, amount_col)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    statement = build_statement(args.rows)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        rows_s, legacy = timed(parse_rows, statement, repeat=1)
+        vector_s, vectorized = timed(utils.parse_uber_csv, statement)
+
+    assert legacy == vectorized
+    report(
+        f"parse_uber_csv com {args.rows} linhas (saídas idênticas)",
+        {"iterrows (original)": rows_s, "Vetorizado": vector_s},
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compara o cálculo do perfil em Python (implementação original, que hidrata
+todas as transações) com o GROUP BY de app/services/stats.py e com a leitura
+dos agregados mensais.
+
+    python -m benchmarks.bench_profile_stats [--transactions 100000]
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy.orm import selectinload
+
+from benchmarks.common import report, reset_database, seed_user, timed
+
+from app.db import models
+from app.services import rollups, stats
+
+
+def legacy_profile(db, user_id: int):
+    """Reprodução do cálculo original em Python sobre o histórico completo."""
+    all_transactions = (
+        db.query(models.Transaction)
+        .options(selectinload(models.Transaction.category))
+        .filter(models.Transaction.user_id == user_id)
+        .all()
+    )
+    all_work_sessions = db.query(models.WorkSession).filter(models.WorkSession.user_id == user_id).all()
+    income = [t for t in all_transactions if t.type == "income"]
+    total_earnings = sum(t.amount for t in income)
+    total_minutes = sum(ws.total_minutes or 0 for ws in all_work_sessions)
+
+    now = datetime.now(timezone.utc)
+    monthly = []
+    for month_start in stats.month_window(now):
+        key = rollups.month_key(month_start)
+        month_tx = [t for t in all_transactions if t.date and t.date.strftime("%Y-%m") == key]
+        monthly.append(sum(t.amount for t in month_tx if t.type == "income"))
+
+    platforms = defaultdict(lambda: {"earnings": Decimal(0), "trips": 0})
+    for t in income:
+        name = t.category.name if t.category else "Outros"
+        platforms[name]["earnings"] += t.amount
+        platforms[name]["trips"] += 1
+    db.expunge_all()
+    return total_earnings, total_minutes, monthly, dict(platforms)
+
+
+def group_by_profile(db, user_id: int):
+    month_starts = stats.month_window(datetime.now(timezone.utc))
+    months = [rollups.month_key(m) for m in month_starts]
+    return stats.build_profile(stats.load_from_transactions(db, user_id, months), month_starts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    db = reset_database()
+    user_id = seed_user(db, args.transactions, n_sessions=1000)
+    rollups.rebuild_user_rollups(db, user_id)
+    db.commit()
+
+    legacy_s, legacy = timed(legacy_profile, db, user_id)
+    group_s, grouped = timed(group_by_profile, db, user_id)
+    rollup_s, rolled = timed(stats.compute_profile, db, user_id)
+
+    assert grouped[0].total_earnings == legacy[0] == rolled[0].total_earnings
+    report(
+        f"Perfil com {args.transactions} transações",
+        {
+            "Python (original)": legacy_s,
+            "SQL GROUP BY (stats)": group_s,
+            "Agregados mensais (rollups)": rollup_s,
+        },
+    )
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
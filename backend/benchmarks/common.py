@@ -0,0 +1,113 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+Os benchmarks usam um banco SQLite temporário em arquivo, criado a partir dos
+modelos, e podem ser executados a partir da pasta backend:
+
+    python -m benchmarks.bench_profile_stats
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+_tmpdir = tempfile.mkdtemp(prefix="ride_finance_bench_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmpdir, 'bench.db')}")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.db import models  # noqa: E402
+from app.db.database import Base, SessionLocal, engine  # noqa: E402
+
+
+def reset_database():
+    """Recria todas as tabelas e retorna uma sessão nova."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return SessionLocal()
+
+
+def seed_user(db, n_transactions: int, n_sessions: int = 0, seed: int = 42) -> int:
+    """Cria um usuário com categorias, transações e sessões sintéticas. Retorna o id."""
+    rng = random.Random(seed)
+    user = models.User(username=f"bench{seed}", email=f"bench{seed}@example.com", password="x")
+    db.add(user)
+    db.flush()
+
+    categories = [
+        models.Category(user_id=user.id, name=name, type=kind)
+        for name, kind in [("Uber", "income"), ("99", "income"), ("inDrive", "income"), ("Combustível", "expense")]
+    ]
+    db.add_all(categories)
+    db.flush()
+    income_ids = [c.id for c in categories if c.type == "income"]
+    expense_id = categories[-1].id
+
+    start = datetime.utcnow() - timedelta(days=3 * 365)
+    rows = []
+    for i in range(n_transactions):
+        is_income = rng.random() < 0.85
+        rows.append(
+            {
+                "user_id": user.id,
+                "category_id": rng.choice(income_ids) if is_income else expense_id,
+                "amount": Decimal(rng.randint(500, 9000)) / 100,
+                "type": "income" if is_income else "expense",
+                "source": "bench",
+                "external_id": f"bench-{seed}-{i}",
+                "date": start + timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+            }
+        )
+    if rows:
+        db.execute(insert(models.Transaction), rows)
+
+    sessions = []
+    for _ in range(n_sessions):
+        day = start + timedelta(days=rng.randint(0, 3 * 365))
+        sessions.append(
+            {
+                "user_id": user.id,
+                "start_time": day,
+                "total_minutes": rng.randint(60, 600),
+                "date": day.strftime("%Y-%m-%d"),
+            }
+        )
+    if sessions:
+        db.execute(insert(models.WorkSession), sessions)
+
+    db.commit()
+    return user.id
+
+
+def build_statement(n_rows: int, seed: int = 7) -> bytes:
+    """Gera um CSV no formato dos extratos da Uber (data dd/mm/aaaa, valor em R$)."""
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    lines = ["Data,Valor"]
+    for i in range(n_rows):
+        when = start + timedelta(minutes=17 * i)
+        cents = rng.randint(500, 9000)
+        lines.append(f'{when:%d/%m/%Y %H:%M},"R$ {cents // 100},{cents % 100:02d}"')
+    return ("\n".join(lines) + "\n").encode()
+
+
+def timed(fn, *args, repeat: int = 3, **kwargs):
+    """Executa `fn` `repeat` vezes e retorna (melhor tempo em segundos, último resultado)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def report(title: str, results: dict) -> None:
+    """Imprime uma tabela simples com os tempos e o ganho relativo ao primeiro item."""
+    print(f"\n{title}")
+    baseline = next(iter(results.values()))
+    for name, seconds in results.items():
+        print(f"  {name:<32} {seconds * 1000:10.1f} ms  ({baseline / seconds:5.1f}x)")
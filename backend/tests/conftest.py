@@ -5,6 +5,7 @@ from sqlalchemy.orm import sessionmaker, Session
 
 # FIX 1: Importar os modelos para que o SQLAlchemy os reconheça
 from app.db import models
+from app.core import cache
 from app.db.database import Base, get_db
 from app.main import app
 
@@ -22,6 +23,16 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 
 # --- Fixtures de Teste Refatoradas ---
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Esvazia os caches da aplicação antes de cada teste, já que o banco
+    é recriado a cada teste.
+    """
+    cache.clear_all()
+    yield
+
+
 @pytest.fixture(scope="function")
 def db_session() -> Session:
     """
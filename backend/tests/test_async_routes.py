@@ -0,0 +1,131 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, Pool
+
+from app.db.database import Base, async_database_url, get_async_db, get_db
+from app.main import include_routers
+
+
+@pytest.fixture
+def async_client(tmp_path) -> TestClient:
+    """
+    Aplicação com a pilha assíncrona (DB_ASYNC=true), sobre um SQLite em arquivo
+    compartilhado entre a engine síncrona (autenticação) e a assíncrona.
+    """
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SyncSession = sessionmaker(bind=engine, autoflush=False)
+    async_engine = create_async_engine(async_database_url(url), poolclass=NullPool)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        with SyncSession() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    include_routers(app, use_async=True)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    client = TestClient(app)
+    client.post(
+        "/api/auth/register",
+        json={
+            "username": "asyncuser",
+            "password": "asyncpassword",
+            "email": "async@example.com",
+            "full_name": "Async User",
+            "phone": "1122334455",
+        },
+    )
+    token = client.post("/api/auth/token", data={"username": "asyncuser", "password": "asyncpassword"}).json()
+    client.headers["Authorization"] = f"Bearer {token['access_token']}"
+    yield client
+    engine.dispose()
+
+
+def test_async_stack_matches_sync_behaviour(async_client: TestClient):
+    category = async_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    for day in range(1, 4):
+        response = async_client.post(
+            "/api/transactions",
+            json={"amount": 10 * day, "type": "income", "category_id": category["id"], "date": f"2024-05-0{day}T10:00:00"},
+        )
+        assert response.status_code == 201
+
+    first = async_client.get("/api/transactions", params={"limit": 2})
+    assert [t["amount"] for t in first.json()] == ["30.00", "20.00"]
+    second = async_client.get("/api/transactions", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [t["amount"] for t in second.json()] == ["10.00"]
+
+    export = async_client.get("/api/transactions/export", params={"format": "csv"})
+    assert len(export.text.strip().splitlines()) == 4
+
+    profile = async_client.get("/api/profile/comprehensive").json()
+    assert profile["stats"]["total_trips"] == 3
+    assert profile["platform_breakdown"][0]["name"] == "Uber"
+
+
+def test_async_create_transaction_is_idempotent(async_client: TestClient):
+    category = async_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    payload = {"amount": 15, "type": "income", "category_id": category["id"], "date": "2024-05-01T10:00:00"}
+
+    first = async_client.post("/api/transactions", json=payload, headers={"Idempotency-Key": "k1"})
+    retry = async_client.post("/api/transactions", json=payload, headers={"Idempotency-Key": "k1"})
+    assert (first.status_code, retry.status_code) == (201, 200)
+    assert retry.json() == first.json()
+    assert len(async_client.get("/api/transactions").json()) == 1
+
+
+
+def test_async_dashboard_loads_sections_concurrently(async_client: TestClient):
+    now = datetime.utcnow()
+    category = async_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    async_client.post(
+        "/api/transactions",
+        json={"amount": 50, "type": "income", "category_id": category["id"], "date": now.isoformat()},
+    )
+    async_client.post(
+        "/api/work-sessions",
+        json={"start_time": now.isoformat(), "date": now.strftime("%Y-%m-%d"), "total_minutes": 90},
+    )
+
+    # Conexões em uso ao mesmo tempo: em sequência seriam 2 (a da requisição e a da seção)
+    in_use, peak = 0, 0
+
+    def checkout(*args):
+        nonlocal in_use, peak
+        in_use += 1
+        peak = max(peak, in_use)
+
+    def checkin(*args):
+        nonlocal in_use
+        in_use -= 1
+
+    sections = "recent_transactions,categories,today_sessions,summary"
+    event.listen(Pool, "checkout", checkout)
+    event.listen(Pool, "checkin", checkin)
+    try:
+        response = async_client.get("/api/dashboard", params={"fields": sections})
+    finally:
+        event.remove(Pool, "checkout", checkout)
+        event.remove(Pool, "checkin", checkin)
+
+    data = response.json()
+    assert list(data) == sections.split(",")
+    assert [t["amount"] for t in data["recent_transactions"]] == ["50.00"]
+    assert data["categories"][0]["name"] == "Uber"
+    assert data["summary"]["today_income"] == "50.00"
+    assert data["summary"]["today_minutes"] == 90
+    assert peak >= 4
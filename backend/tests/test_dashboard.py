@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+
+def test_dashboard_returns_all_sections(authenticated_client: TestClient):
+    now = datetime.utcnow()
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    for amount, when in [(50, now), (30, now - timedelta(days=40))]:
+        authenticated_client.post(
+            "/api/transactions",
+            json={"amount": amount, "type": "income", "category_id": category["id"], "date": when.isoformat()},
+        )
+    authenticated_client.post(
+        "/api/work-sessions",
+        json={"start_time": now.isoformat(), "date": now.strftime("%Y-%m-%d"), "total_minutes": 90},
+    )
+
+    response = authenticated_client.get("/api/dashboard")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["user"]["username"] == "testauthuser"
+    assert [t["amount"] for t in data["recent_transactions"]] == ["50.00", "30.00"]
+    assert data["categories"][0]["name"] == "Uber"
+    assert len(data["today_sessions"]) == 1
+    assert data["summary"]["today_income"] == "50.00"
+    assert data["summary"]["today_minutes"] == 90
+    assert data["summary"]["month_trips"] == 1
+
+
+def test_dashboard_field_selection(authenticated_client: TestClient):
+    response = authenticated_client.get("/api/dashboard", params={"fields": "summary,goals"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"summary", "goals"}
+
+    response = authenticated_client.get("/api/dashboard", params={"fields": "summary,nope"})
+    assert response.status_code == 400
+
+
+def test_dashboard_goals_match_goals_route(authenticated_client: TestClient, db_session: Session):
+    """Metas recorrentes de um período passado aparecem zeradas, como em /api/goals."""
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 150, "type": "income", "category_id": category["id"], "date": datetime.utcnow().isoformat()},
+    )
+    goal = authenticated_client.post(
+        "/api/goals",
+        json={"title": "Diária", "type": "daily", "category": "income", "target": 100, "deadline": "2099-12-31"},
+    ).json()
+    assert goal["is_completed"] is True
+
+    # Progresso gravado na última escrita, num dia que já passou
+    db_goal = db_session.get(models.Goal, goal["id"])
+    db_goal.period_start = (datetime.utcnow().date() - timedelta(days=3)).isoformat()
+    db_session.flush()
+
+    dashboard_goals = authenticated_client.get("/api/dashboard", params={"fields": "goals"}).json()["goals"]
+    assert dashboard_goals == authenticated_client.get("/api/goals").json()
+    assert dashboard_goals[0]["current"] == "0"
+    assert dashboard_goals[0]["is_completed"] is False
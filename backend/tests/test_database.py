@@ -0,0 +1,23 @@
+from sqlalchemy import text
+
+from app.db import database
+
+
+def test_sqlite_engine_applies_pragmas_and_records_pool_metrics(tmp_path):
+    engine = database.build_engine(f"sqlite:///{tmp_path / 'pool.db'}", name="test")
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == database.SQLITE_BUSY_TIMEOUT_MS
+        with engine.connect():
+            pass
+
+        stats = database.pool_stats()["test"]
+        assert stats["connects"] == 1
+        assert stats["checkouts"] == 2
+        assert stats["checkins"] == 2
+        assert stats["size"] == database.DB_POOL_SIZE
+        assert stats["timeouts"] == 0
+    finally:
+        engine.dispose()
+        database._engines.pop("test", None)
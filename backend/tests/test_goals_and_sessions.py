@@ -1,6 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
 
+from app.db import models
+from app.services import goals as goal_progress
+
 # Testes para Metas (Goals)
 def test_create_and_get_goal(authenticated_client: TestClient):
     """
@@ -43,4 +46,218 @@ def test_create_and_get_work_session(authenticated_client: TestClient):
     assert get_response.status_code == 200
     sessions_list = get_response.json()
     assert len(sessions_list) > 0
-    assert sessions_list[0]["id"] == created_data["id"]
\ No newline at end of file
+    assert sessions_list[0]["id"] == created_data["id"]
+
+def test_goal_progress_tracks_transactions_and_sessions(authenticated_client: TestClient, db_session):
+    """
+    Testa a atualização incremental do progresso das metas e a conclusão ao atingir o alvo.
+    """
+    now = datetime.utcnow()
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 60, "type": "income", "category_id": category["id"], "date": now.isoformat()},
+    )
+    income_goal = authenticated_client.post(
+        "/api/goals",
+        json={"title": "Diária", "type": "daily", "category": "income", "target": 100, "deadline": "2099-12-31"},
+    ).json()
+    hours_goal = authenticated_client.post(
+        "/api/goals",
+        json={"title": "Horas", "type": "weekly", "category": "hours", "target": 40, "deadline": "2099-12-31"},
+    ).json()
+    # O progresso inicial considera o histórico do período
+    assert income_goal["current"] == "60.00"
+
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 50, "type": "income", "category_id": category["id"], "date": now.isoformat()},
+    )
+    # Transações de outros dias não contam para a meta diária
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 500, "type": "income", "category_id": category["id"], "date": "2020-01-01T10:00:00"},
+    )
+    authenticated_client.post(
+        "/api/work-sessions",
+        json={"start_time": now.isoformat(), "date": now.strftime("%Y-%m-%d"), "total_minutes": 90},
+    )
+
+    goals = {g["id"]: g for g in authenticated_client.get("/api/goals").json()}
+    assert goals[income_goal["id"]]["current"] == "110.00"
+    assert goals[income_goal["id"]]["is_completed"] is True
+    assert goals[hours_goal["id"]]["current"] == "1.50"
+    assert goals[hours_goal["id"]]["is_completed"] is False
+
+    # O recálculo completo chega ao mesmo resultado
+    incremental = {g.id: g.current for g in db_session.query(models.Goal)}
+    assert goal_progress.recompute_all_goals(db_session) == 2
+    assert {g.id: g.current for g in db_session.query(models.Goal)} == incremental
+
+    # Na virada do período, a meta diária aparece zerada sem recálculo
+    db_goal = db_session.get(models.Goal, income_goal["id"])
+    tomorrow = now.date() + timedelta(days=1)
+    assert goal_progress.current_progress(db_goal, tomorrow) == (0, False)
+
+
+def test_goal_progress_matches_recompute(authenticated_client: TestClient, db_session):
+    """
+    Testa que o progresso incremental não acumula arredondamentos de horas e que
+    a conclusão volta atrás quando o lucro cai abaixo do alvo, como no recálculo.
+    """
+    now = datetime.utcnow()
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    fuel = authenticated_client.post("/api/categories", json={"name": "Combustível", "type": "expense"}).json()
+    hours_goal = authenticated_client.post(
+        "/api/goals",
+        json={"title": "Horas", "type": "daily", "category": "hours", "target": 1.01, "deadline": "2099-12-31"},
+    ).json()
+    profit_goal = authenticated_client.post(
+        "/api/goals",
+        json={"title": "Lucro", "type": "daily", "category": "profit", "target": 100, "deadline": "2099-12-31"},
+    ).json()
+
+    # Seis sessões de 10 minutos: 1,00 h (e não 6 x 0,17 = 1,02 h)
+    for _ in range(6):
+        authenticated_client.post(
+            "/api/work-sessions",
+            json={"start_time": now.isoformat(), "date": now.strftime("%Y-%m-%d"), "total_minutes": 10},
+        )
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 120, "type": "income", "category_id": category["id"], "date": now.isoformat()},
+    )
+    assert {g["id"]: g["is_completed"] for g in authenticated_client.get("/api/goals").json()}[profit_goal["id"]] is True
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 30, "type": "expense", "category_id": fuel["id"], "date": now.isoformat()},
+    )
+
+    goals = {g["id"]: g for g in authenticated_client.get("/api/goals").json()}
+    assert (goals[hours_goal["id"]]["current"], goals[hours_goal["id"]]["is_completed"]) == ("1.00", False)
+    assert (goals[profit_goal["id"]]["current"], goals[profit_goal["id"]]["is_completed"]) == ("90.00", False)
+
+    incremental = {g.id: (g.current, g.is_completed) for g in db_session.query(models.Goal)}
+    goal_progress.recompute_all_goals(db_session)
+    assert {g.id: (g.current, g.is_completed) for g in db_session.query(models.Goal)} == incremental
+
+
+def test_create_work_session_minutes_come_from_times(authenticated_client: TestClient):
+    """
+    Testa que total_minutes enviado com end_time é recalculado pelo servidor e
+    que sessões invertidas ou longas demais não entram nas metas.
+    """
+    hours_goal = authenticated_client.post(
+        "/api/goals",
+        json={"title": "Horas", "type": "weekly", "category": "hours", "target": 40, "deadline": "2099-12-31"},
+    ).json()
+    start = datetime.utcnow() - timedelta(minutes=30)
+    session = {"start_time": start.isoformat(), "date": start.strftime("%Y-%m-%d")}
+
+    created = authenticated_client.post(
+        "/api/work-sessions",
+        json={**session, "end_time": (start + timedelta(minutes=30)).isoformat(), "total_minutes": 100_000},
+    )
+    assert created.status_code == 201
+    assert created.json()["total_minutes"] == 30
+
+    inverted = {**session, "end_time": (start - timedelta(minutes=5)).isoformat()}
+    assert authenticated_client.post("/api/work-sessions", json=inverted).status_code == 422
+    assert authenticated_client.post("/api/work-sessions", json={**session, "total_minutes": 100_000}).status_code == 422
+    result = authenticated_client.post("/api/work-sessions/bulk", json=[inverted, {**session, "total_minutes": -60}]).json()
+    assert [item["status"] for item in result["results"]] == ["error", "error"]
+
+    goal = {g["id"]: g for g in authenticated_client.get("/api/goals").json()}[hours_goal["id"]]
+    assert goal["current"] == "0.50"
+
+
+def test_create_goals_and_work_sessions_bulk(authenticated_client: TestClient):
+    """
+    Testa a criação em lote de metas e sessões, com o progresso das metas atualizado.
+    """
+    today = datetime.utcnow().date()
+    goals = authenticated_client.post(
+        "/api/goals/bulk",
+        json=[
+            {"title": "Horas", "type": "weekly", "category": "hours", "target": 10, "deadline": str(today + timedelta(days=7))},
+            {"title": "Sem alvo", "type": "weekly", "category": "hours"},
+        ],
+    )
+    assert goals.status_code == 201
+    assert goals.json()["created"] == 1
+    assert goals.json()["results"][1]["status"] == "error"
+
+    sessions = authenticated_client.post(
+        "/api/work-sessions/bulk",
+        json=[
+            {"start_time": datetime.utcnow().isoformat(), "date": str(today), "total_minutes": 60},
+            {"start_time": datetime.utcnow().isoformat(), "date": str(today), "total_minutes": 90},
+        ],
+    )
+    assert sessions.status_code == 201
+    assert sessions.json()["created"] == 2
+
+    goal = authenticated_client.get("/api/goals").json()[0]
+    assert float(goal["current"]) == 2.5
+
+
+def test_work_session_activity_and_calendar(authenticated_client: TestClient):
+    """
+    Testa a atividade por dia/semana calculada no banco e o calendário compacto do perfil.
+    """
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    authenticated_client.post(
+        "/api/work-sessions/bulk",
+        json=[
+            {"start_time": "2025-07-21T08:00:00", "date": "2025-07-21", "total_minutes": 120},
+            {"start_time": "2025-07-21T18:00:00", "date": "2025-07-21", "total_minutes": 60},
+            {"start_time": "2025-07-23T08:00:00", "date": "2025-07-23", "total_minutes": 30},
+        ],
+    )
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 90, "type": "income", "category_id": category["id"], "date": "2025-07-21T09:00:00"},
+    )
+    params = {"start_date": "2025-07-21", "end_date": "2025-07-24"}
+
+    days = authenticated_client.get("/api/work-sessions/activity", params=params).json()["days"]
+    assert [(d["date"], d["minutes"], d["sessions"], float(d["earnings_per_hour"])) for d in days] == [
+        ("2025-07-21", 180, 2, 30.0),
+        ("2025-07-23", 30, 1, 0.0),
+    ]
+    weekly = authenticated_client.get("/api/work-sessions/activity", params={**params, "granularity": "week"}).json()
+    assert [(d["date"], d["minutes"], d["sessions"]) for d in weekly["days"]] == [("2025-07-21", 210, 3)]
+
+    calendar = authenticated_client.get("/api/work-sessions/calendar", params=params).json()
+    assert calendar["minutes"] == [180, 0, 30, 0]
+
+    today = datetime.utcnow().date()
+    authenticated_client.post(
+        "/api/work-sessions", json={"start_time": datetime.utcnow().isoformat(), "date": str(today), "total_minutes": 45}
+    )
+    profile_calendar = authenticated_client.get("/api/profile/comprehensive").json()["activity_calendar"]
+    start = datetime.fromisoformat(profile_calendar["start_date"]).date()
+    assert profile_calendar["minutes"][(today - start).days] == 45
+
+
+def test_start_and_stop_work_session(authenticated_client: TestClient):
+    """
+    Testa o início e o fim de uma sessão pelo servidor: uma aberta por vez e minutos calculados no fim.
+    """
+    assert authenticated_client.get("/api/work-sessions/active").json() == {"session": None, "elapsed_minutes": None}
+    assert authenticated_client.post("/api/work-sessions/stop").status_code == 404
+
+    start_time = datetime.utcnow() - timedelta(minutes=95)
+    started = authenticated_client.post("/api/work-sessions/start", json={"start_time": start_time.isoformat()})
+    assert started.status_code == 201
+    assert started.json()["is_open"] is True
+    assert authenticated_client.post("/api/work-sessions/start").status_code == 409
+
+    active = authenticated_client.get("/api/work-sessions/active").json()
+    assert active["session"]["id"] == started.json()["id"]
+    assert active["elapsed_minutes"] == 95
+
+    stopped = authenticated_client.post("/api/work-sessions/stop").json()
+    assert (stopped["is_open"], stopped["total_minutes"]) == (False, 95)
+    assert authenticated_client.get("/api/work-sessions/active").json()["session"] is None
+    assert authenticated_client.get("/api/profile/comprehensive").json()["stats"]["total_hours"] == 2
@@ -0,0 +1,85 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services import ledger, summary, versioning
+
+
+def _seed(client: TestClient):
+    uber = client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()["id"]
+    fuel = client.post("/api/categories", json={"name": "Combustível", "type": "expense"}).json()["id"]
+    items = [
+        {
+            "amount": f"{7 + (i * 37) % 90}.{(i * 13) % 100:02d}",
+            "type": "expense" if i % 5 == 0 else "income",
+            "category_id": fuel if i % 5 == 0 else uber,
+            "source": [None, "Uber", "99"][i % 3],
+            "date": f"2025-{(i % 12) + 1:02d}-{(i % 27) + 1:02d}T{i % 24:02d}:{(i * 7) % 60:02d}:00",
+        }
+        for i in range(120)
+    ]
+    assert client.post("/api/transactions/bulk", json=items).json()["created"] == 120
+
+
+def test_ledger_summary_matches_sql(authenticated_client: TestClient, db_session: Session, monkeypatch):
+    """
+    Testa que o resumo vetorizado sobre o livro devolve os mesmos Decimal do GROUP BY.
+    """
+    _seed(authenticated_client)
+    user_id = db_session.query(models.User.id).scalar()
+    ranges = {"hour": (date(2025, 7, 1), date(2025, 7, 31))}
+
+    for granularity in ("hour", "day", "week", "month"):
+        start, end = ranges.get(granularity, (date(2025, 1, 1), date(2025, 12, 31)))
+        for group_by in (None, "category", "source"):
+            monkeypatch.setattr(ledger, "LEDGER_ANALYTICS", False)
+            expected = summary.summarize(db_session, user_id, start, end, granularity, group_by)
+            monkeypatch.setattr(ledger, "LEDGER_ANALYTICS", True)
+            buckets = summary.summarize(db_session, user_id, start, end, granularity, group_by)
+            assert buckets and buckets == expected
+            # Mesma forma dos Decimal (zeros inclusive), não só o mesmo valor
+            assert [{k: str(v) for k, v in b.items()} for b in buckets] == [
+                {k: str(v) for k, v in b.items()} for b in expected
+            ]
+
+def test_ledger_summary_with_rollups_and_writes(authenticated_client: TestClient, db_session: Session, monkeypatch):
+    """
+    Testa o resumo pelo livro para um usuário com agregados mensais: o livro é
+    estendido na escrita (não na leitura seguinte) e as categorias e origens
+    nulas saem por último, como no SQL.
+    """
+    monkeypatch.setattr(ledger, "LEDGER_ANALYTICS", True)
+    _seed(authenticated_client)
+    user_id = db_session.query(models.User.id).scalar()
+    assert db_session.query(models.MonthlyCategoryRollup).filter_by(user_id=user_id).count() > 0
+    # Transação antiga sem categoria (category_id nulo)
+    uncategorized = db_session.query(func.min(models.Transaction.id)).filter_by(user_id=user_id, source=None).scalar()
+    db_session.query(models.Transaction).filter_by(id=uncategorized).update({"category_id": None})
+    versioning.bump_data_version(db_session, user_id)
+    db_session.commit()
+
+    start, end = date(2025, 1, 1), date(2025, 12, 31)
+    summary.summarize(db_session, user_id, start, end, "month")
+    first = ledger.ledger_cache.get(str(user_id))
+
+    category = db_session.query(models.Category.id).filter(models.Category.name == "Uber").scalar()
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": "10.01", "type": "income", "category_id": category, "date": "2025-03-10T12:00:00"},
+    )
+    extended = ledger.ledger_cache.get(str(user_id))
+    assert len(extended) == len(first) + 1
+    assert extended.data_version == versioning.get_data_version(db_session, user_id)
+
+    for group_by in ("category", "source"):
+        buckets = summary.summarize(db_session, user_id, start, end, "month", group_by)
+        monkeypatch.setattr(ledger, "LEDGER_ANALYTICS", False)
+        assert summary.summarize(db_session, user_id, start, end, "month", group_by) == buckets
+        monkeypatch.setattr(ledger, "LEDGER_ANALYTICS", True)
+        key = "category_id" if group_by == "category" else "group"
+        january = [b[key] for b in buckets if b["period"] == "2025-01"]
+        assert january[-1] is None and None not in january[:-1]
+    assert ledger.ledger_cache.get(str(user_id)) is extended
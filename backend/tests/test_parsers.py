@@ -0,0 +1,145 @@
+from decimal import Decimal
+from io import BytesIO
+
+import pandas as pd
+
+from app.utils import utils
+
+
+def test_vectorized_uber_parser_matches_row_parser():
+    """
+    O parser vetorizado deve gerar exatamente as mesmas transações que a versão com iterrows,
+    inclusive com datas em formatos misturados e valores inválidos.
+    """
+    contents = (
+        "Data,Valor,Corrida\n"
+        "21/07/2025 10:00,\"R$ 25,50\",1\n"
+        "07/08/2025 11:30,\"R$ 1.234,56\",2\n"
+        "2025-07-03,\"30.00\",3\n"
+        "12/25/2025,\"R$ 10,00\",4\n"
+        ",\"R$ 5,00\",5\n"
+        "lixo,\"R$ 7,00\",6\n"
+        "22/07/2025 09:00,\"-12,00\",7\n"
+        "22/07/2025 09:15,,8\n"
+    ).encode()
+    df = pd.read_csv(BytesIO(contents))
+    date_col, amount_col = utils._detect_columns(df)
+
+    expected = utils._parse_frame_rows(df, date_col, amount_col)
+    result = utils.parse_uber_csv(contents)
+
+    assert result == expected
+    assert [t["amount"] for t in result][:2] == [Decimal("25.50"), Decimal("1234.56")]
+
+
+def test_iter_csv_batches_streams_in_chunks():
+    """
+    A leitura em blocos deve gerar as mesmas transações que o parser em memória,
+    em vários lotes, detectando a plataforma apenas pelo primeiro bloco.
+    """
+    contents = (
+        "Data,Valor,Plataforma\n"
+        "21/07/2025 10:00,\"R$ 25,50\",Uber\n"
+        "21/07/2025 11:00,\"R$ 12,00\",Uber\n"
+        "22/07/2025 09:00,\"R$ 40,10\",Uber\n"
+        "23/07/2025 18:30,\"R$ 8,90\",Uber\n"
+        "24/07/2025 07:45,\"R$ 19,99\",Uber\n"
+    ).encode()
+
+    batches = list(utils.iter_csv_batches(BytesIO(contents), chunksize=2))
+
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert [t for batch in batches for t in batch] == utils.parse_generic_csv(contents)
+
+
+def test_iter_csv_batches_external_ids_match_in_memory_import():
+    """
+    Colunas de valor numéricas devem gerar os mesmos external_id na leitura em
+    blocos e na leitura do arquivo inteiro, mesmo quando cada bloco sozinho
+    inferiria outro tipo (ex.: '10' como inteiro num arquivo de decimais).
+    """
+    statements = [
+        b"Date,Amount\n21/07/2025,25.50\n22/07/2025,10\n",
+        b"Date,Amount\n21/07/2025,25\n22/07/2025,10\n23/07/2025,\n24/07/2025,3\n",
+        b"Date,Amount\n21/07/2025,25\n22/07/2025,abc\n23/07/2025,7.5\n",
+    ]
+    for contents in statements:
+        expected = [t["external_id"] for t in utils.parse_statement("extrato.csv", contents)]
+        for chunksize in (1, 2, 100):
+            batches = utils.iter_csv_batches(BytesIO(contents), chunksize=chunksize)
+            assert [t["external_id"] for batch in batches for t in batch] == expected
+
+
+def _build_pdf(pages):
+    """Gera um PDF mínimo com uma linha de texto por item, uma página por lista."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        text = " T* ".join(f"({line}) Tj" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 40 800 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def test_parallel_pdf_parser_matches_serial(monkeypatch):
+    """
+    A extração paralela por páginas deve retornar as mesmas transações que o parser serial,
+    inclusive quando a última linha de uma página tem uma data.
+    """
+    monkeypatch.setattr(utils, "PDF_PARALLEL_MIN_PAGES", 2)
+    pages = [
+        [f"{day:02d}/07/2025 Corrida R$ {day},50" for day in range(1, 6)] + ["Continua na proxima pagina"],
+        [f"{day:02d}/07/2025 Corrida R$ {day},00" for day in range(6, 11)],
+        ["Resumo", "11/07/2025 Corrida R$ 99,90", "Fim"],
+    ]
+    contents = _build_pdf(pages)
+
+    expected = utils.parse_pdf(contents)
+    assert len(expected) == 11
+    try:
+        assert utils.parse_pdf_parallel(contents, workers=2) == expected
+    finally:
+        utils.shutdown_pdf_executor()
+
+
+def test_clean_amount_keeps_parsed_value():
+    """
+    A limpeza devolve o valor como escrito no extrato, sem arredondar: as casas
+    além dos centavos só são arredondadas na gravação.
+    """
+    expected = {
+        "R$ 25,50": Decimal("25.50"),
+        "1.234,56": Decimal("1234.56"),
+        "1,234.56": Decimal("1234.56"),
+        "10": Decimal("10"),
+        ".5": Decimal("0.5"),
+        "5.": Decimal("5"),
+        "R$ -3,00": Decimal("3.00"),
+        "1.2.3.4": Decimal("123.4"),
+        "12,345": Decimal("12.345"),
+        "0,00": Decimal(0),
+        "": Decimal(0),
+        "nan": Decimal(0),
+        10: Decimal(10),
+        None: Decimal(0),
+    }
+    for value, amount in expected.items():
+        assert utils._clean_amount(value) == amount, value
+    assert str(utils._clean_amount("12,345")) == "12.345"
@@ -1,4 +1,12 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core import cache
+from app.db import models
+from app.services import achievements, rollups, stats
 
 def test_get_comprehensive_profile(authenticated_client: TestClient):
     """
@@ -35,4 +43,294 @@ def test_get_comprehensive_profile(authenticated_client: TestClient):
     assert float(stats["total_earnings"]) == 250.0  # 100 + 150
     assert float(stats["total_expenses"]) == 40.0
     assert float(stats["net_profit"]) == 210.0 # 250 - 40
-    assert stats["total_hours"] == 4 # 240 minutes
\ No newline at end of file
+    assert stats["total_hours"] == 4 # 240 minutes
+
+def _seed_current_month(client: TestClient):
+    """Cria transações e sessões no mês corrente para exercitar a janela de 12 meses."""
+    now = datetime.now(timezone.utc).replace(day=1, hour=12, minute=0, second=0, microsecond=0)
+    uber_id = client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()["id"]
+    fuel_id = client.post("/api/categories", json={"name": "Combustível", "type": "expense"}).json()["id"]
+
+    for amount in (30.5, 19.5, 50):
+        client.post("/api/transactions", json={"amount": amount, "date": now.isoformat(), "category_id": uber_id, "type": "income"})
+    client.post("/api/transactions", json={"amount": 25, "date": now.isoformat(), "category_id": fuel_id, "type": "expense"})
+    client.post("/api/work-sessions", json={"start_time": now.isoformat(), "date": now.strftime("%Y-%m-%d"), "total_minutes": 90})
+    return now
+
+
+def test_profile_monthly_and_platform_from_rollups(authenticated_client: TestClient):
+    """
+    Verifica que os agregados mensais alimentam a performance mensal e o detalhamento por plataforma.
+    """
+    now = _seed_current_month(authenticated_client)
+
+    data = authenticated_client.get("/api/profile/comprehensive").json()
+
+    current = data["monthly_performance"][-1]
+    assert current["month"] == now.strftime("%b/%Y")
+    assert float(current["income"]) == 100.0
+    assert float(current["expenses"]) == 25.0
+    assert float(current["profit"]) == 75.0
+    assert current["trips"] == 3
+
+    assert data["platform_breakdown"] == [
+        {"name": "Uber", "earnings": "100.00", "trips": 3, "percentage": 100.0}
+    ]
+    assert data["stats"]["total_hours"] == 2  # round(90 / 60)
+
+
+def test_rebuild_rollups_matches_incremental(authenticated_client: TestClient, db_session: Session):
+    """
+    A reconstrução completa deve produzir exatamente o mesmo perfil que a manutenção incremental.
+    """
+    _seed_current_month(authenticated_client)
+    before = authenticated_client.get("/api/profile/comprehensive").json()
+
+    user = db_session.query(models.User).filter(models.User.username == "testauthuser").one()
+    rollups.rebuild_user_rollups(db_session, user.id)
+    db_session.commit()
+
+    after = authenticated_client.get("/api/profile/comprehensive").json()
+    assert after == before
+
+
+def test_group_by_stats_match_rollups(authenticated_client: TestClient, db_session: Session):
+    """
+    O GROUP BY direto sobre o histórico deve gerar os mesmos schemas que os agregados mensais.
+    """
+    _seed_current_month(authenticated_client)
+    user = db_session.query(models.User).filter(models.User.username == "testauthuser").one()
+
+    now = datetime.now(timezone.utc)
+    month_starts = stats.month_window(now)
+    months = [rollups.month_key(m) for m in month_starts]
+
+    from_rollups = stats.build_profile(stats.load_from_rollups(db_session, user.id, months), month_starts)
+    from_history = stats.build_profile(stats.load_from_transactions(db_session, user.id, months), month_starts)
+
+    assert from_history == from_rollups
+    profile_stats, monthly, platforms = from_history
+    assert profile_stats.total_earnings == Decimal("100")
+    assert profile_stats.average_per_hour == Decimal("100") / (Decimal(90) / 60)
+    assert monthly[-1].trips == 3
+    assert [p.name for p in platforms] == ["Uber"]
+
+
+def test_rollup_profile_matches_group_by_on_same_data(authenticated_client: TestClient, db_session: Session):
+    """
+    O perfil lido dos agregados (incrementais e reconstruídos) deve ser igual ao
+    GROUP BY sobre o histórico: plataformas na ordem da primeira receita (não na
+    do id da categoria) e transações sem data só nos totais.
+    """
+    ninety_nine = authenticated_client.post("/api/categories", json={"name": "99", "type": "income"}).json()["id"]
+    uber = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()["id"]
+    fuel = authenticated_client.post("/api/categories", json={"name": "Combustível", "type": "expense"}).json()["id"]
+    items = [
+        {"amount": "12.50", "type": "income", "category_id": uber, "date": "2025-11-01T00:30:00"},
+        {"amount": "8.25", "type": "income", "category_id": ninety_nine, "date": "2025-11-30T23:59:59"},
+        {"amount": "30", "type": "expense", "category_id": fuel, "date": "2025-12-01T09:00:00"},
+        {"amount": "4.10", "type": "income", "category_id": uber, "date": "2025-12-02T10:00:00"},
+    ]
+    assert authenticated_client.post("/api/transactions/bulk", json=items).json()["created"] == 4
+    user_id = db_session.query(models.User.id).scalar()
+
+
+    def profiles(now):
+        month_starts = stats.month_window(now)
+        months = [rollups.month_key(m) for m in month_starts]
+        return (
+            stats.build_profile(stats.load_from_rollups(db_session, user_id, months), month_starts),
+            stats.build_profile(stats.load_from_transactions(db_session, user_id, months), month_starts),
+        )
+
+    from_rollups, from_history = profiles(datetime(2025, 12, 15, 10, 0, tzinfo=timezone.utc))
+    assert from_rollups == from_history
+    assert [p.name for p in from_rollups[2]] == ["Uber", "99"]
+
+    # Linha legada sem data nem categoria, incorporada pela reconstrução
+    legacy = models.Transaction(user_id=user_id, amount=Decimal("7"), type="income")
+    db_session.add(legacy)
+    db_session.flush()
+    db_session.query(models.Transaction).filter(models.Transaction.id == legacy.id).update({"date": None})
+    rollups.rebuild_user_rollups(db_session, user_id)
+    db_session.flush()
+
+    # Janela até o mês corrente: a linha sem data não pode cair nele
+    from_rollups, from_history = profiles(datetime.now(timezone.utc))
+    assert from_rollups == from_history
+    profile_stats, monthly, platforms = from_rollups
+    assert profile_stats.total_earnings == Decimal("31.85")
+    assert monthly[-1].income == 0
+    assert [p.name for p in platforms] == ["Uber", "99", "Outros"]
+
+
+def test_profile_response_cache(authenticated_client: TestClient):
+    """O perfil é servido do cache até a próxima escrita do usuário."""
+    first = authenticated_client.get("/api/profile/comprehensive")
+    hits = stats.profile_cache.hits
+    second = authenticated_client.get("/api/profile/comprehensive")
+    assert second.json() == first.json()
+    assert stats.profile_cache.hits == hits + 1
+
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 40, "type": "income", "category_id": category["id"], "date": datetime.utcnow().isoformat()},
+    )
+    third = authenticated_client.get("/api/profile/comprehensive")
+    assert third.json()["stats"]["total_trips"] == 1
+    assert "profile" in cache.all_stats()
+
+
+def test_profile_cache_expires_at_month_boundary():
+    now = datetime(2025, 1, 31, 23, 0, 0)
+    assert stats.profile_cache_ttl(now) == 3600
+    assert stats.profile_cache_ttl(datetime(2025, 1, 31, 23, 30, 0)) == 1800
+    assert stats.profile_cache_ttl(datetime(2025, 12, 31, 23, 59, 0)) == 60
+    assert stats.profile_cache_ttl(datetime(2025, 1, 10), trial_ends_at=datetime(2025, 1, 10, 0, 5)) == 300
+
+
+def test_achievements_unlock_incrementally(authenticated_client: TestClient, db_session: Session):
+    """
+    Testa o progresso incremental das conquistas, a data de desbloqueio gravada e a reconstrução.
+    """
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    items = [
+        {"amount": 10, "type": "income", "category_id": category["id"], "date": f"2025-07-{day % 28 + 1:02d}T10:00:00"}
+        for day in range(100)
+    ]
+    authenticated_client.post("/api/transactions/bulk", json=items)
+    authenticated_client.post(
+        "/api/work-sessions/bulk",
+        json=[
+            {"start_time": f"2025-07-{day}T10:00:00", "date": f"2025-07-{day}", "total_minutes": 1000}
+            for day in (21, 22, 23)
+        ],
+    )
+
+    by_id = {a["id"]: a for a in authenticated_client.get("/api/profile/comprehensive").json()["achievements"]}
+    assert by_id[1]["achieved"] is True and by_id[1]["date"] is not None
+    assert (by_id[2]["achieved"], by_id[2]["progress"]) == (True, 100)
+    assert (by_id[3]["achieved"], by_id[3]["progress"]) == (False, 50)
+    assert (by_id[4]["achieved"], by_id[4]["progress"]) == (False, 20)
+
+    user_id = db_session.query(models.User.id).scalar()
+    unlocked_at = {row.achievement_id: row.unlocked_at for row in db_session.query(models.UserAchievement)}
+    achievements.rebuild_user_achievements(db_session, user_id)
+    db_session.commit()
+    assert {row.achievement_id: row.unlocked_at for row in db_session.query(models.UserAchievement)} == unlocked_at
+    assert achievements.list_achievements(db_session, user_id)[2].progress == 50
+
+
+def _seed_money_history(db_session: Session, user_id: int):
+    """Histórico com casos de borda de arredondamento e de zeros (categorias repetidas, meses só com despesa)."""
+    uber = models.Category(user_id=user_id, name="Uber", type="income")
+    uber_again = models.Category(user_id=user_id, name="Uber", type="income")
+    ninety_nine = models.Category(user_id=user_id, name="99", type="income")
+    fuel = models.Category(user_id=user_id, name="Combustível", type="expense")
+    db_session.add_all([uber, uber_again, ninety_nine, fuel])
+    db_session.flush()
+
+    rows = [
+        ("2025-12-03", "100.10", "income", uber.id),
+        ("2025-12-04", "50.05", "income", ninety_nine.id),
+        ("2025-12-05", "30.00", "expense", fuel.id),
+        ("2025-11-10", "40.00", "income", uber.id),
+        ("2025-11-11", "40.00", "expense", fuel.id),
+        ("2025-10-02", "12.34", "expense", fuel.id),
+        ("2025-09-09", "33.33", "income", None),
+        ("2025-03-01", "0.01", "income", uber_again.id),
+        ("2023-01-15", "999.99", "income", uber.id),
+    ]
+    db_session.add_all(
+        models.Transaction(
+            user_id=user_id, date=datetime.fromisoformat(day), amount=Decimal(amount), type=kind, category_id=category
+        )
+        for day, amount, kind, category in rows
+    )
+    db_session.add(
+        models.WorkSession(user_id=user_id, start_time=datetime(2025, 12, 3), date="2025-12-03", total_minutes=137)
+    )
+    db_session.flush()
+
+
+def test_profile_cents_matches_decimal_outputs(authenticated_client: TestClient, db_session: Session):
+    """
+    A agregação em centavos inteiros deve serializar exatamente os mesmos valores
+    que a versão com somas em Decimal, pelo histórico e pelos agregados mensais.
+    """
+    user = db_session.query(models.User).filter(models.User.username == "testauthuser").one()
+    _seed_money_history(db_session, user.id)
+    month_starts = stats.month_window(datetime(2025, 12, 15, tzinfo=timezone.utc))
+    months = [rollups.month_key(m) for m in month_starts]
+
+    def dump(aggregates):
+        profile_stats, monthly, platforms = stats.build_profile(aggregates, month_starts)
+        return (
+            profile_stats.model_dump(mode="json"),
+            [m.model_dump(mode="json") for m in monthly],
+            [p.model_dump(mode="json") for p in platforms],
+        )
+
+    from_history = dump(stats.load_from_transactions(db_session, user.id, months))
+    rollups.rebuild_user_rollups(db_session, user.id)
+    db_session.flush()
+    from_rollups = dump(stats.load_from_rollups(db_session, user.id, months))
+
+    assert from_rollups == from_history
+
+    # Saída da implementação anterior (somas em Decimal), inclusive a forma dos zeros
+    profile_stats, monthly, platforms = from_history
+    assert profile_stats == {
+        "total_trips": 6,
+        "total_earnings": "1223.48",
+        "total_expenses": "82.34",
+        "net_profit": "1141.14",
+        "total_hours": 2,
+        "average_per_trip": "203.9133333333333333333333333",
+        "average_per_hour": "535.8306569343065693430656935",
+        "best_month_earnings": "150.15",
+        "monthly_average_earnings": "18.62416666666666666666666667",
+    }
+    assert {m["month"]: (m["income"], m["expenses"], m["profit"], m["trips"]) for m in monthly} == {
+        **{m["month"]: ("0", "0", "0", 0) for m in monthly},
+        "Mar/2025": ("0.01", "0", "0.01", 1),
+        "Sep/2025": ("33.33", "0", "33.33", 1),
+        "Oct/2025": ("0", "12.34", "-12.34", 0),
+        "Nov/2025": ("40.00", "40.00", "0.00", 1),
+        "Dec/2025": ("150.15", "30.00", "120.15", 2),
+    }
+    # Na ordem da primeira receita de cada plataforma, como no cálculo original
+    assert platforms == [
+        {"name": "Uber", "earnings": "1140.10", "trips": 4, "percentage": 93.19},
+        {"name": "99", "earnings": "50.05", "trips": 1, "percentage": 4.09},
+        {"name": "Outros", "earnings": "33.33", "trips": 1, "percentage": 2.72},
+    ]
+
+
+def test_profile_calendar_months_and_platform_order(authenticated_client: TestClient, db_session: Session):
+    """
+    Os meses do perfil são meses de calendário completos. O cálculo original
+    começava o mês na hora corrente do dia 1 e o terminava um segundo antes da
+    virada: às 10h do dia 15, as transações abaixo não entravam em mês nenhum.
+    As plataformas seguem a ordem da primeira receita, não a do id da categoria.
+    """
+    user_id = db_session.query(models.User.id).scalar()
+    ninety_nine = models.Category(user_id=user_id, name="99", type="income")
+    uber = models.Category(user_id=user_id, name="Uber", type="income")
+    db_session.add_all([ninety_nine, uber])
+    db_session.flush()
+    db_session.add_all(
+        [
+            models.Transaction(user_id=user_id, date=datetime(2025, 12, 1, 3, 0), amount=Decimal("20"), type="income", category_id=uber.id),
+            models.Transaction(user_id=user_id, date=datetime(2025, 11, 30, 23, 59, 59, 500000), amount=Decimal("5"), type="income", category_id=ninety_nine.id),
+        ]
+    )
+    db_session.flush()
+
+    month_starts = stats.month_window(datetime(2025, 12, 15, 10, 0, tzinfo=timezone.utc))
+    months = [rollups.month_key(m) for m in month_starts]
+    _, monthly, platforms = stats.build_profile(stats.load_from_transactions(db_session, user_id, months), month_starts)
+
+    assert [(m.month, m.income) for m in monthly[-2:]] == [("Nov/2025", Decimal("5")), ("Dec/2025", Decimal("20"))]
+    assert [p.name for p in platforms] == ["Uber", "99"]
@@ -0,0 +1,94 @@
+import hashlib
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import JWTError
+from sqlalchemy.orm import Session
+
+from app.core import cache, security
+from app.db import models
+from app.routes import metrics
+
+
+def test_authenticated_user_is_cached(authenticated_client: TestClient):
+    """Requisições seguintes com o mesmo token não consultam a tabela de usuários."""
+    assert authenticated_client.get("/api/auth/user").status_code == 200
+    misses = security.user_cache.misses
+
+    for _ in range(3):
+        response = authenticated_client.get("/api/auth/user")
+        assert response.status_code == 200
+        assert response.json()["username"] == "testauthuser"
+
+    assert security.user_cache.misses == misses
+    assert cache.all_stats()["users"]["hits"] >= 3
+
+
+def test_metrics_require_ops_token(authenticated_client: TestClient, monkeypatch):
+    """As métricas do processo não ficam visíveis para motoristas autenticados."""
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", None)
+    assert authenticated_client.get("/api/metrics").status_code == 404
+
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "ops-secret")
+    assert authenticated_client.get("/api/metrics").status_code == 403
+    assert authenticated_client.get("/api/metrics", headers={"X-Metrics-Token": "errado"}).status_code == 403
+
+    response = authenticated_client.get("/api/metrics", headers={"X-Metrics-Token": "ops-secret"})
+    assert response.status_code == 200
+    assert "users" in response.json()["caches"]
+
+
+def test_user_cache_invalidated_on_update(authenticated_client: TestClient, db_session: Session):
+    assert authenticated_client.get("/api/auth/user").json()["full_name"] == "Authenticated User"
+
+    user = db_session.query(models.User).filter(models.User.username == "testauthuser").one()
+    user.full_name = "Nome Atualizado"
+    db_session.commit()
+
+    assert authenticated_client.get("/api/auth/user").json()["full_name"] == "Nome Atualizado"
+
+
+def test_token_payload_cached_until_exp():
+    token = security.create_access_token({"sub": "alguem"}, expires_delta=timedelta(minutes=5))
+    hits = security.token_cache.hits
+
+    assert security.decode_access_token(token)["sub"] == "alguem"
+    assert security.decode_access_token(token)["sub"] == "alguem"
+    assert security.token_cache.hits == hits + 1
+
+    # Um payload expirado no cache não é aceito: o token volta a ser verificado
+    expired = security.create_access_token({"sub": "alguem"}, expires_delta=timedelta(minutes=-1))
+    key = hashlib.sha256(expired.encode()).hexdigest()
+    security.token_cache.set(key, {"sub": "alguem", "exp": time.time() - 60})
+    with pytest.raises(JWTError):
+        security.decode_access_token(expired)
+
+
+def test_login_rehashes_legacy_password(client: TestClient, db_session: Session):
+    # Custo "legado": abaixo do configurado (o mínimo do bcrypt é 4)
+    if security.BCRYPT_ROUNDS <= 4:
+        pytest.skip("BCRYPT_ROUNDS já é o mínimo do bcrypt; não há custo menor para simular um hash legado")
+    legacy_rounds = security.BCRYPT_ROUNDS - 1
+    legacy_hash = security.pwd_context.handler("bcrypt").using(rounds=legacy_rounds).hash("senha-antiga")
+    assert security.pwd_context.needs_update(legacy_hash)
+    db_session.add(models.User(username="legado", email="legado@example.com", password=legacy_hash))
+    db_session.commit()
+
+    response = client.post("/api/auth/token", data={"username": "legado", "password": "senha-antiga"})
+    assert response.status_code == 200
+
+    user = db_session.query(models.User).filter(models.User.username == "legado").one()
+    assert user.password != legacy_hash
+    assert not security.pwd_context.needs_update(user.password)
+    assert security.pwd_context.verify("senha-antiga", user.password)
+
+
+def test_login_returns_503_when_hash_queue_is_full(authenticated_client: TestClient, monkeypatch):
+    monkeypatch.setattr(security, "HASH_MAX_PENDING", 0)
+    response = authenticated_client.post(
+        "/api/auth/token", data={"username": "testauthuser", "password": "testauthpassword"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -1,6 +1,14 @@
+import csv
+import io
 import json
 from datetime import datetime
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.routes import transactions as transactions_routes
+from app.services import bulk
+from app.utils import utils
 
 def test_create_and_get_transaction(authenticated_client: TestClient):
     """
@@ -57,4 +65,292 @@ def test_get_transactions_date_range(authenticated_client: TestClient):
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 1
-    assert float(data[0]["amount"]) == 20
\ No newline at end of file
+    assert float(data[0]["amount"]) == 20
+
+def test_get_transactions_cursor_pagination(authenticated_client: TestClient):
+    """
+    Testa a paginação por cursor, incluindo transações com a mesma data.
+    """
+    cat_id = authenticated_client.post("/api/categories", json={"name": "Paginação", "type": "income"}).json()["id"]
+    dates = ["2025-07-20T10:00:00", "2025-07-21T10:00:00", "2025-07-21T10:00:00", "2025-07-22T10:00:00", "2025-07-23T10:00:00"]
+    for i, tx_date in enumerate(dates):
+        authenticated_client.post("/api/transactions", json={"amount": i + 1, "date": tx_date, "category_id": cat_id, "type": "income"})
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = authenticated_client.get("/api/transactions", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params = {"limit": 2, "cursor": next_cursor}
+
+    assert len(seen) == 5
+    assert len({t["id"] for t in seen}) == 5
+    assert [t["date"] for t in seen] == sorted(dates, reverse=True)
+
+
+def test_get_transactions_cursor_with_undated_rows(authenticated_client: TestClient, db_session: Session):
+    """
+    Testa que transações legadas sem data não quebram o cursor e aparecem uma única vez.
+    """
+    cat_id = authenticated_client.post("/api/categories", json={"name": "Legado", "type": "income"}).json()["id"]
+    for tx_date in ("2025-07-20T10:00:00", "2025-07-21T10:00:00"):
+        authenticated_client.post("/api/transactions", json={"amount": 1, "date": tx_date, "category_id": cat_id, "type": "income"})
+    user_id = db_session.query(models.User.id).scalar()
+    legacy = [models.Transaction(user_id=user_id, amount=2, type="income") for _ in range(2)]
+    db_session.add_all(legacy)
+    db_session.flush()
+    db_session.query(models.Transaction).filter(models.Transaction.id.in_([t.id for t in legacy])).update({"date": None})
+
+    seen, params = [], {"limit": 1}
+    while True:
+        response = authenticated_client.get("/api/transactions", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params = {"limit": 1, "cursor": response.headers["X-Next-Cursor"]}
+
+    assert [t["date"] for t in seen] == [None, None, "2025-07-21T10:00:00", "2025-07-20T10:00:00"]
+    assert len({t["id"] for t in seen}) == 4
+
+
+def test_get_transactions_invalid_cursor(authenticated_client: TestClient):
+    """
+    Testa que um cursor malformado é rejeitado.
+    """
+    response = authenticated_client.get("/api/transactions", params={"cursor": "nao-e-um-cursor"})
+    assert response.status_code == 400
+
+
+def test_export_transactions_ndjson_and_csv(authenticated_client: TestClient):
+    """
+    Testa a exportação em streaming nos formatos NDJSON e CSV, com filtro de período.
+    """
+    cat_id = authenticated_client.post("/api/categories", json={"name": "Export", "type": "income"}).json()["id"]
+    authenticated_client.post("/api/transactions", json={"amount": 10, "date": "2025-07-20T10:00:00", "category_id": cat_id, "type": "income"})
+    created = authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 20.5, "date": "2025-07-22T10:00:00", "category_id": cat_id, "type": "income", "description": "Corrida, centro"},
+    ).json()
+
+    response = authenticated_client.get("/api/transactions/export", params={"start_date": "2025-07-21", "end_date": "2025-07-23"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 1
+    # Mesmo formato do JSON de GET /api/transactions
+    assert {k: lines[0][k] for k in created} == created
+
+    response = authenticated_client.get("/api/transactions/export", params={"format": "csv"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [r["amount"] for r in rows] == ["20.50", "10.00"]
+    assert rows[0]["description"] == "Corrida, centro"
+
+
+def test_import_statement_deduplicates(authenticated_client: TestClient):
+    """
+    Testa a importação de um extrato CSV e a deduplicação por external_id ao reenviar o arquivo.
+    """
+    statement = (
+        "Data,Valor\n"
+        "21/07/2025 10:00,\"R$ 25,50\"\n"
+        "21/07/2025 12:00,\"R$ 30,00\"\n"
+        "21/07/2025 12:00,\"R$ 30,00\"\n"
+    ).encode()
+    files = {"file": ("uber.csv", statement, "text/csv")}
+
+    response = authenticated_client.post("/api/transactions/import", files=files, data={"platform": "uber"})
+    assert response.status_code == 201
+    assert response.json() == {"inserted": 2, "skipped": 1}
+
+    response = authenticated_client.post("/api/transactions/import", files=files, data={"platform": "uber"})
+    assert response.json() == {"inserted": 0, "skipped": 3}
+
+    transactions = authenticated_client.get("/api/transactions").json()
+    assert sorted(float(t["amount"]) for t in transactions) == [25.5, 30.0]
+    # As corridas importadas entram na categoria da plataforma
+    categories = authenticated_client.get("/api/categories").json()
+    assert {t["category_id"] for t in transactions} == {c["id"] for c in categories if c["name"] == "Uber"}
+
+
+def test_import_statement_rounds_amounts_on_storage(authenticated_client: TestClient, db_session: Session):
+    """
+    Testa que valores do extrato com mais de duas casas são gravados em centavos
+    (1,005 -> 1.01, meio centavo para cima), com os agregados somando o mesmo valor gravado.
+    """
+    statement = "Data,Valor\n21/07/2025 10:00,\"1,005\"\n22/07/2025 10:00,\"R$ 7,5\"\n".encode()
+    files = {"file": ("uber.csv", statement, "text/csv")}
+    assert authenticated_client.post("/api/transactions/import", files=files).json()["inserted"] == 2
+
+    amounts = sorted(str(t.amount) for t in db_session.query(models.Transaction))
+    assert amounts == ["1.01", "7.50"]
+    rollup_total = sum(r.income for r in db_session.query(models.MonthlyRollup))
+    assert str(rollup_total) == "8.51"
+
+
+def test_import_statement_streaming(authenticated_client: TestClient, monkeypatch):
+    """
+    Testa a importação em streaming, usada para CSVs acima do limite de tamanho.
+    """
+    monkeypatch.setattr(transactions_routes, "STREAMING_IMPORT_THRESHOLD", 0)
+    monkeypatch.setattr(utils, "CSV_CHUNK_SIZE", 2)
+    lines = ["Data,Valor"] + [f"{day:02d}/07/2025 10:00,\"R$ {day},00\"" for day in range(1, 8)]
+    files = {"file": ("uber.csv", "\n".join(lines).encode(), "text/csv")}
+
+    response = authenticated_client.post("/api/transactions/import", files=files)
+    assert response.status_code == 201
+    assert response.json() == {"inserted": 7, "skipped": 0}
+
+
+def test_import_statement_unsupported_format(authenticated_client: TestClient):
+    """
+    Testa a rejeição de formatos de arquivo não suportados.
+    """
+    response = authenticated_client.post("/api/transactions/import", files={"file": ("extrato.txt", b"abc", "text/plain")})
+    assert response.status_code == 400
+    # Nada foi gravado: a sessão não é revertida e o usuário continua autenticado
+    assert authenticated_client.get("/api/transactions").status_code == 200
+
+
+def test_import_statement_rejects_foreign_category(authenticated_client: TestClient, db_session: Session):
+    """
+    Testa que a importação não aceita a categoria de outro usuário.
+    """
+    other = models.User(username="outro", email="outro@example.com", password="x")
+    db_session.add(other)
+    db_session.flush()
+    foreign = models.Category(user_id=other.id, name="Uber", type="income")
+    db_session.add(foreign)
+    db_session.flush()
+
+    files = {"file": ("uber.csv", "Data,Valor\n21/07/2025 10:00,\"R$ 25,50\"\n".encode(), "text/csv")}
+    response = authenticated_client.post("/api/transactions/import", files=files, data={"category_id": foreign.id})
+    assert response.status_code == 404
+    assert db_session.query(models.Transaction).count() == 0
+
+
+def test_get_transactions_conditional_etag(authenticated_client: TestClient):
+    """
+    Testa o ETag por versão dos dados: 304 enquanto nada muda, 200 após uma escrita.
+    """
+    first = authenticated_client.get("/api/transactions")
+    etag = first.headers["ETag"]
+
+    cached = authenticated_client.get("/api/transactions", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    authenticated_client.post(
+        "/api/transactions",
+        json={"amount": 12.5, "type": "income", "category_id": category["id"], "date": "2025-07-21T10:00:00"},
+    )
+
+    updated = authenticated_client.get("/api/transactions", headers={"If-None-Match": etag})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != etag
+    assert len(updated.json()) == 1
+
+
+def test_create_transactions_bulk(authenticated_client: TestClient):
+    """
+    Testa a criação em lote: itens válidos são inseridos e os inválidos reportados pelo índice.
+    """
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    items = [
+        {"amount": 30, "type": "income", "category_id": category["id"], "date": "2025-07-21T10:00:00"},
+        {"amount": "abc", "type": "income", "date": "2025-07-21T11:00:00"},
+        {"amount": 12.5, "type": "expense", "category_id": category["id"], "date": "2025-07-21T12:00:00"},
+    ]
+
+    response = authenticated_client.post("/api/transactions/bulk", json=items)
+    assert response.status_code == 201
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert [r["status"] for r in data["results"]] == ["created", "error", "created"]
+    assert float(data["results"][0]["item"]["amount"]) == 30
+    assert data["results"][1]["errors"][0]["loc"] == ["amount"]
+
+    assert len(authenticated_client.get("/api/transactions").json()) == 2
+    stats = authenticated_client.get("/api/profile/comprehensive").json()["stats"]
+    assert float(stats["total_earnings"]) == 30
+
+
+def test_create_transactions_bulk_too_large(authenticated_client: TestClient, monkeypatch):
+    """
+    Testa o limite configurável do tamanho do lote.
+    """
+    monkeypatch.setattr(bulk, "BULK_MAX_ITEMS", 2)
+    items = [{"amount": 1, "type": "expense", "date": "2025-07-21T10:00:00"}] * 3
+    response = authenticated_client.post("/api/transactions/bulk", json=items)
+    assert response.status_code == 413
+
+
+def test_create_transaction_idempotency_key(authenticated_client: TestClient):
+    """
+    Testa que repetir a criação com o mesmo Idempotency-Key não duplica a transação.
+    """
+    category = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()
+    payload = {"amount": 25, "type": "income", "category_id": category["id"], "date": "2025-07-21T10:00:00"}
+    headers = {"Idempotency-Key": "sync-123"}
+
+    first = authenticated_client.post("/api/transactions", json=payload, headers=headers)
+    assert first.status_code == 201
+    assert first.json()["external_id"] == "idem:sync-123"
+    retry = authenticated_client.post("/api/transactions", json=payload, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+
+    # A chave fica num espaço próprio: um external_id igual (ex.: de uma importação) é outra transação
+    bulk_items = [{**payload, "external_id": "sync-123"}, {**payload, "external_id": "sync-123"}]
+    result = authenticated_client.post("/api/transactions/bulk", json=bulk_items).json()
+    assert (result["created"], result["duplicates"]) == (1, 1)
+    assert result["results"][0]["item"]["id"] != first.json()["id"]
+
+    assert len(authenticated_client.get("/api/transactions").json()) == 2
+    stats = authenticated_client.get("/api/profile/comprehensive").json()["stats"]
+    assert float(stats["total_earnings"]) == 50
+
+
+
+def test_transactions_summary(authenticated_client: TestClient):
+    """
+    Testa o resumo por período calculado no banco, por dia, semana e com agrupamento por origem.
+    """
+    uber = authenticated_client.post("/api/categories", json={"name": "Uber", "type": "income"}).json()["id"]
+    items = [
+        {"amount": 10, "type": "income", "category_id": uber, "source": "Uber", "date": "2025-07-21T08:00:00"},
+        {"amount": 20, "type": "income", "category_id": uber, "source": "99", "date": "2025-07-21T18:30:00"},
+        {"amount": 5, "type": "expense", "category_id": uber, "date": "2025-07-23T12:00:00"},
+        {"amount": 40, "type": "income", "category_id": uber, "source": "Uber", "date": "2025-07-27T23:00:00"},
+        {"amount": 99, "type": "income", "category_id": uber, "date": "2025-07-28T00:00:00"},
+    ]
+    assert authenticated_client.post("/api/transactions/bulk", json=items).json()["created"] == 5
+    params = {"start_date": "2025-07-21", "end_date": "2025-07-27"}
+
+    daily = authenticated_client.get("/api/transactions/summary", params=params).json()["buckets"]
+    assert [(b["period"], float(b["profit"]), b["trips"]) for b in daily] == [
+        ("2025-07-21", 30, 2),
+        ("2025-07-23", -5, 0),
+        ("2025-07-27", 40, 1),
+    ]
+
+    weekly = authenticated_client.get("/api/transactions/summary", params={**params, "granularity": "week"}).json()
+    assert [(b["period"], float(b["income"]), float(b["expenses"])) for b in weekly["buckets"]] == [("2025-07-21", 70, 5)]
+
+    by_source = authenticated_client.get(
+        "/api/transactions/summary", params={**params, "granularity": "month", "group_by": "source"}
+    ).json()["buckets"]
+    assert {b["group"]: float(b["income"]) for b in by_source} == {None: 0, "99": 20, "Uber": 50}
+
+    too_long = authenticated_client.get(
+        "/api/transactions/summary", params={"start_date": "2024-01-01", "end_date": "2025-12-31", "granularity": "hour"}
+    )
+    assert too_long.status_code == 400